@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
+import base64
+import json
 import backend.database as db
 
 router = APIRouter(prefix="/api/library", tags=["library"])
@@ -22,6 +24,32 @@ def get_library():
     """Get all favorite series from the unified series table"""
     return db.get_favorite_series()
 
+class LibraryPage(BaseModel):
+    items: List[SeriesResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None  # Only on the first page
+
+def encode_cursor(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        last_fetched_at, url = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(last_fetched_at), str(url)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/page", response_model=LibraryPage)
+def get_library_page(cursor: Optional[str] = None, limit: int = 50):
+    """Get favorite series one page at a time (newest first); pass next_cursor back for the next page"""
+    after = decode_cursor(cursor) if cursor else None
+    items, next_key = db.get_favorite_series_page(after=after, limit=limit)
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(next_key) if next_key else None,
+        "total": None if cursor else db.count_favorite_series()
+    }
+
 @router.post("/toggle")
 def toggle_favorite(req: ToggleFavoriteRequest):
     """Toggle favorite status for a series"""
@@ -35,6 +63,18 @@ def check_favorite(url: str):
     """Check if a URL is marked as favorite"""
     return {"is_favorite": db.is_favorite(url)}
 
+class CheckBatchRequest(BaseModel):
+    urls: List[str]
+
+CHECK_BATCH_MAX = 1000
+
+@router.post("/check-batch")
+def check_favorites_batch(req: CheckBatchRequest):
+    """Check favorite status for many URLs in one request (e.g. a whole grid of cards)"""
+    if len(req.urls) > CHECK_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {CHECK_BATCH_MAX} URLs per request")
+    return {"favorites": db.check_favorites(req.urls)}
+
 # Legacy endpoints for backward compatibility
 @router.post("/")
 def add_to_library_legacy(req: ToggleFavoriteRequest):
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse, Response
+from typing import Optional
 from pydantic import BaseModel
 import json
+import asyncio
 import logging
 import traceback
 import sys
 import os
 import subprocess
-from ..scraper.scraper import ArabicToonsScraper
-from ..core.browser import BrowserManager
+from urllib.parse import quote
+from ..scraper.async_scraper import AsyncArabicToonsScraper
+from ..core.single_flight import SingleFlight
+from ..core.utils import normalize_url
+from ..core.proxy import ProxyClient, ProxyBusy, ResponseTooLarge
+from ..core.chunk_cache import ChunkCache, cache_key, parse_range
+from ..core.segmented import SegmentedFetcher
+from ..core.hls import HlsProxy, is_playlist, FFMPEG_PATH
+from ..core import cache_ttl
 from .. import database as db
 
 # Configure logging
@@ -20,128 +29,312 @@ router = APIRouter()
 # Global scraper instance
 _scraper = None
 
+# Concurrent scrapes of the same series share one run
+_flights = SingleFlight()
+
 def get_scraper():
     global _scraper
     if _scraper is None:
         print("[INIT] Initializing Arabic Toons Scraper...", flush=True)
-        _scraper = ArabicToonsScraper()
+        _scraper = AsyncArabicToonsScraper()
         print("[INIT] Scraper initialized successfully", flush=True)
     return _scraper
 
 class URLRequest(BaseModel):
     url: str
 
+async def scrape_and_cache(url: str):
+    """
+    Scrape a series from the web, caching the series and each episode to SQLite as events arrive.
+    Incremental: episodes already cached (by episode_url) are reused if their video URL still
+    validates, so only new or broken episodes are resolved; rows are updated in place.
+    """
+    scraper = get_scraper()
+    try:
+        # SQLite work runs in worker threads: this generator shares the event loop with every request
+        known = await asyncio.to_thread(cached_known_episodes, url)
+        if known:
+            logger.info(f"Incremental refresh for {url}: {len(known)} episodes already cached")
+        
+        event_count = 0
+        episode_number = 0
+        cached_count = 0
+        new_episodes = 0
+        token_params = []
+        # Episode rows are buffered and committed in batches (see EpisodeCacheWriter)
+        writer = db.EpisodeCacheWriter(url)
+        
+        try:
+            async for event in events_with_flushes(scraper.download_season_generator(url, known=known), writer):
+                event_count += 1
+                
+                # Capture series title from start event; the series row is written before any episode
+                if event.get('type') == 'start':
+                    writer.set_series(event.get('series_title', 'Unknown Series'), event.get('total', 0))
+                
+                # Cache each episode result
+                if event.get('type') == 'result':
+                    data = event.get('data', {})
+                    # Results arrive in completion order; the stable index keeps the cache ordered
+                    episode_number = data.get('index') or episode_number + 1
+                    cached_count += 1
+                    if data.get('episode_url') not in known:
+                        new_episodes += 1
+                    token_params.append(data.get('video_info', {}).get('parameters'))
+                    
+                    await asyncio.to_thread(
+                        writer.add_episode,
+                        episode_number=episode_number,
+                        title=data.get('title', f'Episode {episode_number}'),
+                        video_url=data.get('video_url', ''),
+                        video_info=data.get('video_info', {}),
+                        size_bytes=data.get('metadata', {}).get('size_bytes', 0),
+                        thumbnail=data.get('thumbnail', ''),
+                        episode_url=data.get('episode_url', '')
+                    )
+                
+                yield event
+        finally:
+            # Runs on normal end, errors and cancellation alike
+            await asyncio.to_thread(writer.close)
+        
+        logger.info(f"Cached {cached_count} episodes for '{writer.title}' in {writer.flushes} transactions")
+        if writer.total_episodes:
+            await asyncio.to_thread(finish_refresh, url, writer, new_episodes, token_params)
+        
+        logger.info(f"Stream completed. Total events: {event_count}")
+    except Exception as e:
+        err_msg = repr(e)
+        logger.error(f"Generator error: {err_msg}")
+        logger.error(traceback.format_exc())
+        yield {'type': 'error', 'message': err_msg}
+
+async def events_with_flushes(events, writer: db.EpisodeCacheWriter):
+    """
+    Yield `events`, flushing `writer` as soon as its oldest buffered row is due -
+    also while no event arrives (an episode can take minutes to resolve)
+    """
+    events = events.__aiter__()
+    next_event = None
+    try:
+        while True:
+            if next_event is None:
+                next_event = asyncio.ensure_future(events.__anext__())
+            # Not wait_for: a timeout must not cancel the scraper mid-step
+            await asyncio.wait({next_event}, timeout=writer.flush_delay())
+            if writer.flush_delay() == 0:
+                await asyncio.to_thread(writer.maybe_flush)
+            if not next_event.done():
+                continue
+            done, next_event = next_event, None
+            try:
+                event = done.result()
+            except StopAsyncIteration:
+                return
+            yield event
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+
+def finish_refresh(url: str, writer: db.EpisodeCacheWriter, new_episodes: int, token_params: list):
+    """After a completed scrape: prune, update the adaptive TTL and pre-render the cache-hit body (blocking)"""
+    # Listing got shorter (episodes removed/renumbered): drop the leftovers
+    pruned = db.prune_episodes(url, writer.total_episodes)
+    if pruned:
+        logger.info(f"Pruned {pruned} episodes no longer listed")
+    
+    # Adapt the series TTL to how often it gets new episodes and when its links expire
+    state = cache_ttl.next_refresh_state(db.get_series(url), new_episodes,
+                                         expires_at=cache_ttl.earliest_expiry(token_params))
+    db.update_series_refresh_state(url, **state)
+    logger.info(f"Next refresh of '{writer.title}' due in {state['ttl_seconds'] // 60} min "
+                f"({new_episodes} new episodes, {state['unchanged_refreshes']} unchanged refreshes)")
+    
+    # Render the cache-hit body now so the next request is a single write
+    bundle = db.get_series_bundle(url)
+    if bundle and bundle["episode_count"] and not bundle["payload"]:
+        claim = db.claim_series_payload(url)
+        body = b"".join(render_cached_lines(db.iter_cached_episodes(url), bundle["episode_count"]))
+        if claim:
+            db.store_series_payload(url, body, title=bundle["series"].get('title') or '', claim=claim)
+
+async def iterate_in_thread(iterable):
+    """Run a blocking iterable (e.g. a SQLite cursor) in a worker thread, yielding its items on the event loop"""
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue()
+    done = object()
+    
+    def produce():
+        try:
+            for item in iterable:
+                loop.call_soon_threadsafe(items.put_nowait, item)
+        except Exception as e:
+            loop.call_soon_threadsafe(items.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(items.put_nowait, done)
+    
+    producer = loop.run_in_executor(None, produce)
+    while True:
+        item = await items.get()
+        if item is done:
+            break
+        if isinstance(item, Exception):
+            raise item
+        yield item
+    await producer
+
+def cached_result_event(ep: dict, i: int) -> dict:
+    return {
+        "type": "result",
+        "data": {
+            "index": ep.get('episode_number', i),
+            "title": ep.get('title'),
+            "video_url": ep.get('video_url'),
+            "video_info": ep.get('video_info', {}),
+            "metadata": {"size_bytes": ep.get('size_bytes', 0)},
+            "thumbnail": ep.get('thumbnail'),
+            "episode_url": ep.get('episode_url')
+        }
+    }
+
+# Enough to diff a refresh against the cache; no video_info columns
+KNOWN_EPISODE_FIELDS = ['episode_number', 'title', 'video_url', 'thumbnail', 'episode_url']
+
+def cached_known_episodes(url: str) -> dict:
+    """episode_url -> lightweight cached row, streamed from the cursor"""
+    return {
+        ep['episode_url']: ep
+        for ep in db.iter_cached_episodes(url, fields=KNOWN_EPISODE_FIELDS, decode_video_info=False)
+        if ep.get('episode_url')
+    }
+
+def render_cached_lines(episodes, total: int):
+    """NDJSON progress/result lines (bytes) per cached episode - identical on every hit"""
+    for i, ep in enumerate(episodes, 1):
+        progress = json.dumps({
+            "type": "progress",
+            "current": i,
+            "total": total,
+            "title": ep.get('title', f'Episode {i}')
+        })
+        yield (progress + "\n" + json.dumps(cached_result_event(ep, i)) + "\n").encode("utf-8")
+
+async def revalidate_events(url: str):
+    """
+    Refresh a stale series in the background (single-flight) and yield only
+    the episodes that are new or whose video URL/title changed
+    """
+    # Snapshot the cache before the refresh starts rewriting it
+    known = await asyncio.to_thread(cached_known_episodes, url)
+    flight, leader = _flights.join(normalize_url(url), lambda: scrape_and_cache(url))
+    logger.info(f"Revalidating {url} ({'started' if leader else 'joined in-flight scrape'})")
+    
+    counts = {"added": 0, "changed": 0}
+    async for event in flight.subscribe():
+        if event.get('type') != 'result':
+            continue
+        data = event.get('data', {})
+        before = known.get(data.get('episode_url'))
+        if before is None:
+            change = "added"
+        elif before.get('video_url') != data.get('video_url') or before.get('title') != data.get('title'):
+            change = "changed"
+        else:
+            continue
+        counts[change] += 1
+        yield {"type": "update", "change": change, "data": data}
+    
+    logger.info(f"Revalidated {url}: {counts['added']} new, {counts['changed']} changed episodes")
+    yield {"type": "revalidated", **counts}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak If-None-Match comparison (W/ prefixes ignored, comma-separated lists and * allowed)"""
+    if not if_none_match:
+        return False
+    strip = lambda tag: tag.strip().removeprefix("W/")
+    return any(tag.strip() == "*" or strip(tag) == strip(etag) for tag in if_none_match.split(","))
+
+
 @router.get("/season/stream")
-def stream_season(url: str, force_refresh: bool = False):
+async def stream_season(url: str, force_refresh: bool = False, if_none_match: Optional[str] = Header(None)):
     """
     Stream season episodes from Arabic Toons.
-    Uses SQLite cache: if data is fresh (< 24h), serves from DB.
-    Otherwise, fetches from web and caches to DB.
+    Stale-while-revalidate over the SQLite cache: a known series is served
+    from DB immediately, whatever its age. If it is older than its adaptive
+    TTL (see core.cache_ttl), a background refresh runs and only new/changed
+    episodes are pushed afterwards as `update` events.
+    Cache hits send a pre-rendered body with an ETag (or stream episode rows
+    from the cursor the first time); a fresh series whose ETag matches
+    If-None-Match gets 304.
+    Unknown series (or force_refresh) are fetched from web and cached to DB.
     """
     try:
-        # Check if cache is fresh and we're not forcing refresh
-        if not force_refresh and db.is_cache_fresh(url):
-            logger.info(f"Cache HIT for {url} - serving from SQLite")
-            cached_episodes = db.get_cached_episodes(url)
-            series = db.get_series(url)
+        # Series + rendered payload, from the in-memory LRU or SQLite
+        bundle = None if force_refresh else await asyncio.to_thread(db.get_series_bundle, url)
+        cache_age = db.series_age(bundle["series"]) if bundle else None
+        if bundle and cache_ttl.links_expired(bundle["series"].get('links_expire_at')):
+            # Cached video URLs are (about to be) dead: don't serve them, not even while revalidating
+            logger.info(f"Cached links for {url} expire within {cache_ttl.TOKEN_EXPIRY_MARGIN // 60} min - refetching")
+            bundle = None
+        
+        if bundle and bundle["episode_count"] and cache_age is not None:
+            series = bundle["series"]
+            total = bundle["episode_count"]
+            payload = bundle["payload"]
+            ttl = db.series_ttl(series)
+            stale = cache_age >= ttl
+            logger.info(f"Cache HIT for {url} - serving from cache ({int(cache_age)}s old{', revalidating' if stale else ''})")
+            # Only a fresh response is exactly payload + start line: a stale one also carries the
+            # revalidation events, so it must never be replayed from a browser cache via 304.
+            # Weak, because the start line (cache age) is not covered by the hash.
+            etag = f"W/{payload['etag']}" if payload and not stale else None
+            # no-cache: browsers may keep the response but must revalidate it with If-None-Match
+            headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else {}
+            
+            if etag and etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers=headers)
             
-            def cached_event_generator():
-                # Send start event
+            async def cached_event_generator():
+                # Send start event; `cached` says how old the data is
                 yield json.dumps({
                     "type": "start",
-                    "total": len(cached_episodes),
+                    "total": total,
                     "series_title": series.get('title', 'Unknown Series'),
-                    "cached": True
+                    "cached": {"age_seconds": int(cache_age), "ttl_seconds": int(ttl), "stale": stale}
                 }) + "\n"
                 
-                # Send each episode as result event
-                for i, ep in enumerate(cached_episodes, 1):
-                    yield json.dumps({
-                        "type": "progress",
-                        "current": i,
-                        "total": len(cached_episodes),
-                        "title": ep.get('title', f'Episode {i}')
-                    }) + "\n"
-                    
-                    yield json.dumps({
-                        "type": "result",
-                        "data": {
-                            "title": ep.get('title'),
-                            "video_url": ep.get('video_url'),
-                            "video_info": ep.get('video_info', {}),
-                            "metadata": {"size_bytes": ep.get('size_bytes', 0)},
-                            "thumbnail": ep.get('thumbnail'),
-                            "episode_url": ep.get('episode_url')
-                        }
-                    }) + "\n"
+                if payload:
+                    # Progress/result events for every episode, as one pre-rendered write
+                    yield payload["body"]
+                else:
+                    # Not rendered since the last change: stream rows straight from the cursor,
+                    # keeping the bytes so the next hit is a single write (the claim is
+                    # dropped by any write landing meanwhile, so stale rows are never stored)
+                    claim = await asyncio.to_thread(db.claim_series_payload, url)
+                    chunks = []
+                    async for chunk in iterate_in_thread(render_cached_lines(db.iter_cached_episodes(url), total)):
+                        chunks.append(chunk)
+                        yield chunk
+                    if claim:
+                        await asyncio.to_thread(db.store_series_payload, url, b"".join(chunks),
+                                                title=series.get('title') or '', claim=claim)
+                
+                if stale:
+                    # Cache fully delivered; keep the stream open for the delta
+                    yield json.dumps({"type": "revalidating"}) + "\n"
+                    async for event in revalidate_events(url):
+                        yield json.dumps(event) + "\n"
             
-            return StreamingResponse(cached_event_generator(), media_type="text/event-stream")
+            return StreamingResponse(cached_event_generator(), media_type="text/event-stream", headers=headers)
         
-        # Cache MISS or force refresh - fetch from web
-        logger.info(f"Cache MISS for {url} - fetching from web")
-        scraper = get_scraper()
+        # Cache MISS or force refresh - fetch from web (coalesced with any scrape already running)
+        flight, leader = _flights.join(normalize_url(url), lambda: scrape_and_cache(url))
+        logger.info(f"Cache MISS for {url} - {'fetching from web' if leader else 'attaching to in-flight scrape'}")
         
-        def event_generator():
-            try:
-                event_count = 0
-                episode_number = 0
-                series_title = "Unknown Series"
-                first_thumbnail = None
-                
-                for event in scraper.download_season_generator(url):
-                    event_count += 1
-                    
-                    # Capture series title from start event AND upsert series FIRST
-                    if event.get('type') == 'start':
-                        series_title = event.get('series_title', 'Unknown Series')
-                        total_episodes = event.get('total', 0)
-                        
-                        # Upsert series IMMEDIATELY so episodes can reference it
-                        db.upsert_series(
-                            url=url,
-                            title=series_title,
-                            thumbnail=None,  # Will update later with first episode thumbnail
-                            total_episodes=total_episodes
-                        )
-                    
-                    # Cache each episode result
-                    if event.get('type') == 'result':
-                        episode_number += 1
-                        data = event.get('data', {})
-                        
-                        # Capture first thumbnail for series
-                        if not first_thumbnail and data.get('thumbnail'):
-                            first_thumbnail = data.get('thumbnail')
-                            # Update series with thumbnail
-                            db.upsert_series(
-                                url=url,
-                                title=series_title,
-                                thumbnail=first_thumbnail,
-                                total_episodes=total_episodes
-                            )
-                        
-                        # Upsert episode to DB (series now exists!)
-                        db.upsert_episode(
-                            series_url=url,
-                            episode_number=episode_number,
-                            title=data.get('title', f'Episode {episode_number}'),
-                            video_url=data.get('video_url', ''),
-                            video_info=data.get('video_info', {}),
-                            size_bytes=data.get('metadata', {}).get('size_bytes', 0),
-                            thumbnail=data.get('thumbnail', ''),
-                            episode_url=data.get('episode_url', '')
-                        )
-                    
-                    yield json.dumps(event) + "\n"
-                
-                logger.info(f"Cached {episode_number} episodes for '{series_title}'")
-                
-                logger.info(f"Stream completed. Total events: {event_count}")
-            except Exception as e:
-                err_msg = repr(e)
-                logger.error(f"Generator error: {err_msg}")
-                logger.error(traceback.format_exc())
-                yield json.dumps({'type': 'error', 'message': err_msg}) + "\n"
+        async def event_generator():
+            async for event in flight.subscribe():
+                yield json.dumps(event) + "\n"
         
         return StreamingResponse(event_generator(), media_type="text/event-stream")
         
@@ -151,47 +344,270 @@ def stream_season(url: str, force_refresh: bool = False):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-import httpx
-from fastapi import Request
+# App-lifetime upstream client for /proxy (opened/closed by the lifespan in main.py)
+_proxy = ProxyClient()
+
+# Proxied video bytes kept on disk, so popular episodes are served without the CDN
+_chunk_cache = ChunkCache()
+
+# Large ranges fetched over several connections at once (the CDN throttles each one)
+_segments = SegmentedFetcher(_proxy)
+
+# m3u8 sources: playlists rewritten to load segments through /proxy/hls/segment
+_hls = HlsProxy(_proxy)
 
-@router.on_event("shutdown")
-def shutdown_event():
+def upstream_extent(upstream):
+    """(offset of the first body byte, total file size) of an upstream response, or None if unknown"""
+    if "Content-Encoding" in upstream.headers:
+        return None
+    if upstream.status_code == 206:
+        unit_range, _, total = upstream.headers.get("Content-Range", "").partition("/")
+        if not total.isdigit() or "-" not in unit_range:
+            return None
+        return int(unit_range.split()[-1].split("-")[0]), int(total)
+    length = upstream.headers.get("Content-Length", "")
+    return (0, int(length)) if length.isdigit() else None
+
+def upstream_failure(e: Exception, what: str) -> HTTPException:
+    """502 for upstream errors, 503 + Retry-After when every slot for the host stayed busy"""
+    print(f"Proxy error: {e}")
+    if isinstance(e, ProxyBusy):
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+    return HTTPException(status_code=502, detail=f"{what} failed: {e}")
+
+async def known_size_response(url: str, key: Optional[str], meta: dict, filename: str, range: Optional[str],
+                              if_range: Optional[str], segmented: bool):
+    """
+    Serve a proxied video whose size is known: from the chunk cache when `key` is
+    set (missing chunks are fetched), otherwise straight from upstream.
+    The first piece is read before responding, so a dead upstream (expired token,
+    403) is a clean 502 instead of a truncated 200/206.
+    """
+    size = meta["size"]
+    if if_range and if_range not in (meta.get("etag"), meta.get("last_modified")):
+        range = None  # Client's copy is stale: send the whole file
+    try:
+        byte_range = parse_range(range, size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    start, end = byte_range or (0, size - 1)
+
+    fetch = _segments.fetch if segmented else _proxy.iter_range
+    if key:
+        body = _chunk_cache.stream_range(fetch, url, key, start, end)
+    else:
+        body = fetch(url, start, end, meta.get("etag"))
+
+    try:
+        first = await body.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except Exception as e:
+        await body.aclose()
+        raise upstream_failure(e, "Upstream request")
+
+    async def iterfile():
+        try:
+            yield first
+            async for chunk in body:
+                yield chunk
+        except Exception as e:
+            print(f"Proxy error: {e}")
+        finally:
+            await body.aclose()
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Content-Length": str(end - start + 1),
+        "Accept-Ranges": "bytes",
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if meta.get("etag"):
+        headers["ETag"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["Last-Modified"] = meta["last_modified"]
+    return StreamingResponse(iterfile(), status_code=206 if byte_range else 200,
+                             media_type="application/octet-stream", headers=headers)
+
+def proxied_playlist_uri(url: str) -> str:
+    # Relative to the playlist's own /api/proxy URL, so it works behind any host or prefix
+    return f"proxy?url={quote(url, safe='')}"
+
+def proxied_segment_uri(url: str) -> str:
+    return f"proxy/hls/segment?url={quote(url, safe='')}"
+
+async def hls_response(url: str, filename: str, mode: str, remux: Optional[bool]):
+    """
+    Serve an HLS source: mode "playlist" returns the rewritten m3u8 for players,
+    mode "file" joins every segment into one download (remuxed to MP4 with ffmpeg when available)
+    """
+    if mode == "playlist":
+        try:
+            text = await _hls.playlist(url, proxied_playlist_uri, proxied_segment_uri)
+        except Exception as e:
+            raise upstream_failure(e, "Playlist request")
+        return Response(content=text, media_type="application/vnd.apple.mpegurl",
+                        headers={"Cache-Control": "no-cache"})
+    
+    try:
+        playlist = await _hls.media_playlist(url)
+    except Exception as e:
+        raise upstream_failure(e, "Playlist request")
+    if playlist.encrypted:
+        raise HTTPException(status_code=422, detail="Encrypted HLS streams can only be played, not downloaded as a file")
+    
+    if remux is None:
+        remux = FFMPEG_PATH is not None and not playlist.fragmented_mp4
+    if remux and not FFMPEG_PATH:
+        raise HTTPException(status_code=422, detail="Remuxing needs ffmpeg on the server")
+    body = _hls.iter_file(playlist)
+    if remux:
+        body = _hls.remux(body)
+    
+    extension = ".mp4" if remux or playlist.fragmented_mp4 else ".ts"
+    filename = os.path.splitext(filename or url.split('/')[-1].split('?')[0])[0] + extension
+
+    async def iterfile():
+        try:
+            async for chunk in body:
+                yield chunk
+        except Exception as e:
+            print(f"Proxy error: {e}")
+
+    return StreamingResponse(iterfile(), media_type="video/mp4" if extension == ".mp4" else "video/mp2t",
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+async def startup():
+    await _proxy.start()
+    if _chunk_cache.enabled:
+        _chunk_cache.load()
+
+async def shutdown():
+    await _flights.close()
+    await _proxy.close()
     if _scraper and _scraper.browser_manager:
         print("[SHUTDOWN] Closing browser...", flush=True)
-        _scraper.browser_manager.close()
+        await _scraper.close()
+    db.close_db_connections()
+
+# Upstream response headers relayed to the client (resume/seek + validators)
+PROXY_PASSTHROUGH_HEADERS = ("Content-Length", "Content-Range", "Accept-Ranges", "ETag", "Last-Modified")
 
 @router.get("/proxy")
-async def proxy_download(url: str, filename: str = None):
+async def proxy_download(url: str, filename: str = None, segmented: Optional[bool] = None,
+                         hls: Optional[str] = None, remux: Optional[bool] = None,
+                         range: Optional[str] = Header(None), if_range: Optional[str] = Header(None)):
     """
-    Proxy file download to bypass CORS/Referer checks
+    Proxy file download to bypass CORS/Referer checks.
+    Range/If-Range are forwarded, so players can seek and interrupted downloads resume (206).
+    `segmented` overrides whether large files are fetched over several connections.
+    HLS sources: `hls=playlist` (default without a filename) serves a rewritten m3u8,
+    `hls=file` (default with one) a single joined download; `remux` forces ffmpeg on/off.
     """
     if not url:
         raise HTTPException(status_code=400, detail="Missing URL")
-        
-    async def iterfile():
-        async with httpx.AsyncClient(verify=False, follow_redirects=True) as client:
-            # Basic headers to look like a browser
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Referer": "https://forafile.com/" # Try generic referer
-            }
-            try:
-                async with client.stream("GET", url, headers=headers) as response:
-                    response.raise_for_status()
-                    async for chunk in response.aiter_bytes():
-                        yield chunk
-            except Exception as e:
-                print(f"Proxy error: {e}")
-                pass
-
+    if hls not in (None, "playlist", "file"):
+        raise HTTPException(status_code=400, detail="hls must be 'playlist' or 'file'")
+    hls_mode = hls or ("file" if filename else "playlist")
+    
+    if is_playlist(url):
+        return await hls_response(url, filename, hls_mode, remux)
+    
     if not filename:
-        filename = url.split('/')[-1]
+        filename = url.split('/')[-1].split('?')[0]
+    
+    key = cache_key(url) if _chunk_cache.enabled else None
+    meta = _chunk_cache.meta(key) if key else None
+    if segmented is None:
+        segmented = _segments.enabled
+    if meta:
+        return await known_size_response(url, key, meta, filename, range, if_range, segmented)
+    
+    upstream_headers = {}
+    if range:
+        upstream_headers["Range"] = range
+        if if_range:
+            upstream_headers["If-Range"] = if_range
+    
+    try:
+        upstream = await _proxy.open(url, headers=upstream_headers)
+    except Exception as e:
+        raise upstream_failure(e, "Upstream request")
+    
+    if upstream.status_code == 416:
+        # Requested range starts past the end of the file
+        headers = {"Content-Range": upstream.headers.get("Content-Range", "bytes */*")}
+        await _proxy.close_response(upstream)
+        return Response(status_code=416, headers=headers)
+    
+    if upstream.status_code >= 400:
+        await _proxy.close_response(upstream)
+        print(f"Proxy error: upstream returned {upstream.status_code}")
+        raise HTTPException(status_code=502, detail=f"Upstream returned {upstream.status_code}")
+    
+    if is_playlist(url, upstream.headers.get("Content-Type")):
+        # Playlist behind a URL without .m3u8 (e.g. a redirecting player link)
+        await _proxy.close_response(upstream)
+        return await hls_response(str(upstream.url), filename, hls_mode, remux)
+    
+    body = _proxy.iter_bytes(upstream)
+    extent = upstream_extent(upstream) if key or segmented else None
+    if extent:
+        offset, total = extent
+        meta = {"size": total, "etag": upstream.headers.get("ETag"),
+                "last_modified": upstream.headers.get("Last-Modified")}
+        if key:
+            _chunk_cache.set_meta(key, **meta)
+        accepts_ranges = upstream.status_code == 206 or upstream.headers.get("Accept-Ranges") == "bytes"
+        if segmented and accepts_ranges and total - offset >= _segments.min_size:
+            # Large file: drop this single stream and refetch it in parallel segments
+            await _proxy.close_response(upstream)
+            return await known_size_response(url, key, meta, filename, range, if_range, segmented)
+        if key:
+            # First request for this file: keep the whole chunks it streams
+            body = _chunk_cache.tee(key, offset, body)
+
+    async def iterfile():
+        try:
+            async for chunk in body:
+                yield chunk
+        except Exception as e:
+            print(f"Proxy error: {e}")
+        finally:
+            # Client disconnects close this generator, not the inner one: free the host slot now
+            await _proxy.close_response(upstream)
 
     headers = {
         "Content-Disposition": f'attachment; filename="{filename}"'
     }
+    for name in PROXY_PASSTHROUGH_HEADERS:
+        if name in upstream.headers:
+            headers[name] = upstream.headers[name]
+    if upstream.status_code == 206:
+        headers.setdefault("Accept-Ranges", "bytes")
+    if "Content-Encoding" in upstream.headers:
+        # aiter_bytes() decodes the body, so the upstream length no longer applies
+        headers.pop("Content-Length", None)
     
-    return StreamingResponse(iterfile(), media_type="application/octet-stream", headers=headers)
+    return StreamingResponse(iterfile(), status_code=upstream.status_code,
+                             media_type="application/octet-stream", headers=headers)
+
+@router.get("/proxy/hls/segment")
+async def proxy_hls_segment(url: str):
+    """
+    HLS segment, key or init section referenced by a playlist from /proxy.
+    Served from the segment cache when prefetched; the next segments are prefetched in turn.
+    """
+    try:
+        body, content_type = await _hls.segment(url)
+    except ResponseTooLarge as e:
+        print(f"Proxy error: {e}")
+        raise HTTPException(status_code=502, detail=f"Not an HLS segment (too large, fetch it via /api/proxy): {e}")
+    except Exception as e:
+        raise upstream_failure(e, "Segment request")
+    return Response(content=body, media_type=content_type or "video/mp2t",
+                    headers={"Cache-Control": "max-age=3600"})
 
 @router.post("/open-downloads")
 def open_downloads_folder():
@@ -219,3 +635,16 @@ def open_downloads_folder():
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "version": "4.2.0"}
+
+@router.get("/stats")
+async def scraper_stats():
+    """Scraper performance counters for tuning"""
+    stats = {"fast_path": {}, "metadata_probe": {}, "browser_pool": {}, "single_flight": _flights.stats(),
+             "series_cache": db.series_cache.stats(), "proxy": _proxy.stats(),
+             "chunk_cache": _chunk_cache.stats(), "segmented": _segments.stats(),
+             "hls": _hls.stats()}
+    if _scraper:
+        stats["fast_path"] = _scraper.fast_path_stats.snapshot()
+        stats["metadata_probe"] = _scraper.prober.stats()
+        stats["browser_pool"] = _scraper.browser_manager.pool_stats()
+    return stats
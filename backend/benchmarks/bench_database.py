@@ -0,0 +1,103 @@
+"""
+Micro-benchmark: SQLite cache operations per second,
+open-per-call (the old get_db_connection pattern) vs the persistent per-thread connection.
+Both run the same SQL on identically configured databases (same PRAGMAs, each
+variant on a fresh file); only the connection lifetime differs.
+
+Run from the project root:
+    python -m backend.benchmarks.bench_database [--ops 2000]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from backend import database as db
+
+SERIES_URL = "https://www.arabic-toons.com/bench-series.html"
+SELECT_SERIES_SQL = 'SELECT * FROM series WHERE url = ?'
+
+
+def episode_params(i: int) -> tuple:
+    return (SERIES_URL, i, f"Episode {i}", f"https://cdn/ep_{i}.mp4", 0, "", f"https://ep/{i}.html",
+            *db.video_info_values({}))
+
+
+def open_per_call() -> sqlite3.Connection:
+    """The original pattern: a new connection (with the same PRAGMAs) for every call"""
+    db.close_db_connections()
+    return db.get_db_connection()
+
+
+def upsert_episode(conn_for_call, i: int):
+    conn = conn_for_call()
+    conn.execute(db.UPSERT_EPISODE_SQL, episode_params(i))
+    conn.commit()
+
+
+def get_series(conn_for_call):
+    row = conn_for_call().execute(SELECT_SERIES_SQL, (SERIES_URL,)).fetchone()
+    return dict(row) if row else None
+
+
+def fresh_database(directory: str, name: str):
+    """Point the database module at a new, initialized file holding the bench series"""
+    db.close_db_connections()
+    db.DB_PATH = os.path.join(directory, f"{name}.db")
+    db.init_db()
+    db.upsert_series(SERIES_URL, "Bench Series", total_episodes=0)
+
+
+def batched_upsert_episodes(ops: int):
+    writer = db.EpisodeCacheWriter(SERIES_URL)
+    writer.set_series("Bench Series", ops)
+    for i in range(ops):
+        writer.add_episode(i, f"Episode {i}", f"https://cdn/ep_{i}.mp4", {}, 0, "", f"https://ep/{i}.html")
+        writer.maybe_flush()
+    writer.close()
+
+
+def measure(label: str, fn, ops: int) -> float:
+    started = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    elapsed = time.perf_counter() - started
+    rate = ops / elapsed
+    print(f"  {label:<28} {rate:>10,.0f} ops/sec  ({elapsed * 1000:.0f} ms for {ops})")
+    return rate
+
+
+def run(ops: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"SQLite cache benchmark ({ops} ops each, databases in {tmp})")
+        print("Writes (upsert_episode, one commit each):")
+        fresh_database(tmp, "open-per-call")
+        old_w = measure("open-per-call", lambda i: upsert_episode(open_per_call, i), ops)
+        old_path = db.DB_PATH
+        fresh_database(tmp, "persistent")
+        new_w = measure("persistent connection", lambda i: upsert_episode(db.get_db_connection, i), ops)
+        new_path = db.DB_PATH
+        fresh_database(tmp, "batched")
+        started = time.perf_counter()
+        batched_upsert_episodes(ops)
+        batch_w = ops / (time.perf_counter() - started)
+        print(f"  {'write-behind batches':<28} {batch_w:>10,.0f} ops/sec  ({db.EPISODE_FLUSH_ROWS} rows per commit)")
+
+        print("Reads (get_series):")
+        db.close_db_connections()
+        db.DB_PATH = old_path
+        old_r = measure("open-per-call", lambda i: get_series(open_per_call), ops)
+        db.close_db_connections()
+        db.DB_PATH = new_path
+        new_r = measure("persistent connection", lambda i: get_series(db.get_db_connection), ops)
+        print(f"Speed-up: writes x{new_w / old_w:.1f} (batched x{batch_w / old_w:.1f}), reads x{new_r / old_r:.1f}")
+
+        db.close_db_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per measurement")
+    run(parser.parse_args().ops)
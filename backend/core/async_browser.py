@@ -0,0 +1,183 @@
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from typing import Optional, List, Dict, AsyncIterator
+
+from .browser import USER_AGENT, POOL_IDLE_TIMEOUT, POOL_MAX_NAVIGATIONS, PooledPage
+
+logger = logging.getLogger(__name__)
+
+ASYNC_POOL_MAX_SIZE = 12  # One event loop can drive many pages at once
+
+
+class AsyncBrowserManager:
+    """
+    asyncio-native counterpart of BrowserManager (playwright.async_api).
+
+    Same pool semantics: isolated context/page pairs handed out by
+    `checkout()`/`checkin()` or the `page()` async context manager, bounded
+    size, idle eviction and recycling after N navigations. All pages are
+    driven from the event loop that started the manager.
+    """
+    def __init__(self, headless: bool = True, max_pool_size: int = ASYNC_POOL_MAX_SIZE,
+                 idle_timeout: float = POOL_IDLE_TIMEOUT, max_navigations: int = POOL_MAX_NAVIGATIONS):
+        self.headless = headless
+        self.playwright = None
+        self.browser: Optional[Browser] = None
+        self.max_pool_size = max(1, max_pool_size)
+        self.idle_timeout = idle_timeout
+        self.max_navigations = max_navigations
+        self._idle: List[PooledPage] = []
+        self._leased: Dict[int, PooledPage] = {}
+        self._creating = 0  # Pooled pages being created: counted against max_pool_size
+        self._start_lock = asyncio.Lock()
+        self._stats = {"created": 0, "reused": 0, "recycled": 0, "evicted": 0, "overflow": 0}
+
+    async def start(self):
+        """Start Playwright and launch browser"""
+        async with self._start_lock:
+            if not self.playwright:
+                self.playwright = await async_playwright().start()
+
+            if not self.browser:
+                self.browser = await self.playwright.chromium.launch(
+                    headless=self.headless,
+                    args=['--no-sandbox', '--disable-setuid-sandbox']
+                )
+
+    async def _create_entry(self, pooled: bool) -> PooledPage:
+        if not self.browser:
+            await self.start()
+
+        context = await self.browser.new_context(user_agent=USER_AGENT)
+        page = await context.new_page()
+        entry = PooledPage(context=context, page=page, pooled=pooled)
+
+        def on_navigation(frame):
+            if frame == page.main_frame:
+                entry.navigations += 1
+
+        async def on_popup(popup):
+            # Pooled contexts hold exactly one page; anything else is an ad popup
+            if popup != page:
+                try:
+                    await popup.close()
+                except Exception as e:
+                    logger.debug(f"Error closing popup: {e}")
+
+        page.on("framenavigated", on_navigation)
+        context.on("page", on_popup)
+        self._stats["created"] += 1
+        return entry
+
+    async def _dispose(self, entry: PooledPage):
+        try:
+            await entry.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled context: {e}")
+
+    async def evict_idle(self):
+        """Close pooled pages that have been idle longer than `idle_timeout`"""
+        now = time.monotonic()
+        expired = [e for e in self._idle if now - e.last_used > self.idle_timeout or e.page.is_closed()]
+        self._idle = [e for e in self._idle if e not in expired]
+        for entry in expired:
+            await self._dispose(entry)
+            self._stats["evicted"] += 1
+
+    async def checkout(self) -> Page:
+        """Take a page from the pool, creating one if none is idle"""
+        await self.evict_idle()
+
+        if self._idle:
+            entry = self._idle.pop()
+            self._stats["reused"] += 1
+        elif len(self._leased) + self._creating < self.max_pool_size:
+            # Reserve the slot before awaiting, or concurrent callers all pass the size check
+            self._creating += 1
+            try:
+                entry = await self._create_entry(pooled=True)
+            finally:
+                self._creating -= 1
+        else:
+            # Pool exhausted: hand out a throwaway page that is closed on checkin
+            entry = await self._create_entry(pooled=False)
+            self._stats["overflow"] += 1
+
+        entry.last_used = time.monotonic()
+        self._leased[id(entry.page)] = entry
+        return entry.page
+
+    async def checkin(self, page: Page):
+        """Return a page to the pool, recycling it if it is spent"""
+        entry = self._leased.pop(id(page), None)
+        if entry is None:
+            try:
+                await page.close()
+            except Exception:
+                pass
+            return
+
+        if not entry.pooled or page.is_closed() or len(self._idle) >= self.max_pool_size:
+            await self._dispose(entry)
+            return
+
+        if entry.navigations >= self.max_navigations:
+            await self._dispose(entry)
+            self._stats["recycled"] += 1
+            return
+
+        try:
+            # Drop per-use state (ad-blocking routes, running media) before reuse
+            await page.unroute("**/*")
+            await page.goto("about:blank")
+        except Exception as e:
+            logger.debug(f"Failed to reset pooled page, discarding: {e}")
+            await self._dispose(entry)
+            return
+
+        entry.last_used = time.monotonic()
+        self._idle.append(entry)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Check out a pooled page for the duration of the block"""
+        page = await self.checkout()
+        try:
+            yield page
+        finally:
+            await self.checkin(page)
+
+    def pool_stats(self) -> Dict:
+        return {
+            **self._stats,
+            "idle": len(self._idle),
+            "leased": len(self._leased),
+            "creating": self._creating,
+            "max_size": self.max_pool_size,
+        }
+
+    async def close(self):
+        """Close browser and stop Playwright"""
+        entries = self._idle + list(self._leased.values())
+        self._idle = []
+        self._leased = {}
+        for entry in entries:
+            await self._dispose(entry)
+
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+
+        self.browser = None
+        self.playwright = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
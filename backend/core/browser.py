@@ -1,22 +1,59 @@
+
+import time
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
-from typing import Optional
+from typing import Optional, List, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Page pool defaults
+POOL_MAX_SIZE = 4            # Pooled context/page pairs kept per browser
+POOL_IDLE_TIMEOUT = 120      # Seconds an idle page may sit in the pool before eviction
+POOL_MAX_NAVIGATIONS = 50    # Recycle a page (and its context) after this many navigations
+
+
+@dataclass
+class PooledPage:
+    """A context/page pair tracked by the pool"""
+    context: BrowserContext
+    page: Page
+    pooled: bool = True
+    navigations: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
 
 class BrowserManager:
     """
     Manages Playwright browser instance and contexts.
     Singleton-like behavior to reuse browser across requests if needed.
+
+    Pages are handed out from a pool via `checkout()`/`checkin()` (or the `page()`
+    context manager). Each pooled page owns an isolated context; any extra tab opened
+    in that context is treated as a popup and closed. Like sync Playwright itself,
+    a manager must only be used from the thread that started it.
     """
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, max_pool_size: int = POOL_MAX_SIZE,
+                 idle_timeout: float = POOL_IDLE_TIMEOUT, max_navigations: int = POOL_MAX_NAVIGATIONS):
         self.headless = headless
         self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
+        self.max_pool_size = max(1, max_pool_size)
+        self.idle_timeout = idle_timeout
+        self.max_navigations = max_navigations
+        self._idle: List[PooledPage] = []
+        self._leased: Dict[int, PooledPage] = {}
+        self._stats = {"created": 0, "reused": 0, "recycled": 0, "evicted": 0, "overflow": 0}
 
     def start(self):
         """Start Playwright and launch browser"""
         if not self.playwright:
             self.playwright = sync_playwright().start()
-        
+
         if not self.browser:
             self.browser = self.playwright.chromium.launch(
                 headless=self.headless,
@@ -24,24 +61,140 @@ class BrowserManager:
             )
 
     def get_context(self) -> BrowserContext:
-        """Get a new or existing browser context"""
+        """Get the shared browser context (prefer `page()` for pooled, isolated pages)"""
+        if not self.browser:
+            self.start()
+
+        if not self.context:
+            self.context = self.browser.new_context(user_agent=USER_AGENT)
+        return self.context
+
+    # ============ PAGE POOL ============
+
+    def _create_entry(self, pooled: bool) -> PooledPage:
         if not self.browser:
             self.start()
-        
-        # Create new context for isolation (or reuse if strategy changes)
-        return self.browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
+
+        context = self.browser.new_context(user_agent=USER_AGENT)
+        page = context.new_page()
+        entry = PooledPage(context=context, page=page, pooled=pooled)
+
+        def on_navigation(frame):
+            if frame == page.main_frame:
+                entry.navigations += 1
+
+        def on_popup(popup):
+            # Pooled contexts hold exactly one page; anything else is an ad popup
+            if popup != page:
+                try:
+                    popup.close()
+                except Exception as e:
+                    logger.debug(f"Error closing popup: {e}")
+
+        page.on("framenavigated", on_navigation)
+        context.on("page", on_popup)
+        self._stats["created"] += 1
+        return entry
+
+    def _dispose(self, entry: PooledPage):
+        try:
+            entry.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled context: {e}")
+
+    def evict_idle(self):
+        """Close pooled pages that have been idle longer than `idle_timeout`"""
+        now = time.monotonic()
+        keep = []
+        for entry in self._idle:
+            if now - entry.last_used > self.idle_timeout or entry.page.is_closed():
+                self._dispose(entry)
+                self._stats["evicted"] += 1
+            else:
+                keep.append(entry)
+        self._idle = keep
+
+    def checkout(self) -> Page:
+        """Take a page from the pool, creating one if none is idle"""
+        self.evict_idle()
+
+        if self._idle:
+            entry = self._idle.pop()
+            self._stats["reused"] += 1
+        elif len(self._leased) < self.max_pool_size:
+            entry = self._create_entry(pooled=True)
+        else:
+            # Pool exhausted: hand out a throwaway page that is closed on checkin
+            entry = self._create_entry(pooled=False)
+            self._stats["overflow"] += 1
+
+        entry.last_used = time.monotonic()
+        self._leased[id(entry.page)] = entry
+        return entry.page
+
+    def checkin(self, page: Page):
+        """Return a page to the pool, recycling it if it is spent"""
+        entry = self._leased.pop(id(page), None)
+        if entry is None:
+            # Not one of ours
+            try:
+                page.close()
+            except Exception:
+                pass
+            return
+
+        if not entry.pooled or page.is_closed() or len(self._idle) >= self.max_pool_size:
+            self._dispose(entry)
+            return
+
+        if entry.navigations >= self.max_navigations:
+            self._dispose(entry)
+            self._stats["recycled"] += 1
+            return
+
+        try:
+            # Drop per-use state (ad-blocking routes, running media) before reuse
+            page.unroute("**/*")
+            page.goto("about:blank")
+        except Exception as e:
+            logger.debug(f"Failed to reset pooled page, discarding: {e}")
+            self._dispose(entry)
+            return
+
+        entry.last_used = time.monotonic()
+        self._idle.append(entry)
+
+    @contextmanager
+    def page(self) -> Iterator[Page]:
+        """Check out a pooled page for the duration of the block"""
+        page = self.checkout()
+        try:
+            yield page
+        finally:
+            self.checkin(page)
+
+    def pool_stats(self) -> Dict:
+        return {
+            **self._stats,
+            "idle": len(self._idle),
+            "leased": len(self._leased),
+            "max_size": self.max_pool_size,
+        }
 
     def close(self):
         """Close browser and stop Playwright"""
+        for entry in self._idle + list(self._leased.values()):
+            self._dispose(entry)
+        self._idle = []
+        self._leased = {}
+
         if self.context:
             self.context.close()
         if self.browser:
             self.browser.close()
         if self.playwright:
             self.playwright.stop()
-        
+
         self.context = None
         self.browser = None
         self.playwright = None
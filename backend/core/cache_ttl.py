@@ -0,0 +1,98 @@
+"""
+Adaptive per-series cache TTL
+Airing shows (new episodes every few days) get short TTLs, finished shows
+back off towards CACHE_TTL_MAX, and no TTL outlives the CDN tokens
+(`expires`-style query parameters) of the cached video URLs
+"""
+
+import time
+from typing import Dict, Iterable, Optional
+
+CACHE_TTL_DEFAULT = 24 * 3600       # No history yet
+CACHE_TTL_MIN = 1 * 3600
+CACHE_TTL_MAX = 30 * 24 * 3600      # Finished shows
+CHANGE_INTERVAL_WEIGHT = 0.5        # EWMA weight of the newest interval between changes
+CHANGE_INTERVAL_FRACTION = 0.25     # Re-check ~4 times per typical gap between new episodes
+UNCHANGED_BACKOFF = 2.0             # TTL multiplier per consecutive refresh with nothing new
+TOKEN_EXPIRY_MARGIN = 15 * 60       # Refresh this long before the first token expires
+
+# Query parameters that carry an absolute expiry time (unix seconds)
+EXPIRY_PARAMS = ("expires", "expire", "exp", "e", "expiry", "validto")
+
+
+def token_expiry(parameters: Optional[Dict]) -> Optional[float]:
+    """Absolute expiry (unix seconds) from a video URL's query parameters, if it has one"""
+    for key, value in (parameters or {}).items():
+        if key.lower() not in EXPIRY_PARAMS:
+            continue
+        try:
+            expiry = float(value)
+        except (TypeError, ValueError):
+            continue
+        if expiry > 1e12:  # Milliseconds
+            expiry /= 1000
+        if expiry > 1e9:   # Plausible unix time, not a duration or flag
+            return expiry
+    return None
+
+
+def earliest_expiry(parameter_sets: Iterable[Optional[Dict]]) -> Optional[float]:
+    expiries = [e for e in (token_expiry(p) for p in parameter_sets) if e]
+    return min(expiries) if expiries else None
+
+
+def next_refresh_state(series: Optional[Dict], new_episodes: int, expires_at: Optional[float] = None,
+                       now: Optional[float] = None) -> Dict:
+    """
+    Fold one completed refresh into a series' change history and derive its TTL
+
+    Args:
+        series: Current series row (ttl/change-history columns may be missing or NULL)
+        new_episodes: Episodes that were not cached before this refresh
+        expires_at: Earliest CDN token expiry among the cached video URLs
+        now: Current unix time (for tests)
+
+    Returns:
+        Column values: ttl_seconds, last_changed_at, change_interval, unchanged_refreshes, links_expire_at
+    """
+    now = time.time() if now is None else now
+    series = series or {}
+    last_changed = series.get("last_changed_at")
+    interval = series.get("change_interval")
+    unchanged = series.get("unchanged_refreshes") or 0
+
+    if new_episodes or last_changed is None:
+        if new_episodes and last_changed is not None:
+            gap = max(0.0, now - last_changed)
+            interval = gap if interval is None else (
+                CHANGE_INTERVAL_WEIGHT * gap + (1 - CHANGE_INTERVAL_WEIGHT) * interval)
+        last_changed = now
+        unchanged = 0
+    else:
+        unchanged += 1
+
+    ttl = interval * CHANGE_INTERVAL_FRACTION if interval else CACHE_TTL_DEFAULT
+    ttl *= UNCHANGED_BACKOFF ** unchanged
+    ttl = min(max(ttl, CACHE_TTL_MIN), CACHE_TTL_MAX)
+
+    if expires_at:
+        # Serving expired links is worse than an early re-scrape, but never drop below
+        # CACHE_TTL_MIN: short-lived tokens would make every hit stale. Links inside
+        # the expiry margin are kept out of responses by links_expired() instead.
+        ttl = min(ttl, max(expires_at - now - TOKEN_EXPIRY_MARGIN, CACHE_TTL_MIN))
+
+    return {
+        "ttl_seconds": int(ttl),
+        "last_changed_at": last_changed,
+        "change_interval": interval,
+        "unchanged_refreshes": unchanged,
+        "links_expire_at": expires_at,
+    }
+
+
+def links_expired(links_expire_at: Optional[float], now: Optional[float] = None) -> bool:
+    """True once cached video URLs are within TOKEN_EXPIRY_MARGIN of their token expiry"""
+    if not links_expire_at:
+        return False
+    now = time.time() if now is None else now
+    return now >= links_expire_at - TOKEN_EXPIRY_MARGIN
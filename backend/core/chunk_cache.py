@@ -0,0 +1,286 @@
+"""
+Disk chunk cache for proxied videos
+Stores video bytes as fixed-size chunks keyed by the URL minus its token parameters, serves
+byte ranges from disk, fills gaps from upstream and evicts LRU under a disk budget
+"""
+
+import os
+import json
+import hashlib
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+
+from .proxy import UpstreamChanged
+from .utils import strip_token_params
+
+logger = logging.getLogger(__name__)
+
+CHUNK_CACHE_ENABLED = True
+CHUNK_CACHE_DIR = "video_cache"
+CHUNK_CACHE_CHUNK_SIZE = 1024 * 1024        # Bytes per chunk file
+CHUNK_CACHE_MAX_BYTES = 2 * 1024 ** 3       # Disk budget for chunk files
+
+# fetch(url, start, end, etag) -> the bytes start..end (ProxyClient.iter_range or SegmentedFetcher.fetch)
+RangeFetch = Callable[[str, int, int, Optional[str]], AsyncIterator[bytes]]
+
+META_FILE = "meta.json"
+CHUNK_SUFFIX = ".chunk"
+
+
+def cache_key(url: str) -> str:
+    """Chunk cache key: the video URL without its expiring token parameters"""
+    return hashlib.sha1(strip_token_params(url).encode()).hexdigest()
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `bytes=` Range header against a known size
+
+    Returns:
+        (start, end) inclusive, or None when the header is absent, malformed or
+        multi-range (serve the whole file). Raises ValueError if unsatisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, dash, last = header[len("bytes="):].strip().partition("-")
+    if not dash or (first and not first.isdigit()) or (last and not last.isdigit()) or not (first or last):
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError(f"Range {header} not satisfiable")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(f"Range {header} not satisfiable for {size} bytes")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class ChunkCache:
+    """
+    Chunk store on disk: <root>/<key>/<index>.chunk plus a meta.json with
+    the file size and validators. Only complete chunks are written, so a
+    chunk file on disk is always servable as-is.
+    """
+
+    def __init__(self, root: str = CHUNK_CACHE_DIR, chunk_size: int = CHUNK_CACHE_CHUNK_SIZE,
+                 max_bytes: int = CHUNK_CACHE_MAX_BYTES, enabled: bool = CHUNK_CACHE_ENABLED):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[Tuple[str, int], int]" = OrderedDict()
+        self._meta: Dict[str, Dict] = {}
+        self._bytes = 0
+        self._loaded = False
+        self._stats = {"hit_bytes": 0, "miss_bytes": 0, "stored_chunks": 0, "evicted_chunks": 0}
+
+    def _dir(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def _chunk_path(self, key: str, index: int) -> str:
+        return os.path.join(self._dir(key), f"{index}{CHUNK_SUFFIX}")
+
+    def load(self):
+        """Index chunks already on disk (oldest access first) so the budget survives restarts"""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not os.path.isdir(self.root):
+                return
+            found = []
+            for key in os.listdir(self.root):
+                directory = self._dir(key)
+                try:
+                    with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+                        self._meta[key] = json.load(f)
+                    names = os.listdir(directory)
+                except (OSError, ValueError):
+                    continue
+                for name in names:
+                    if not name.endswith(CHUNK_SUFFIX):
+                        continue
+                    stat = os.stat(os.path.join(directory, name))
+                    found.append((stat.st_mtime, key, int(name[:-len(CHUNK_SUFFIX)]), stat.st_size))
+            for _, key, index, size in sorted(found):
+                self._lru[(key, index)] = size
+                self._bytes += size
+        logger.info(f"Chunk cache: {len(self._lru)} chunks, {self._bytes // (1024 * 1024)} MB in {self.root}")
+
+    def meta(self, key: str) -> Optional[Dict]:
+        self.load()
+        with self._lock:
+            return self._meta.get(key)
+
+    def set_meta(self, key: str, size: int, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Record the file size and validators; a changed file drops its old chunks"""
+        meta = {"size": size, "etag": etag, "last_modified": last_modified}
+        current = self.meta(key)
+        if current == meta:
+            return
+        if current is not None:
+            self.drop(key)
+        os.makedirs(self._dir(key), exist_ok=True)
+        with open(os.path.join(self._dir(key), META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        with self._lock:
+            self._meta[key] = meta
+
+    def has(self, key: str, index: int) -> bool:
+        with self._lock:
+            return (key, index) in self._lru
+
+    def read(self, key: str, index: int) -> Optional[bytes]:
+        with self._lock:
+            if (key, index) not in self._lru:
+                return None
+            self._lru.move_to_end((key, index))
+        try:
+            path = self._chunk_path(key, index)
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            self._forget(key, index)
+            return None
+
+    def write(self, key: str, index: int, data: bytes):
+        path = self._chunk_path(key, index)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self._dir(key), exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Chunk cache write failed for {key}/{index}: {e}")
+            return
+        with self._lock:
+            self._bytes += len(data) - self._lru.get((key, index), 0)
+            self._lru[(key, index)] = len(data)
+            self._lru.move_to_end((key, index))
+            self._stats["stored_chunks"] += 1
+        self._evict()
+
+    def _forget(self, key: str, index: int):
+        with self._lock:
+            self._bytes -= self._lru.pop((key, index), 0)
+
+    def _evict(self):
+        while True:
+            with self._lock:
+                if self._bytes <= self.max_bytes or not self._lru:
+                    return
+                (key, index), size = self._lru.popitem(last=False)
+                self._bytes -= size
+                self._stats["evicted_chunks"] += 1
+            try:
+                os.remove(self._chunk_path(key, index))
+            except OSError:
+                pass
+
+    def drop(self, key: str):
+        """Forget every chunk of one file (its upstream content changed)"""
+        with self._lock:
+            for entry in [e for e in self._lru if e[0] == key]:
+                self._bytes -= self._lru.pop(entry)
+            self._meta.pop(key, None)
+        directory = self._dir(key)
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def chunk_length(self, meta: Dict, index: int) -> int:
+        return min(self.chunk_size, meta["size"] - index * self.chunk_size)
+
+    async def tee(self, key: str, offset: int, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Pass an upstream body through unchanged, storing every whole chunk it covers"""
+        meta = self.meta(key)
+        index = -(-offset // self.chunk_size)  # First chunk boundary at or after offset
+        skip = index * self.chunk_size - offset
+        buffer = bytearray()
+        async for data in body:
+            self._stats["miss_bytes"] += len(data)
+            yield data
+            if meta is None:
+                continue
+            if skip:
+                dropped = min(skip, len(data))
+                data, skip = data[dropped:], skip - dropped
+            buffer.extend(data)
+            while index * self.chunk_size < meta["size"] and len(buffer) >= self.chunk_length(meta, index):
+                length = self.chunk_length(meta, index)
+                await asyncio.to_thread(self.write, key, index, bytes(buffer[:length]))
+                del buffer[:length]
+                index += 1
+
+    async def stream_range(self, fetch: RangeFetch, url: str, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """
+        Yield bytes start..end (inclusive): chunks on disk are read, runs of
+        missing ones are fetched with `fetch(url, first, last, etag)`
+        """
+        meta = self.meta(key)
+        index, last = start // self.chunk_size, end // self.chunk_size
+        while index <= last:
+            data = await asyncio.to_thread(self.read, key, index)
+            if data is not None:
+                piece = self._slice(index, data, start, end)
+                self._stats["hit_bytes"] += len(piece)
+                yield piece
+                index += 1
+                continue
+
+            run_end = index
+            while run_end < last and not self.has(key, run_end + 1):
+                run_end += 1
+            async for chunk_index, data in self._fetch_chunks(fetch, url, key, meta, index, run_end):
+                piece = self._slice(chunk_index, data, start, end)
+                self._stats["miss_bytes"] += len(piece)
+                yield piece
+            index = run_end + 1
+
+    def _slice(self, index: int, data: bytes, start: int, end: int) -> bytes:
+        base = index * self.chunk_size
+        return data[max(start - base, 0):end + 1 - base]
+
+    async def _fetch_chunks(self, fetch: RangeFetch, url: str, key: str, meta: Dict, first: int, last: int):
+        """Fetch chunks first..last as one upstream range, storing each as it completes"""
+        offset = first * self.chunk_size
+        stop = min((last + 1) * self.chunk_size, meta["size"]) - 1
+        index, buffer = first, bytearray()
+        try:
+            async for data in fetch(url, offset, stop, meta.get("etag")):
+                buffer.extend(data)
+                while index <= last and len(buffer) >= self.chunk_length(meta, index):
+                    length = self.chunk_length(meta, index)
+                    chunk = bytes(buffer[:length])
+                    del buffer[:length]
+                    await asyncio.to_thread(self.write, key, index, chunk)
+                    yield index, chunk
+                    index += 1
+        except UpstreamChanged:
+            self.drop(key)
+            raise
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "enabled": self.enabled,
+                "chunks": len(self._lru),
+                "files": len(self._meta),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "chunk_size": self.chunk_size,
+            }
@@ -0,0 +1,300 @@
+"""
+HLS proxying
+Rewrites m3u8 playlists so every URI goes back through the backend, prefetches
+the next segments into memory and joins a whole stream into one download
+"""
+
+import re
+import shutil
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from .proxy import ProxyClient
+
+logger = logging.getLogger(__name__)
+
+HLS_PREFETCH_SEGMENTS = 3              # Segments fetched ahead of the one requested
+HLS_CACHE_MAX_BYTES = 256 * 1024 ** 2  # In-memory segment cache budget
+HLS_MAX_TRACKED_SEGMENTS = 20000       # Segment -> next-segments entries kept for prefetching
+HLS_SEGMENT_MAX_BYTES = 32 * 1024 ** 2 # Bigger "segments" are refused (they are whole files: use /proxy)
+HLS_PLAYLIST_MAX_BYTES = 2 * 1024 ** 2
+HLS_MEDIA_TYPES = ("application/vnd.apple.mpegurl", "application/x-mpegurl", "audio/mpegurl", "audio/x-mpegurl")
+
+# Remuxing MPEG-TS into MP4 is optional: only when ffmpeg is on PATH
+FFMPEG_PATH = shutil.which("ffmpeg")
+FFMPEG_REMUX_ARGS = ["-hide_banner", "-loglevel", "error", "-i", "pipe:0", "-c", "copy", "-bsf:a", "aac_adtstoasc",
+                     "-f", "mp4", "-movflags", "frag_keyframe+empty_moov", "pipe:1"]
+FFMPEG_READ_SIZE = 64 * 1024
+FFMPEG_STDERR_TAIL = 4096              # Bytes of ffmpeg's log kept for the error message
+
+URI_ATTRIBUTE = re.compile(r'URI="([^"]+)"')
+BANDWIDTH_ATTRIBUTE = re.compile(r'(?:^|,)BANDWIDTH=(\d+)')
+
+
+def is_playlist(url: str, content_type: Optional[str] = None) -> bool:
+    """True for m3u8 URLs or responses served with an HLS media type"""
+    if urlparse(url).path.lower().endswith(".m3u8"):
+        return True
+    return bool(content_type) and content_type.split(";")[0].strip().lower() in HLS_MEDIA_TYPES
+
+
+@dataclass
+class Playlist:
+    """Absolute URIs found in one m3u8 playlist"""
+    url: str
+    variants: List[Tuple[int, str]] = field(default_factory=list)  # (bandwidth, url) of a master playlist
+    segments: List[str] = field(default_factory=list)
+    init_segment: Optional[str] = None  # EXT-X-MAP (fMP4 streams)
+    encrypted: bool = False
+    ended: bool = False                 # EXT-X-ENDLIST: the stream is complete (VOD)
+
+    @property
+    def is_master(self) -> bool:
+        return bool(self.variants)
+
+    @property
+    def fragmented_mp4(self) -> bool:
+        return self.init_segment is not None
+
+
+def parse_playlist(text: str, url: str) -> Playlist:
+    playlist = Playlist(url=url)
+    pending_bandwidth = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            if line.startswith("#EXT-X-STREAM-INF:"):
+                match = BANDWIDTH_ATTRIBUTE.search(line[len("#EXT-X-STREAM-INF:"):])
+                pending_bandwidth = int(match.group(1)) if match else 0
+            elif line.startswith("#EXT-X-MAP:"):
+                match = URI_ATTRIBUTE.search(line)
+                if match:
+                    playlist.init_segment = urljoin(url, match.group(1))
+            elif line.startswith("#EXT-X-KEY:") and "METHOD=NONE" not in line:
+                playlist.encrypted = True
+            elif line.startswith("#EXT-X-ENDLIST"):
+                playlist.ended = True
+            continue
+        if pending_bandwidth is not None:
+            playlist.variants.append((pending_bandwidth, urljoin(url, line)))
+            pending_bandwidth = None
+        else:
+            playlist.segments.append(urljoin(url, line))
+    return playlist
+
+
+def rewrite_playlist(text: str, url: str, playlist_uri: Callable[[str], str],
+                     resource_uri: Callable[[str], str]) -> str:
+    """
+    Point every URI of a playlist back at the proxy
+
+    Args:
+        text: Playlist body
+        url: Playlist URL (relative URIs resolve against it)
+        playlist_uri: Maps an absolute variant/rendition playlist URL to its proxied URI
+        resource_uri: Maps an absolute segment/key/init URL to its proxied URI
+    """
+    lines = []
+    next_is_playlist = False
+    for raw in text.splitlines():
+        line = raw.strip()
+        if line.startswith("#"):
+            if line.startswith(("#EXT-X-STREAM-INF:", "#EXT-X-I-FRAME-STREAM-INF:", "#EXT-X-MEDIA:")):
+                to_uri = playlist_uri
+                next_is_playlist = line.startswith("#EXT-X-STREAM-INF:")
+            else:
+                to_uri = resource_uri
+            line = URI_ATTRIBUTE.sub(lambda m: f'URI="{to_uri(urljoin(url, m.group(1)))}"', line)
+        elif line:
+            absolute = urljoin(url, line)
+            line = playlist_uri(absolute) if next_is_playlist or is_playlist(absolute) else resource_uri(absolute)
+            next_is_playlist = False
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+class SegmentCache:
+    """Byte-budgeted in-memory LRU of HLS segments: url -> (body, content type)"""
+
+    def __init__(self, max_bytes: int = HLS_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+    def get(self, url: str) -> Optional[Tuple[bytes, str]]:
+        entry = self._entries.get(url)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        self._entries.move_to_end(url)
+        return entry
+
+    def put(self, url: str, body: bytes, content_type: str):
+        if len(body) > self.max_bytes:
+            return
+        old = self._entries.pop(url, None)
+        if old:
+            self._bytes -= len(old[0])
+        self._entries[url] = (body, content_type)
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._stats["evicted"] += 1
+
+    def stats(self) -> Dict:
+        return {**self._stats, "segments": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+class HlsProxy:
+    """
+    HLS-aware side of /api/proxy.
+
+    - playlist() returns a playlist rewritten to fetch everything through the proxy
+      and remembers segment order, so segment() can prefetch the next `prefetch` ones
+    - Concurrent requests for the same segment share one upstream fetch
+    - iter_file() yields a whole VOD stream as one file (segments in order)
+    """
+
+    def __init__(self, proxy: ProxyClient, prefetch: int = HLS_PREFETCH_SEGMENTS,
+                 cache: Optional[SegmentCache] = None):
+        self.proxy = proxy
+        self.prefetch = prefetch
+        self.cache = cache or SegmentCache()
+        self._next: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"playlists": 0, "prefetched": 0, "files": 0, "remuxed": 0}
+
+    async def fetch_playlist(self, url: str) -> Tuple[str, Playlist]:
+        body, _ = await self.proxy.get(url, max_bytes=HLS_PLAYLIST_MAX_BYTES)
+        text = body.decode("utf-8", errors="replace")
+        if not text.lstrip().startswith("#EXTM3U"):
+            raise IOError(f"Not an HLS playlist: {url}")
+        self._stats["playlists"] += 1
+        return text, parse_playlist(text, url)
+
+    def _remember_order(self, playlist: Playlist):
+        urls = ([playlist.init_segment] if playlist.init_segment else []) + playlist.segments
+        for i, url in enumerate(urls):
+            self._next[url] = urls[i + 1:i + 1 + self.prefetch]
+            self._next.move_to_end(url)
+        while len(self._next) > HLS_MAX_TRACKED_SEGMENTS:
+            self._next.popitem(last=False)
+
+    async def playlist(self, url: str, playlist_uri: Callable[[str], str],
+                       resource_uri: Callable[[str], str]) -> str:
+        text, playlist = await self.fetch_playlist(url)
+        self._remember_order(playlist)
+        return rewrite_playlist(text, url, playlist_uri, resource_uri)
+
+    async def media_playlist(self, url: str) -> Playlist:
+        """Resolve a master playlist to its highest-bandwidth variant"""
+        _, playlist = await self.fetch_playlist(url)
+        if playlist.is_master:
+            _, variant = max(playlist.variants)
+            _, playlist = await self.fetch_playlist(variant)
+        self._remember_order(playlist)
+        return playlist
+
+    async def _fetch(self, url: str) -> Tuple[bytes, str]:
+        body, content_type = await self.proxy.get(url, max_bytes=HLS_SEGMENT_MAX_BYTES)
+        self.cache.put(url, body, content_type)
+        return body, content_type
+
+    def _start(self, url: str) -> asyncio.Future:
+        future = self._inflight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(url))
+            self._inflight[url] = future
+            future.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return future
+
+    def _prefetch(self, url: str):
+        for upcoming in self._next.get(url, []):
+            if upcoming not in self.cache and upcoming not in self._inflight:
+                self._stats["prefetched"] += 1
+                future = self._start(upcoming)
+                # Nobody may await a prefetch: keep its failure out of the "never retrieved" log
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    async def segment(self, url: str) -> Tuple[bytes, str]:
+        """Segment (or key / init section) bytes, from cache, a shared in-flight fetch or upstream"""
+        self._prefetch(url)
+        cached = self.cache.get(url)
+        if cached is not None:
+            return cached
+        # shield(): a client disconnect must not cancel a fetch other requests are waiting on
+        return await asyncio.shield(self._start(url))
+
+    async def iter_file(self, playlist: Playlist) -> AsyncIterator[bytes]:
+        """Yield the init section and every segment of a media playlist in order"""
+        self._stats["files"] += 1
+        for url in ([playlist.init_segment] if playlist.init_segment else []) + playlist.segments:
+            body, _ = await self.segment(url)
+            yield body
+
+    async def remux(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Pipe an MPEG-TS stream through ffmpeg into fragmented MP4 (no re-encoding)"""
+        process = await asyncio.create_subprocess_exec(
+            FFMPEG_PATH, *FFMPEG_REMUX_ARGS,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        self._stats["remuxed"] += 1
+
+        async def feed():
+            try:
+                async for chunk in chunks:
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                # ffmpeg exited early: its return code and stderr (checked below) say why
+                logger.warning("ffmpeg stopped reading its input")
+                await chunks.aclose()
+            finally:
+                process.stdin.close()
+
+        log = bytearray()
+
+        async def drain_stderr():
+            # A full stderr pipe would block ffmpeg: read it as it comes, keep the tail
+            while True:
+                data = await process.stderr.read(FFMPEG_READ_SIZE)
+                if not data:
+                    break
+                log.extend(data)
+                del log[:-FFMPEG_STDERR_TAIL]
+
+        feeder = asyncio.ensure_future(feed())
+        drainer = asyncio.ensure_future(drain_stderr())
+        try:
+            while True:
+                data = await process.stdout.read(FFMPEG_READ_SIZE)
+                if not data:
+                    break
+                yield data
+            await feeder  # Re-raises a failed segment fetch
+            if await process.wait() != 0:
+                await drainer
+                error = log.decode(errors="replace").strip()
+                logger.error(f"ffmpeg exited with {process.returncode}: {error}")
+                raise IOError(f"ffmpeg exited with {process.returncode}: {error}")
+        finally:
+            feeder.cancel()
+            drainer.cancel()
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    def stats(self) -> Dict:
+        return {**self._stats, "prefetch": self.prefetch, "inflight": len(self._inflight),
+                "remux_available": FFMPEG_PATH is not None, "cache": self.cache.stats()}
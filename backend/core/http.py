@@ -0,0 +1,235 @@
+"""
+Shared HTTP helpers
+Keep-alive sessions, per-host hit/miss counters and video metadata probing
+"""
+
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .browser import USER_AGENT
+
+HTTP_POOL_SIZE = 16  # Keep-alive connections kept per host
+
+# Video metadata probing
+PROBE_PER_HOST_LIMIT = 8   # Concurrent HEAD requests per host
+PROBE_MAX_WORKERS = 32     # Threads shared by all batch probes
+PROBE_CACHE_TTL = 300      # Seconds a probe result is reused
+PROBE_CACHE_SIZE = 5000
+
+
+def create_session(pool_maxsize: int = HTTP_POOL_SIZE, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Create a requests Session with a keep-alive connection pool
+
+    Args:
+        pool_maxsize: Connections kept open per host
+        headers: Default headers (a browser User-Agent is always set)
+
+    Returns:
+        Configured requests.Session (thread-safe for concurrent GET/HEAD)
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, **(headers or {})})
+    return session
+
+
+class HostStats:
+    """Thread-safe per-host counters of how often a fast path wins"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict] = {}
+
+    def record(self, url: str, hit: bool, elapsed_ms: float):
+        host = urlparse(url).netloc.lower() or "unknown"
+        with self._lock:
+            stats = self._hosts.setdefault(host, {"hits": 0, "misses": 0, "total_ms": 0.0})
+            stats["hits" if hit else "misses"] += 1
+            stats["total_ms"] += elapsed_ms
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            result = {}
+            for host, stats in self._hosts.items():
+                attempts = stats["hits"] + stats["misses"]
+                result[host] = {
+                    "hits": stats["hits"],
+                    "misses": stats["misses"],
+                    "hit_rate": round(stats["hits"] / attempts, 3) if attempts else 0.0,
+                    "avg_ms": round(stats["total_ms"] / attempts, 1) if attempts else 0.0,
+                }
+            return result
+
+
+
+def format_size(size_bytes: int) -> str:
+    gb = size_bytes / (1024**3)
+    mb = size_bytes / (1024**2)
+    return f"{gb:.2f} GB" if gb >= 1 else f"{mb:.2f} MB"
+
+
+class BaseMetadataProber:
+    """
+    State shared by the sync and async probers: TTL-bounded LRU of probe
+    results and counters. Subclasses add the transport and per-host limits.
+    """
+
+    def __init__(self, per_host_limit: int = PROBE_PER_HOST_LIMIT, cache_ttl: float = PROBE_CACHE_TTL,
+                 cache_size: int = PROBE_CACHE_SIZE, timeout: float = 10):
+        self.per_host_limit = per_host_limit
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Tuple[float, Optional[Dict]]]" = OrderedDict()
+        self._stats = {"probes": 0, "cache_hits": 0, "failures": 0}
+
+    def _cached(self, url: str):
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry and entry[0] > time.monotonic():
+                self._cache.move_to_end(url)
+                self._stats["cache_hits"] += 1
+                return True, entry[1]
+            if entry:
+                del self._cache[url]
+            return False, None
+
+    def _store(self, url: str, result: Optional[Dict]):
+        with self._lock:
+            self._stats["probes"] += 1
+            if result is None:
+                self._stats["failures"] += 1
+            self._cache[url] = (time.monotonic() + self.cache_ttl, result)
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "cached": len(self._cache)}
+
+
+class MetadataProber(BaseMetadataProber):
+    """
+    HEAD-probes video URLs over a shared keep-alive session.
+
+    - probe()/probe_many() return {size_bytes, size_formatted} or None when the URL is not a reachable file
+    - At most `per_host_limit` probes hit the same host at once
+    - Results are cached in memory for `cache_ttl` seconds
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, per_host_limit: int = PROBE_PER_HOST_LIMIT,
+                 cache_ttl: float = PROBE_CACHE_TTL, cache_size: int = PROBE_CACHE_SIZE, timeout: float = 10):
+        super().__init__(per_host_limit, cache_ttl, cache_size, timeout)
+        self.session = session or create_session()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def probe(self, url: str) -> Optional[Dict]:
+        hit, result = self._cached(url)
+        if hit:
+            return result
+
+        result = None
+        with self._host_limit(url):
+            try:
+                resp = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+                size = int(resp.headers.get('Content-Length', 0))
+                if resp.ok and size:
+                    result = {"size_bytes": size, "size_formatted": format_size(size)}
+            except Exception:
+                result = None
+
+        self._store(url, result)
+        return result
+
+    def probe_many(self, urls: List[str]) -> Dict[str, Optional[Dict]]:
+        """Probe a batch concurrently (bounded by the per-host limit); keys are the input URLs"""
+        unique = list(dict.fromkeys(urls))
+        if not unique:
+            return {}
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=PROBE_MAX_WORKERS, thread_name_prefix="probe")
+        return dict(zip(unique, self._executor.map(self.probe, unique)))
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def create_async_client(headers: Optional[Dict[str, str]] = None, max_connections: int = HTTP_POOL_SIZE * 4,
+                        timeout: float = 10) -> httpx.AsyncClient:
+    """httpx.AsyncClient counterpart of create_session"""
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT, **(headers or {})},
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=HTTP_POOL_SIZE),
+        timeout=timeout,
+        follow_redirects=True
+    )
+
+
+class AsyncMetadataProber(BaseMetadataProber):
+    """
+    MetadataProber counterpart for the asyncio path: same cache and per-host
+    limit, but probe()/probe_many() are coroutines running on an httpx.AsyncClient.
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, per_host_limit: int = PROBE_PER_HOST_LIMIT,
+                 cache_ttl: float = PROBE_CACHE_TTL, cache_size: int = PROBE_CACHE_SIZE, timeout: float = 10):
+        super().__init__(per_host_limit, cache_ttl, cache_size, timeout)
+        self.client = client or create_async_client(timeout=timeout)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def probe(self, url: str) -> Optional[Dict]:
+        hit, result = self._cached(url)
+        if hit:
+            return result
+
+        result = None
+        async with self._host_limit(url):
+            try:
+                resp = await self.client.head(url, timeout=self.timeout)
+                size = int(resp.headers.get('Content-Length', 0))
+                if resp.is_success and size:
+                    result = {"size_bytes": size, "size_formatted": format_size(size)}
+            except Exception:
+                result = None
+
+        self._store(url, result)
+        return result
+
+    async def probe_many(self, urls: List[str]) -> Dict[str, Optional[Dict]]:
+        unique = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.probe(url) for url in unique))
+        return dict(zip(unique, results))
+
+    async def close(self):
+        await self.client.aclose()
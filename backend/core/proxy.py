@@ -0,0 +1,258 @@
+"""
+Download proxy client
+One application-lifetime httpx client for /api/proxy: keep-alive pooling,
+optional HTTP/2, per-host stream limits and transfer counters
+"""
+
+import asyncio
+import importlib.util
+import logging
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from .browser import USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+PROXY_MAX_CONNECTIONS = 64        # Upstream connections across all hosts
+PROXY_MAX_KEEPALIVE = 16          # Idle connections kept warm
+PROXY_KEEPALIVE_EXPIRY = 60       # Seconds an idle connection is kept
+PROXY_PER_HOST_LIMIT = 8          # Concurrent proxied streams per upstream host
+PROXY_CHUNK_SIZE = 256 * 1024     # Bytes per chunk relayed to the client
+PROXY_CONNECT_TIMEOUT = 10        # Seconds
+PROXY_READ_TIMEOUT = 60           # Seconds without a byte before giving up
+PROXY_SLOT_TIMEOUT = 30           # Seconds to wait for a free per-host slot before giving up
+PROXY_REFERER = "https://forafile.com/"
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class UpstreamChanged(IOError):
+    """The upstream file no longer matches the validator it was fetched with"""
+
+
+class ProxyBusy(Exception):
+    """Every per-host slot stayed taken for PROXY_SLOT_TIMEOUT seconds"""
+
+
+class ResponseTooLarge(IOError):
+    """An upstream body read into memory is bigger than the caller allows"""
+
+
+class ProxyClient:
+    """
+    Shared upstream client for proxied downloads.
+
+    - start()/close() are called from the app lifespan; open() starts lazily if needed
+    - open() returns a streaming response holding a per-host slot until close_response(response);
+      it raises ProxyBusy if no slot frees up within `slot_timeout` seconds
+    - iter_bytes() relays the body in `chunk_size` chunks and releases the slot when done
+    - reserve()/release() hold slots across several requests; open(reserved=True) runs
+      in one of them and leaves it held when the response closes
+    """
+
+    def __init__(self, max_connections: int = PROXY_MAX_CONNECTIONS, max_keepalive: int = PROXY_MAX_KEEPALIVE,
+                 per_host_limit: int = PROXY_PER_HOST_LIMIT, chunk_size: int = PROXY_CHUNK_SIZE,
+                 http2: Optional[bool] = None, slot_timeout: float = PROXY_SLOT_TIMEOUT):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.per_host_limit = per_host_limit
+        self.chunk_size = chunk_size
+        self.slot_timeout = slot_timeout
+        self.http2 = HTTP2_AVAILABLE if http2 is None else (http2 and HTTP2_AVAILABLE)
+        self.client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._open: Dict[int, str] = {}
+        self._reserved_responses: Set[int] = set()
+        self._stats = {"requests": 0, "errors": 0, "bytes": 0, "waited": 0, "busy": 0}
+
+    async def start(self):
+        if self.client is not None:
+            return
+        self.client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT, "Referer": PROXY_REFERER},
+            limits=httpx.Limits(max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_keepalive,
+                                keepalive_expiry=PROXY_KEEPALIVE_EXPIRY),
+            timeout=httpx.Timeout(PROXY_READ_TIMEOUT, connect=PROXY_CONNECT_TIMEOUT),
+            http2=self.http2,
+            verify=False,
+            follow_redirects=True
+        )
+        logger.info(f"Proxy client started (http2={'on' if self.http2 else 'off'}, "
+                    f"{self.max_connections} connections, {self.per_host_limit} streams per host)")
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def _acquire(self, host: str):
+        limit = self._host_limit(host)
+        if limit.locked():
+            self._stats["waited"] += 1
+        try:
+            # Long-lived streams (paused players) hold their slot: don't queue forever behind them
+            await asyncio.wait_for(limit.acquire(), self.slot_timeout)
+        except asyncio.TimeoutError:
+            self._stats["busy"] += 1
+            raise ProxyBusy(f"All {self.per_host_limit} streams to {host} busy for {self.slot_timeout:g}s")
+
+    async def reserve(self, url: str, count: int, wait: bool = True) -> int:
+        """
+        Take up to `count` slots for `url`'s host; the caller must release() them
+
+        With `wait`, the first slot is waited for (ProxyBusy after `slot_timeout`);
+        the others are only taken if free right now. Returns the number taken.
+        """
+        host = urlparse(url).netloc.lower()
+        taken = 0
+        if wait and count > 0:
+            await self._acquire(host)
+            taken = 1
+        limit = self._host_limit(host)
+        while taken < count and not limit.locked():
+            await limit.acquire()  # Free: returns without waiting
+            taken += 1
+        return taken
+
+    def release(self, url: str, count: int = 1):
+        limit = self._host_limit(urlparse(url).netloc.lower())
+        for _ in range(count):
+            limit.release()
+
+    async def open(self, url: str, headers: Optional[Dict[str, str]] = None,
+                   reserved: bool = False) -> httpx.Response:
+        """
+        Send a streaming GET; the caller must close_response(response) or drain iter_bytes(response)
+
+        `reserved`: the caller already holds a slot from reserve() (kept when the response closes)
+        """
+        await self.start()
+        host = urlparse(url).netloc.lower()
+        if not reserved:
+            await self._acquire(host)
+
+        self._stats["requests"] += 1
+        try:
+            response = await self.client.send(self.client.build_request("GET", url, headers=headers), stream=True)
+        except Exception:
+            if not reserved:
+                self._host_limit(host).release()
+            self._stats["errors"] += 1
+            raise
+        self._open[id(response)] = host
+        if reserved:
+            self._reserved_responses.add(id(response))
+        return response
+
+    async def iter_bytes(self, response: httpx.Response) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in response.aiter_bytes(self.chunk_size):
+                self._stats["bytes"] += len(chunk)
+                yield chunk
+        finally:
+            await self.close_response(response)
+
+    async def get(self, url: str, max_bytes: int) -> Tuple[bytes, str]:
+        """
+        Read a small upstream resource whole (playlists, HLS segments): (body, content type)
+
+        Raises ResponseTooLarge as soon as the body is known to exceed `max_bytes`
+        (from Content-Length, or while reading), so nothing bigger is buffered.
+        """
+        response = await self.open(url)
+        try:
+            if response.status_code >= 400:
+                raise IOError(f"Upstream returned {response.status_code} for {url}")
+            length = response.headers.get("Content-Length", "")
+            if length.isdigit() and int(length) > max_bytes:
+                raise ResponseTooLarge(f"{url} is {length} bytes (limit {max_bytes})")
+            body = bytearray()
+            async for chunk in response.aiter_bytes(self.chunk_size):
+                body.extend(chunk)
+                if len(body) > max_bytes:
+                    raise ResponseTooLarge(f"{url} is over {max_bytes} bytes")
+            self._stats["bytes"] += len(body)
+            return bytes(body), response.headers.get("Content-Type", "")
+        finally:
+            await self.close_response(response)
+
+    async def iter_range(self, url: str, start: int, end: int, etag: Optional[str] = None,
+                         reserved: bool = False) -> AsyncIterator[bytes]:
+        """
+        Yield exactly bytes start..end (inclusive) of `url`
+
+        Raises IOError on an upstream error or short body, UpstreamChanged if the
+        ETag differs from `etag`. An upstream that ignores Range is read from byte 0.
+        `reserved` is passed to open().
+        """
+        response = await self.open(url, headers={"Range": f"bytes={start}-{end}"}, reserved=reserved)
+        try:
+            if response.status_code not in (200, 206):
+                raise IOError(f"Upstream returned {response.status_code} for range {start}-{end}")
+            current = response.headers.get("ETag")
+            if etag and current and current != etag:
+                raise UpstreamChanged(f"ETag changed from {etag} to {current}")
+
+            skip = start if response.status_code == 200 else 0
+            remaining = end - start + 1
+            async for data in self.iter_bytes(response):
+                if skip:
+                    dropped = min(skip, len(data))
+                    data, skip = data[dropped:], skip - dropped
+                if len(data) > remaining:
+                    data = data[:remaining]
+                if data:
+                    remaining -= len(data)
+                    yield data
+                if not remaining:
+                    break
+            if remaining:
+                raise IOError(f"Upstream ended {remaining} bytes short of range {start}-{end}")
+        finally:
+            await self.close_response(response)
+
+    async def close_response(self, response: httpx.Response):
+        await response.aclose()
+        host = self._open.pop(id(response), None)
+        if host is not None and id(response) not in self._reserved_responses:
+            self._host_limit(host).release()
+        self._reserved_responses.discard(id(response))
+
+    def stats(self) -> Dict:
+        active: Dict[str, int] = {}
+        for host in self._open.values():
+            active[host] = active.get(host, 0) + 1
+        return {
+            **self._stats,
+            "http2": self.http2,
+            "chunk_size": self.chunk_size,
+            "per_host_limit": self.per_host_limit,
+            "slot_timeout": self.slot_timeout,
+            "active": active,
+            "pool": self._pool_stats(),
+        }
+
+    def _pool_stats(self) -> Dict:
+        """Open/idle upstream connections (read from httpcore's pool; best effort)"""
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        try:
+            return {"connections": len(connections), "idle": sum(1 for c in connections if c.is_idle()),
+                    "max_connections": self.max_connections}
+        except Exception:
+            return {"connections": len(connections), "max_connections": self.max_connections}
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        self._open.clear()
+        self._reserved_responses.clear()
+        self._host_limits.clear()
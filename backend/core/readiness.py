@@ -0,0 +1,185 @@
+"""
+Page readiness helpers
+Return as soon as the page has what we came for (video source, selector,
+media response) instead of sleeping for a fixed time
+"""
+
+import re
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any
+from playwright.sync_api import Page
+from playwright.async_api import Page as AsyncPage
+
+logger = logging.getLogger(__name__)
+
+MEDIA_URL_PATTERN = re.compile(r'\.(?:mp4|m3u8)(?:[?#]|$)', re.IGNORECASE)
+POLL_INTERVAL_MS = 100
+
+_READY_CHECKS = """
+    if (args.video) {
+        const video = document.querySelector('video');
+        if (video && (video.currentSrc || video.src || video.querySelector('source[src]'))) return 'video';
+    }
+    if (args.selector && document.querySelector(args.selector)) return 'selector';
+"""
+
+
+@dataclass
+class WaitReport:
+    """How long a readiness wait really took and what ended it"""
+    label: str
+    condition: Optional[str]  # 'video', 'selector', 'predicate', 'response' or None on timeout
+    elapsed_ms: int
+    timeout_ms: int
+    media_url: Optional[str] = None
+
+    @property
+    def timed_out(self) -> bool:
+        return self.condition is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["timed_out"] = self.timed_out
+        return result
+
+
+def build_ready_script(predicate: Optional[str] = None) -> str:
+    """Build the in-page check; `predicate` is an optional JS function expression"""
+    extra = f"if (({predicate})()) return 'predicate';" if predicate else ""
+    return "(args) => {" + _READY_CHECKS + extra + " return null; }"
+
+
+def wait_until_ready(page: Page, timeout_ms: int, video: bool = False, selector: Optional[str] = None,
+                     predicate: Optional[str] = None, media: bool = False, label: str = "ready") -> WaitReport:
+    """
+    Wait until any requested condition holds, capped at `timeout_ms`
+
+    Args:
+        page: Playwright Page object
+        timeout_ms: Maximum time to wait (the old fixed sleep)
+        video: Ready once a <video> element has a source
+        selector: Ready once this CSS selector matches
+        predicate: Ready once this JS function expression returns truthy
+        media: Ready once the page receives an mp4/m3u8 response
+        label: Name used in logs and the report
+
+    Returns:
+        WaitReport describing which condition fired and how long it took
+
+    Raises:
+        The last check's error if the page was closed, or if checks were still
+        failing at the deadline (errors before it are retried)
+    """
+    script = build_ready_script(predicate)
+    args = {"video": video, "selector": selector}
+    seen = {}
+
+    def on_response(response):
+        if "url" not in seen and MEDIA_URL_PATTERN.search(response.url):
+            seen["url"] = response.url
+
+    if media:
+        page.on("response", on_response)
+
+    start = time.monotonic()
+    condition = None
+    error = None
+    try:
+        while True:
+            if seen:
+                condition = "response"
+                break
+            try:
+                condition = page.evaluate(script, args)
+                error = None
+            except Exception as e:
+                # A navigation destroys the execution context mid-check: poll again
+                if page.is_closed():
+                    raise
+                error = e
+                logger.debug(f"Readiness check '{label}' failed, retrying: {e}")
+            if condition:
+                break
+            remaining = timeout_ms - (time.monotonic() - start) * 1000
+            if remaining <= 0:
+                if error is not None:
+                    raise error
+                break
+            page.wait_for_timeout(min(POLL_INTERVAL_MS, remaining))
+    finally:
+        if media:
+            try:
+                page.remove_listener("response", on_response)
+            except Exception:
+                pass
+
+    report = WaitReport(
+        label=label,
+        condition=condition,
+        elapsed_ms=int((time.monotonic() - start) * 1000),
+        timeout_ms=timeout_ms,
+        media_url=seen.get("url")
+    )
+    logger.debug(f"⏱️ {label}: {condition or 'timeout'} after {report.elapsed_ms} ms (cap {timeout_ms} ms)")
+    return report
+
+
+async def async_wait_until_ready(page: AsyncPage, timeout_ms: int, video: bool = False, selector: Optional[str] = None,
+                                 predicate: Optional[str] = None, media: bool = False,
+                                 label: str = "ready") -> WaitReport:
+    """Async Playwright version of wait_until_ready (same arguments and report)"""
+    script = build_ready_script(predicate)
+    args = {"video": video, "selector": selector}
+    seen = {}
+
+    def on_response(response):
+        if "url" not in seen and MEDIA_URL_PATTERN.search(response.url):
+            seen["url"] = response.url
+
+    if media:
+        page.on("response", on_response)
+
+    start = time.monotonic()
+    condition = None
+    error = None
+    try:
+        while True:
+            if seen:
+                condition = "response"
+                break
+            try:
+                condition = await page.evaluate(script, args)
+                error = None
+            except Exception as e:
+                # A navigation destroys the execution context mid-check: poll again
+                if page.is_closed():
+                    raise
+                error = e
+                logger.debug(f"Readiness check '{label}' failed, retrying: {e}")
+            if condition:
+                break
+            remaining = timeout_ms - (time.monotonic() - start) * 1000
+            if remaining <= 0:
+                if error is not None:
+                    raise error
+                break
+            await asyncio.sleep(min(POLL_INTERVAL_MS, remaining) / 1000)
+    finally:
+        if media:
+            try:
+                page.remove_listener("response", on_response)
+            except Exception:
+                pass
+
+    report = WaitReport(
+        label=label,
+        condition=condition,
+        elapsed_ms=int((time.monotonic() - start) * 1000),
+        timeout_ms=timeout_ms,
+        media_url=seen.get("url")
+    )
+    logger.debug(f"⏱️ {label}: {condition or 'timeout'} after {report.elapsed_ms} ms (cap {timeout_ms} ms)")
+    return report
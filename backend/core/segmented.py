@@ -0,0 +1,152 @@
+"""
+Segmented range fetching
+Splits a large byte range into segments fetched over several pooled
+connections at once (the CDN throttles each connection), reassembled in order
+"""
+
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .proxy import ProxyClient
+
+logger = logging.getLogger(__name__)
+
+SEGMENTED_FETCH_ENABLED = True
+SEGMENTED_MIN_SIZE = 16 * 1024 * 1024   # Smaller ranges use one connection
+SEGMENT_SIZE = 4 * 1024 * 1024          # Bytes per segment request
+SEGMENT_MIN_CONNECTIONS = 1
+SEGMENT_MAX_CONNECTIONS = 6             # Keep below PROXY_PER_HOST_LIMIT
+SEGMENT_START_CONNECTIONS = 2
+SEGMENT_RATE_SMOOTHING = 0.3            # EWMA weight of the newest per-connection rate
+SEGMENT_GROW_RATIO = 0.8                # Add a connection while per-connection rate holds above this share of the best
+SEGMENT_SHRINK_RATIO = 0.5              # Drop one once it falls below this share (the link is saturated)
+
+
+class SegmentedFetcher:
+    """
+    Fetches one byte range as concurrent segment requests.
+
+    - Segments are yielded strictly in order; the head segment streams live,
+      later ones buffer in memory, at most `connections` segments ahead
+    - The connection count is learned per host from per-connection throughput:
+      while each extra connection keeps its full speed another is added, once
+      connections start splitting the bandwidth one is dropped
+    - Per-host slots are reserved before the first byte is yielded (i.e. before the
+      response headers go out); more are only taken when free, so a busy host means
+      fewer connections - down to one - never a ProxyBusy mid-body
+    """
+
+    def __init__(self, proxy: ProxyClient, segment_size: int = SEGMENT_SIZE, min_size: int = SEGMENTED_MIN_SIZE,
+                 min_connections: int = SEGMENT_MIN_CONNECTIONS, max_connections: int = SEGMENT_MAX_CONNECTIONS,
+                 enabled: bool = SEGMENTED_FETCH_ENABLED):
+        self.proxy = proxy
+        self.segment_size = segment_size
+        self.min_size = min_size
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.enabled = enabled
+        self._hosts: Dict[str, Dict] = {}
+        self._stats = {"ranges": 0, "segmented": 0, "segments": 0, "bytes": 0}
+
+    def _host(self, url: str) -> Dict:
+        host = urlparse(url).netloc.lower()
+        if host not in self._hosts:
+            start = max(self.min_connections, min(SEGMENT_START_CONNECTIONS, self.max_connections))
+            self._hosts[host] = {"connections": start, "rate": 0.0, "best_rate": 0.0}
+        return self._hosts[host]
+
+    def _observe(self, state: Dict, size: int, seconds: float):
+        """Fold one finished segment's throughput into the host's connection count"""
+        if seconds <= 0:
+            return
+        rate = size / seconds
+        state["rate"] = rate if not state["rate"] else (
+            SEGMENT_RATE_SMOOTHING * rate + (1 - SEGMENT_RATE_SMOOTHING) * state["rate"])
+        state["best_rate"] = max(state["best_rate"], state["rate"])
+
+        if state["rate"] >= SEGMENT_GROW_RATIO * state["best_rate"]:
+            state["connections"] = min(state["connections"] + 1, self.max_connections)
+        elif state["rate"] < SEGMENT_SHRINK_RATIO * state["best_rate"]:
+            state["connections"] = max(state["connections"] - 1, self.min_connections)
+
+    def split(self, start: int, end: int) -> List[Tuple[int, int]]:
+        return [(offset, min(offset + self.segment_size, end + 1) - 1)
+                for offset in range(start, end + 1, self.segment_size)]
+
+    async def fetch(self, url: str, start: int, end: int, etag: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Yield bytes start..end of `url`; same contract as ProxyClient.iter_range"""
+        self._stats["ranges"] += 1
+        if end - start + 1 < self.min_size:
+            async for data in self.proxy.iter_range(url, start, end, etag):
+                yield data
+            return
+
+        self._stats["segmented"] += 1
+        state = self._host(url)
+        segments = self.split(start, end)
+        queues: Dict[int, asyncio.Queue] = {}
+        tasks: List[asyncio.Task] = []
+
+        async def fetch_segment(first: int, last: int, queue: asyncio.Queue):
+            started = time.monotonic()
+            try:
+                async for data in self.proxy.iter_range(url, first, last, etag, reserved=True):
+                    queue.put_nowait(data)
+                self._observe(state, last - first + 1, time.monotonic() - started)
+                self._stats["segments"] += 1
+                queue.put_nowait(None)
+            except Exception as e:
+                queue.put_nowait(e)
+
+        def launch(index: int):
+            queues[index] = asyncio.Queue()
+            first, last = segments[index]
+            tasks.append(asyncio.ensure_future(fetch_segment(first, last, queues[index])))
+
+        # One slot is waited for (ProxyBusy here is still a clean error response), the rest taken if free
+        reserved = await self.proxy.reserve(url, min(state["connections"], len(segments)))
+        launched = 0
+        try:
+            for index in range(len(segments)):
+                # Segments index..launched-1 may still hold a connection
+                in_flight = launched - index
+                wanted = min(state["connections"], len(segments) - index)
+                if wanted > reserved:
+                    reserved += await self.proxy.reserve(url, wanted - reserved, wait=False)
+                elif reserved > max(wanted, in_flight, 1):
+                    surplus = reserved - max(wanted, in_flight, 1)
+                    self.proxy.release(url, surplus)
+                    reserved -= surplus
+                # Bounded read-ahead: at most `reserved` segments in flight, counting the one being sent
+                while launched < len(segments) and launched <= index + min(wanted, reserved) - 1:
+                    launch(launched)
+                    launched += 1
+                queue = queues.pop(index)
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    self._stats["bytes"] += len(item)
+                    yield item
+        finally:
+            # Consumer stopped early (client disconnected) or a segment failed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.proxy.release(url, reserved)
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "segment_size": self.segment_size,
+            "hosts": {host: {"connections": state["connections"],
+                             "rate_mbps": round(state["rate"] * 8 / 1e6, 2),
+                             "best_rate_mbps": round(state["best_rate"] * 8 / 1e6, 2)}
+                      for host, state in self._hosts.items()},
+        }
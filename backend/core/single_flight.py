@@ -0,0 +1,113 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one running producer: the
+first caller starts it, later callers replay the events emitted so far and
+then follow the live stream
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """One in-progress producer and the events it has emitted so far"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.events: List[Any] = []
+        self.done = False
+        self.subscribers = 0
+        self.task: asyncio.Task = None
+        self._changed = asyncio.Condition()
+
+    async def publish(self, event: Any):
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def finish(self):
+        async with self._changed:
+            self.done = True
+            self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        """Replay buffered events, then yield live ones until the producer finishes"""
+        self.subscribers += 1
+        position = 0
+        try:
+            while True:
+                async with self._changed:
+                    await self._changed.wait_for(lambda: position < len(self.events) or self.done)
+                    batch = self.events[position:]
+                    finished = self.done
+                position += len(batch)
+                for event in batch:
+                    yield event
+                if finished and position >= len(self.events):
+                    return
+        finally:
+            self.subscribers -= 1
+
+
+class SingleFlight:
+    """
+    Registry of running flights keyed by e.g. normalized series URL.
+
+    The producer runs as its own task, so it keeps going (and keeps writing
+    the cache) even if the client that started it disconnects.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._stats = {"started": 0, "joined": 0}
+
+    def join(self, key: str, producer: Callable[[], AsyncIterator[Any]]) -> Tuple[Flight, bool]:
+        """
+        Attach to the flight for `key`, starting `producer()` if none is running
+
+        Returns:
+            (flight, leader) - leader is True if this call started the producer
+        """
+        flight = self._flights.get(key)
+        if flight and not flight.done:
+            self._stats["joined"] += 1
+            logger.info(f"🔗 Joining in-flight scrape for {key} ({len(flight.events)} events buffered)")
+            return flight, False
+
+        flight = Flight(key)
+        self._flights[key] = flight
+        self._stats["started"] += 1
+        flight.task = asyncio.ensure_future(self._run(flight, producer))
+        return flight, True
+
+    async def _run(self, flight: Flight, producer: Callable[[], AsyncIterator[Any]]):
+        try:
+            async for event in producer():
+                await flight.publish(event)
+        except Exception as e:
+            logger.error(f"Single-flight producer for {flight.key} failed: {e!r}")
+            await flight.publish({"type": "error", "message": repr(e)})
+        finally:
+            await flight.finish()
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+    def in_flight(self, key: str) -> bool:
+        flight = self._flights.get(key)
+        return bool(flight and not flight.done)
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "in_flight": len(self._flights),
+            "subscribers": sum(f.subscribers for f in self._flights.values()),
+        }
+
+    async def close(self):
+        """Cancel running producers (server shutdown)"""
+        for flight in list(self._flights.values()):
+            if flight.task:
+                flight.task.cancel()
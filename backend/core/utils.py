@@ -0,0 +1,35 @@
+from urllib.parse import urlsplit, urlunsplit, unquote, parse_qsl, urlencode
+
+from .cache_ttl import EXPIRY_PARAMS
+
+# Query parameters that sign or expire a URL rather than pick the resource
+TOKEN_PARAMS = frozenset(EXPIRY_PARAMS) | {
+    "token", "tok", "sig", "signature", "hash", "md5", "hmac", "auth", "st", "policy", "key-pair-id",
+}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a page URL, used as a key for de-duplicating work:
+    lowercase scheme/host, no 'www.', decoded path without trailing slash,
+    sorted query, no fragment
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = unquote(parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def strip_token_params(url: str) -> str:
+    """
+    normalize_url() without the expiring/signing query parameters, so the same
+    file fetched with a fresh token maps to the same key; parameters that
+    identify the file (e.g. `download.php?id=...`) are kept
+    """
+    parts = urlsplit(normalize_url(url))
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in TOKEN_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
@@ -1,17 +1,207 @@
+import re
 import sqlite3
-from typing import List, Dict, Optional
+import time
+import threading
+from typing import List, Dict, Optional, Iterator
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
+import gzip
+import hashlib
+import uuid
+from collections import OrderedDict
 
 DB_PATH = "cartoon.db"
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+# Connection tuning (one long-lived connection per thread)
+DB_CACHE_SIZE_KB = 16384          # Page cache per connection (PRAGMA cache_size, negative = KiB)
+DB_MMAP_SIZE = 64 * 1024 * 1024   # Memory-mapped I/O window
+DB_CACHED_STATEMENTS = 256        # Prepared statements kept per connection
+
+_local = threading.local()
+_connections_lock = threading.Lock()
+_connections: List[sqlite3.Connection] = []
+_generation = 0  # Bumped by close_db_connections() so threads reopen
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    # check_same_thread=False only so close_db_connections() can close it; each connection is used by one thread
+    conn = sqlite3.connect(path, cached_statements=DB_CACHED_STATEMENTS, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")  # Readers don't block the writer
+    conn.execute("PRAGMA synchronous = NORMAL")  # WAL-safe; fsync at checkpoints only
+    conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
     conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key support
     return conn
 
+def get_db_connection():
+    """
+    Return this thread's long-lived connection, opening it on first use.
+    Callers must not close it; use close_db_connections() on shutdown.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "key", None) != (DB_PATH, _generation):
+        conn = _open_connection(DB_PATH)
+        _local.conn, _local.key = conn, (DB_PATH, _generation)
+        with _connections_lock:
+            _connections.append(conn)
+    elif conn.in_transaction:
+        # A previous call failed between a write and its commit
+        conn.rollback()
+    return conn
+
+def close_db_connections():
+    """Close every per-thread connection (server shutdown)"""
+    global _generation
+    with _connections_lock:
+        _generation += 1
+        connections = list(_connections)
+        _connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except Exception as e:
+            print(f"Error closing database connection: {e}")
+
+# ============ IN-MEMORY SERIES CACHE ============
+
+SERIES_CACHE_MAX_ENTRIES = 256
+SERIES_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+class SeriesBundleCache:
+    """
+    Thread-safe LRU of {series, payload} bundles, bounded by entry count and
+    by approximate size (series JSON plus rendered payload bytes).
+    Writers call invalidate(url); readers must treat bundles as read-only.
+    """
+
+    def __init__(self, max_entries: int = SERIES_CACHE_MAX_ENTRIES, max_bytes: int = SERIES_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._versions: Dict[str, int] = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def version(self, url: str) -> int:
+        with self._lock:
+            return self._versions.get(url, 0)
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(url)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def put(self, url: str, bundle: Dict, version: int):
+        """Store a bundle loaded at `version`; dropped if the series was written since"""
+        payload = bundle.get("payload")
+        size = len(json.dumps(bundle["series"], default=str))
+        size += len(payload["body"]) if payload else 0
+        with self._lock:
+            if self._versions.get(url, 0) != version or size > self.max_bytes:
+                return
+            self._drop(url)
+            self._entries[url] = (bundle, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+
+    def _drop(self, url: str):
+        entry = self._entries.pop(url, None)
+        if entry:
+            self._bytes -= entry[1]
+
+    def attach_payload(self, url: str, payload: Dict, version: int):
+        """Add a payload stored at `version` to a cached bundle without reloading it"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or entry[0].get("payload") or self._versions.get(url, 0) != version:
+                return
+            self._drop(url)
+            size = entry[1] + len(payload["body"])
+            self._entries[url] = ({**entry[0], "payload": payload}, size)
+            self._bytes += size
+
+    def invalidate(self, url: str):
+        with self._lock:
+            # Bump the version so a load racing with this write is not cached
+            self._versions[url] = self._versions.get(url, 0) + 1
+            if url in self._entries:
+                self._drop(url)
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            for url in self._entries:
+                self._versions[url] = self._versions.get(url, 0) + 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+series_cache = SeriesBundleCache()
+
+class FavoritesIndex:
+    """
+    In-memory set of favorite series URLs, loaded with one query and kept in
+    sync by the helpers that change is_favorite (toggle_favorite, upsert_series,
+    clear_series_cache)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._urls: Optional[set] = None
+        self._path = None
+
+    def load(self):
+        # Query under the lock: a set() racing with the load waits and applies on top of
+        # the loaded set, instead of being skipped and then overwritten by an older snapshot
+        with self._lock:
+            conn = get_db_connection()
+            self._urls = {row['url'] for row in conn.execute('SELECT url FROM series WHERE is_favorite = 1')}
+            self._path = DB_PATH
+
+    def snapshot(self) -> Optional[frozenset]:
+        """Current favorites, or None until loaded"""
+        with self._lock:
+            if self._urls is None or self._path != DB_PATH:
+                return None
+            return frozenset(self._urls)
+
+    def set(self, url: str, favorite: bool):
+        with self._lock:
+            if self._urls is None or self._path != DB_PATH:
+                return
+            if favorite:
+                self._urls.add(url)
+            else:
+                self._urls.discard(url)
+
+    def reset(self):
+        with self._lock:
+            self._urls = None
+
+favorites_index = FavoritesIndex()
+
 def init_db():
     conn = get_db_connection()
     
@@ -46,7 +236,7 @@ def init_db():
             episode_number INTEGER NOT NULL,
             title TEXT,
             video_url TEXT,
-            video_info TEXT,
+            video_info TEXT,  -- legacy JSON blob, superseded by the video_* columns
             size_bytes INTEGER,
             thumbnail TEXT,
             episode_url TEXT,
@@ -55,8 +245,103 @@ def init_db():
         )
     ''')
     
+    migrate_video_info(conn)
+    migrate_series_ttl(conn)
+    
+    # Library listing: favorites newest-first (partial index, keyset pagination)
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_series_favorites
+        ON series(last_fetched_at DESC, url DESC) WHERE is_favorite = 1
+    ''')
+    
+    # Pre-rendered NDJSON body (progress/result lines) served on cache hits
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS series_payloads (
+            series_url TEXT PRIMARY KEY,
+            etag TEXT NOT NULL,
+            encoding TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(series_url) REFERENCES series(url) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Any change to a series' episodes (or its title/total) drops its rendered payload
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        row = "OLD" if event == "DELETE" else "NEW"
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS episodes_{event.lower()}_drop_payload
+            AFTER {event} ON episodes
+            BEGIN
+                DELETE FROM series_payloads WHERE series_url = {row}.series_url;
+            END
+        ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS series_update_drop_payload
+        AFTER UPDATE OF title, total_episodes ON series
+        BEGIN
+            DELETE FROM series_payloads WHERE series_url = NEW.url;
+        END
+    ''')
+    
     conn.commit()
-    conn.close()
+
+def migrate_video_info(conn: sqlite3.Connection):
+    """
+    Schema v1: move the episodes.video_info JSON blob into typed video_* columns.
+    Idempotent; existing blobs are decoded once and cleared.
+    """
+    existing = {row['name'] for row in conn.execute('PRAGMA table_info(episodes)')}
+    column_types = {
+        'video_series_id': 'TEXT',
+        'video_filename': 'TEXT',
+        'video_series_name': 'TEXT',
+        'video_season': 'INTEGER',
+        'video_episode': 'INTEGER',
+        'video_base_url': 'TEXT',
+        'video_params': 'TEXT',
+    }
+    for column, column_type in column_types.items():
+        if column not in existing:
+            conn.execute(f'ALTER TABLE episodes ADD COLUMN {column} {column_type}')
+    
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_episodes_video_series_id ON episodes(video_series_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_episodes_season ON episodes(series_url, video_season)')
+    
+    if conn.execute('PRAGMA user_version').fetchone()[0] >= 1:
+        return
+    
+    rows = conn.execute('SELECT id, video_info FROM episodes WHERE video_info IS NOT NULL').fetchall()
+    updates = []
+    for row in rows:
+        try:
+            info = json.loads(row['video_info']) or {}
+        except Exception:
+            info = {}
+        updates.append((*video_info_values(info), row['id']))
+    conn.executemany('''
+        UPDATE episodes SET
+            video_series_id = ?, video_filename = ?, video_series_name = ?, video_season = ?,
+            video_episode = ?, video_base_url = ?, video_params = ?, video_info = NULL
+        WHERE id = ?
+    ''', updates)
+    conn.execute('PRAGMA user_version = 1')
+    if updates:
+        print(f"Migrated video_info of {len(updates)} cached episodes to typed columns")
+
+def migrate_series_ttl(conn: sqlite3.Connection):
+    """Add the adaptive TTL / change-history columns to series (idempotent)"""
+    existing = {row['name'] for row in conn.execute('PRAGMA table_info(series)')}
+    column_types = {
+        'ttl_seconds': 'INTEGER',          # NULL = default TTL
+        'last_changed_at': 'REAL',         # Unix time a refresh last found new episodes
+        'change_interval': 'REAL',         # EWMA of seconds between such refreshes
+        'unchanged_refreshes': 'INTEGER DEFAULT 0',
+        'links_expire_at': 'REAL',         # Earliest CDN token expiry of the cached video URLs
+    }
+    for column, column_type in column_types.items():
+        if column not in existing:
+            conn.execute(f'ALTER TABLE series ADD COLUMN {column} {column_type}')
 
 # ============ FAVORITES FUNCTIONS (Existing) ============
 
@@ -70,7 +355,6 @@ def add_favorite(title: str, url: str, thumbnail: Optional[str] = None) -> Dict:
         )
         conn.commit()
         fav_id = cursor.lastrowid
-        conn.close()
         return {
             "id": fav_id,
             "title": title,
@@ -91,7 +375,6 @@ def remove_favorite(url: str) -> bool:
         cursor.execute('DELETE FROM favorites WHERE url = ?', (url,))
         conn.commit()
         deleted = cursor.rowcount > 0
-        conn.close()
         return deleted
     except Exception as e:
         print(f"Error removing favorite: {e}")
@@ -100,19 +383,28 @@ def remove_favorite(url: str) -> bool:
 def get_favorites() -> List[Dict]:
     conn = get_db_connection()
     favorites = conn.execute('SELECT * FROM favorites ORDER BY created_at DESC').fetchall()
-    conn.close()
     return [dict(ix) for ix in favorites]
 
 def get_favorite_by_url(url: str) -> Optional[Dict]:
     conn = get_db_connection()
     row = conn.execute('SELECT * FROM favorites WHERE url = ?', (url,)).fetchone()
-    conn.close()
     if row:
         return dict(row)
     return None
 
 # ============ SERIES CACHE FUNCTIONS (NEW) ============
 
+# Upsert that preserves is_favorite (and an existing thumbnail when none is given)
+UPSERT_SERIES_SQL = '''
+    INSERT INTO series (url, title, thumbnail, total_episodes, last_fetched_at)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(url) DO UPDATE SET
+        title = excluded.title,
+        thumbnail = COALESCE(excluded.thumbnail, series.thumbnail),
+        total_episodes = excluded.total_episodes,
+        last_fetched_at = CURRENT_TIMESTAMP
+'''
+
 def upsert_series(url: str, title: str, thumbnail: Optional[str] = None, total_episodes: int = 0, is_favorite: bool = None) -> bool:
     """Insert or update series metadata. If is_favorite is None, preserve existing value."""
     try:
@@ -129,17 +421,11 @@ def upsert_series(url: str, title: str, thumbnail: Optional[str] = None, total_e
                     last_fetched_at = CURRENT_TIMESTAMP
             ''', (url, title, thumbnail, total_episodes, is_favorite))
         else:
-            conn.execute('''
-                INSERT INTO series (url, title, thumbnail, total_episodes, last_fetched_at)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(url) DO UPDATE SET
-                    title = excluded.title,
-                    thumbnail = COALESCE(excluded.thumbnail, series.thumbnail),
-                    total_episodes = excluded.total_episodes,
-                    last_fetched_at = CURRENT_TIMESTAMP
-            ''', (url, title, thumbnail, total_episodes))
+            conn.execute(UPSERT_SERIES_SQL, (url, title, thumbnail, total_episodes))
         conn.commit()
-        conn.close()
+        series_cache.invalidate(url)
+        if is_favorite is not None:
+            favorites_index.set(url, bool(is_favorite))
         return True
     except Exception as e:
         print(f"Error upserting series: {e}")
@@ -149,67 +435,419 @@ def get_series(url: str) -> Optional[Dict]:
     """Get series metadata by URL"""
     conn = get_db_connection()
     row = conn.execute('SELECT * FROM series WHERE url = ?', (url,)).fetchone()
-    conn.close()
     if row:
         return dict(row)
     return None
 
-def is_cache_fresh(series_url: str, max_age_hours: int = 24) -> bool:
-    """Check if cached series data is still fresh"""
+def get_series_bundle(series_url: str) -> Optional[Dict]:
+    """
+    Series row, its episode count and its rendered payload if any
+    ({"series": ..., "episode_count": n, "payload": {"etag", "body"} | None}),
+    served from the in-memory LRU when possible. Episodes themselves are read
+    with iter_cached_episodes() only when there is no payload yet.
+    Returned objects are shared: don't mutate them.
+    """
+    bundle = series_cache.get(series_url)
+    if bundle is not None:
+        return bundle
+    
+    version = series_cache.version(series_url)
     series = get_series(series_url)
     if not series:
-        return False
+        return None
+    bundle = {
+        "series": series,
+        "episode_count": count_cached_episodes(series_url),
+        "payload": get_series_payload(series_url)
+    }
+    series_cache.put(series_url, bundle, version)
+    return bundle
+
+# Compress stored payloads (decompressed once when loaded into the LRU)
+PAYLOAD_COMPRESSION = True
+# ETag of a row reserved by claim_series_payload() while its body renders (real ETags are quoted)
+PAYLOAD_CLAIM_PREFIX = "claim:"
+
+UPSERT_PAYLOAD_SQL = '''
+    INSERT INTO series_payloads (series_url, etag, encoding, payload, created_at)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(series_url) DO UPDATE SET
+        etag = excluded.etag,
+        encoding = excluded.encoding,
+        payload = excluded.payload,
+        created_at = CURRENT_TIMESTAMP
+'''
+
+def claim_series_payload(series_url: str) -> Optional[str]:
+    """
+    Reserve the payload row before reading the episodes to render; returns a claim token.
+    Episode/series writes delete the claim (same triggers as a payload), so
+    store_series_payload(claim=token) can't save rows that changed mid-render.
+    """
+    token = PAYLOAD_CLAIM_PREFIX + uuid.uuid4().hex
+    try:
+        conn = get_db_connection()
+        conn.execute(UPSERT_PAYLOAD_SQL, (series_url, token, "identity", b""))
+        conn.commit()
+        return token
+    except Exception as e:
+        print(f"Error claiming series payload: {e}")
+        return None
+
+def store_series_payload(series_url: str, body: bytes, title: str = "", claim: Optional[str] = None) -> Optional[str]:
+    """
+    Store the rendered NDJSON body for a series; returns its ETag (covers the title too).
+    With a `claim`, nothing is stored (None) if the series was written since it was taken.
+    """
+    etag = '"' + hashlib.sha1(title.encode("utf-8") + b"\n" + body).hexdigest() + '"'
+    encoding, blob = ("gzip", gzip.compress(body, compresslevel=6)) if PAYLOAD_COMPRESSION else ("identity", body)
+    try:
+        conn = get_db_connection()
+        # Read before writing: a writer committing after our write bumps it after that
+        version = series_cache.version(series_url)
+        if claim is None:
+            conn.execute(UPSERT_PAYLOAD_SQL, (series_url, etag, encoding, blob))
+        else:
+            updated = conn.execute('''
+                UPDATE series_payloads SET etag = ?, encoding = ?, payload = ?, created_at = CURRENT_TIMESTAMP
+                WHERE series_url = ? AND etag = ?
+            ''', (etag, encoding, blob, series_url, claim)).rowcount
+            if not updated:
+                # Claim deleted by a write since: these rows may be stale
+                conn.rollback()
+                return None
+        conn.commit()
+        series_cache.attach_payload(series_url, {"etag": etag, "body": body}, version)
+        return etag
+    except Exception as e:
+        print(f"Error storing series payload: {e}")
+        return None
+
+def get_series_payload(series_url: str) -> Optional[Dict]:
+    """Rendered NDJSON body for a series ({"etag", "body"}), or None if not rendered since the last change"""
+    conn = get_db_connection()
+    row = conn.execute(
+        'SELECT etag, encoding, payload FROM series_payloads WHERE series_url = ?', (series_url,)
+    ).fetchone()
+    if not row or row['etag'].startswith(PAYLOAD_CLAIM_PREFIX):
+        return None
+    body = gzip.decompress(row['payload']) if row['encoding'] == 'gzip' else bytes(row['payload'])
+    return {"etag": row['etag'], "body": body}
+
+def series_age(series: Optional[Dict]) -> Optional[float]:
+    """Seconds since a series row was last fetched, or None if unknown"""
+    if not series or not series.get('last_fetched_at'):
+        return None
     
-    last_fetched = datetime.fromisoformat(series['last_fetched_at'])
-    age = datetime.now() - last_fetched
-    return age < timedelta(hours=max_age_hours)
+    # CURRENT_TIMESTAMP is stored in UTC, without an offset
+    last_fetched = datetime.fromisoformat(series['last_fetched_at']).replace(tzinfo=timezone.utc)
+    return max(0.0, (datetime.now(timezone.utc) - last_fetched).total_seconds())
+
+def get_cache_age(series_url: str) -> Optional[float]:
+    """Seconds since the series was last fetched, or None if it was never cached"""
+    return series_age(get_series(series_url))
+
+DEFAULT_CACHE_TTL_HOURS = 24
+
+def series_ttl(series: Optional[Dict]) -> float:
+    """Seconds a series' cache stays fresh: its adaptive TTL, or the 24h default"""
+    ttl = (series or {}).get('ttl_seconds')
+    return float(ttl) if ttl is not None else timedelta(hours=DEFAULT_CACHE_TTL_HOURS).total_seconds()
+
+def is_cache_fresh(series_url: str, max_age_hours: Optional[int] = None) -> bool:
+    """Check if cached series data is still fresh (per-series TTL unless max_age_hours is given)"""
+    series = get_series(series_url)
+    age = series_age(series)
+    if age is None:
+        return False
+    if max_age_hours is not None:
+        return age < timedelta(hours=max_age_hours).total_seconds()
+    return age < series_ttl(series)
+
+def update_series_refresh_state(series_url: str, ttl_seconds: int, last_changed_at: Optional[float],
+                                change_interval: Optional[float], unchanged_refreshes: int,
+                                links_expire_at: Optional[float] = None) -> bool:
+    """Store the adaptive TTL, change history and link expiry computed after a refresh"""
+    try:
+        conn = get_db_connection()
+        conn.execute('''
+            UPDATE series SET ttl_seconds = ?, last_changed_at = ?, change_interval = ?, unchanged_refreshes = ?,
+                              links_expire_at = ?
+            WHERE url = ?
+        ''', (ttl_seconds, last_changed_at, change_interval, unchanged_refreshes, links_expire_at, series_url))
+        conn.commit()
+        series_cache.invalidate(series_url)
+        return True
+    except Exception as e:
+        print(f"Error updating series refresh state: {e}")
+        return False
 
 # ============ EPISODE CACHE FUNCTIONS (NEW) ============
 
+# video_info (ArabicToonsParser.parse_video_url output) is stored as typed columns
+VIDEO_INFO_COLUMNS = {
+    'base_url': 'video_base_url',
+    'series_id': 'video_series_id',
+    'filename': 'video_filename',
+    'series_name': 'video_series_name',
+    'season': 'video_season',
+    'episode': 'video_episode',
+    'parameters': 'video_params',
+}
+
+UPSERT_EPISODE_SQL = '''
+    INSERT INTO episodes (series_url, episode_number, title, video_url, size_bytes, thumbnail, episode_url,
+                          video_series_id, video_filename, video_series_name, video_season, video_episode,
+                          video_base_url, video_params)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(series_url, episode_number) DO UPDATE SET
+        title = excluded.title,
+        video_url = excluded.video_url,
+        video_info = NULL,
+        size_bytes = excluded.size_bytes,
+        thumbnail = excluded.thumbnail,
+        episode_url = excluded.episode_url,
+        video_series_id = excluded.video_series_id,
+        video_filename = excluded.video_filename,
+        video_series_name = excluded.video_series_name,
+        video_season = excluded.video_season,
+        video_episode = excluded.video_episode,
+        video_base_url = excluded.video_base_url,
+        video_params = excluded.video_params
+'''
+
+# Trailing "[_s<season>]_<episode>.mp4" of a CDN filename
+_FILENAME_NUMBERS = re.compile(r'(?:_s(\d+))?_(\d+)\.mp4$')
+
+EPISODE_COLUMNS = {'id', 'series_url', 'episode_number', 'title', 'video_url', 'size_bytes', 'thumbnail',
+                   'episode_url', *VIDEO_INFO_COLUMNS.values()}
+EPISODE_FETCH_BATCH = 100  # Rows per fetchmany() when streaming episodes
+
+# Write-behind flush thresholds for EpisodeCacheWriter
+EPISODE_FLUSH_ROWS = 25
+EPISODE_FLUSH_MS = 500
+
 def upsert_episode(series_url: str, episode_number: int, title: str, 
                    video_url: str, video_info: Dict, size_bytes: int,
                    thumbnail: str, episode_url: str) -> bool:
     """Insert or update a single episode"""
     try:
         conn = get_db_connection()
-        conn.execute('''
-            INSERT INTO episodes (series_url, episode_number, title, video_url, video_info, size_bytes, thumbnail, episode_url)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(series_url, episode_number) DO UPDATE SET
-                title = excluded.title,
-                video_url = excluded.video_url,
-                video_info = excluded.video_info,
-                size_bytes = excluded.size_bytes,
-                thumbnail = excluded.thumbnail,
-                episode_url = excluded.episode_url
-        ''', (series_url, episode_number, title, video_url, json.dumps(video_info), size_bytes, thumbnail, episode_url))
+        conn.execute(UPSERT_EPISODE_SQL, (series_url, episode_number, title, video_url, size_bytes, thumbnail,
+                                          episode_url, *video_info_values(video_info)))
         conn.commit()
-        conn.close()
+        series_cache.invalidate(series_url)
         return True
     except Exception as e:
         print(f"Error upserting episode: {e}")
         return False
 
+class EpisodeCacheWriter:
+    """
+    Write-behind buffer for one series being streamed.
+
+    Episode upserts are queued and written with one executemany + commit per
+    `max_rows` episodes or `max_delay_ms`, whichever comes first; the series
+    row (title, total, first thumbnail) rides along in the same transaction.
+    The delay is only checked by maybe_flush(): callers waiting on slow events
+    should wake up after flush_delay() to call it.
+    Call flush() once more when the stream ends - close() does it.
+    """
+
+    def __init__(self, series_url: str, max_rows: int = EPISODE_FLUSH_ROWS, max_delay_ms: int = EPISODE_FLUSH_MS):
+        self.series_url = series_url
+        self.max_rows = max(1, max_rows)
+        self.max_delay_ms = max_delay_ms
+        self.title = "Unknown Series"
+        self.thumbnail = None
+        self.total_episodes = 0
+        self.written = 0
+        self.flushes = 0
+        self._series_dirty = False
+        self._rows: List[tuple] = []
+        self._oldest = None
+
+    def set_series(self, title: str, total_episodes: int, thumbnail: Optional[str] = None):
+        self.title = title
+        self.total_episodes = total_episodes
+        self.thumbnail = thumbnail or self.thumbnail
+        self._series_dirty = True
+        self._touch()
+
+    def add_episode(self, episode_number: int, title: str, video_url: str, video_info: Dict,
+                    size_bytes: int, thumbnail: str, episode_url: str):
+        if not self.thumbnail and thumbnail:
+            # First thumbnail doubles as the series poster
+            self.thumbnail = thumbnail
+            self._series_dirty = True
+        self._rows.append((self.series_url, episode_number, title, video_url, size_bytes, thumbnail,
+                           episode_url, *video_info_values(video_info)))
+        self._touch()
+        if len(self._rows) >= self.max_rows:
+            self.flush()
+
+    def _touch(self):
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def flush_delay(self) -> Optional[float]:
+        """Seconds until the oldest buffered write is due (0 if overdue), None if nothing is buffered"""
+        if self._oldest is None:
+            return None
+        return max(0.0, self._oldest + self.max_delay_ms / 1000 - time.monotonic())
+
+    def maybe_flush(self) -> bool:
+        """Flush if the oldest buffered write has waited `max_delay_ms`"""
+        if self._oldest is not None and (time.monotonic() - self._oldest) * 1000 >= self.max_delay_ms:
+            return self.flush()
+        return False
+
+    def flush(self) -> bool:
+        if not self._rows and not self._series_dirty:
+            return True
+        rows = self._rows
+        try:
+            conn = get_db_connection()
+            with conn:  # One transaction: commit, or roll back on error
+                if self._series_dirty:
+                    conn.execute(UPSERT_SERIES_SQL, (self.series_url, self.title, self.thumbnail, self.total_episodes))
+                if rows:
+                    conn.executemany(UPSERT_EPISODE_SQL, rows)
+            series_cache.invalidate(self.series_url)
+        except Exception as e:
+            print(f"Error flushing episode cache: {e}")
+            return False
+        finally:
+            # Don't retry a failing batch forever; the next refresh rewrites it
+            self._rows = []
+            self._series_dirty = False
+            self._oldest = None
+        self.written += len(rows)
+        self.flushes += 1
+        return True
+
+    def close(self) -> bool:
+        return self.flush()
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _as_label(value: Optional[int], text: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return text if text and int(text) == value else str(value)
+
+def video_info_values(video_info: Optional[Dict]) -> tuple:
+    """Column values for a video_info dict, in UPSERT_EPISODE_SQL order"""
+    info = video_info or {}
+    return (
+        info.get('series_id'),
+        info.get('filename'),
+        info.get('series_name'),
+        _as_int(info.get('season')),
+        _as_int(info.get('episode')),
+        info.get('base_url'),
+        json.dumps(info['parameters']) if info.get('parameters') else None,
+    )
+
+def _assemble_video_info(ep: Dict) -> Dict:
+    """Fold the typed video_* columns of a row back into a video_info dict"""
+    columns = {key: ep.pop(column) for key, column in VIDEO_INFO_COLUMNS.items() if column in ep}
+    if not columns:
+        return ep
+    params = columns.get('parameters')
+    # Season/episode are stored as integers; take their zero-padded form back from the filename
+    padded = _FILENAME_NUMBERS.search(columns.get('filename') or '')
+    info = {
+        "full_url": ep.get('video_url'),
+        **columns,
+        "season": _as_label(columns.get('season'), padded.group(1) if padded else None),
+        "episode": _as_label(columns.get('episode'), padded.group(2) if padded else None),
+        "parameters": json.loads(params) if params else {},
+    }
+    ep['video_info'] = info if any(columns.values()) else {}
+    return ep
+
+def iter_cached_episodes(series_url: str, fields: Optional[List[str]] = None, decode_video_info: bool = True,
+                         batch_size: int = EPISODE_FETCH_BATCH, where: str = "",
+                         params: tuple = ()) -> Iterator[Dict]:
+    """
+    Yield cached episodes in order, `batch_size` rows at a time from the cursor
+
+    Args:
+        series_url: Series to read (None = every series, with `where` narrowing it down)
+        fields: Columns to select (default: all); e.g. ['episode_url', 'video_url'] when only URLs are needed
+        decode_video_info: Fold the video_* columns into a `video_info` dict; when False they are left as-is
+        batch_size: Rows fetched per round-trip
+        where/params: Extra SQL condition (internal, for the typed video_info queries)
+    """
+    unknown = set(fields or []) - EPISODE_COLUMNS
+    if unknown:
+        raise ValueError(f"Unknown episode columns: {sorted(unknown)}")
+    columns = ", ".join(fields) if fields else ", ".join(sorted(EPISODE_COLUMNS))
+    
+    conditions, args = [], []
+    if series_url is not None:
+        conditions.append("series_url = ?")
+        args.append(series_url)
+    if where:
+        conditions.append(where)
+        args.extend(params)
+    
+    cursor = get_db_connection().execute(
+        f'SELECT {columns} FROM episodes WHERE {" AND ".join(conditions) or "1"} '
+        f'ORDER BY series_url, episode_number ASC',
+        tuple(args)
+    )
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                ep = dict(row)
+                yield _assemble_video_info(ep) if decode_video_info else ep
+    finally:
+        cursor.close()
+
+def get_episodes_by_season(series_url: str, season: int) -> List[Dict]:
+    """Cached episodes of one season of a series (indexed on series_url, video_season)"""
+    return list(iter_cached_episodes(series_url, where="video_season = ?", params=(season,)))
+
+def get_episodes_by_video_series(series_id: str) -> List[Dict]:
+    """Cached episodes hosted under one CDN series_id, across all series pages (indexed)"""
+    return list(iter_cached_episodes(None, where="video_series_id = ?", params=(series_id,)))
+
+def count_cached_episodes(series_url: str) -> int:
+    conn = get_db_connection()
+    return conn.execute('SELECT COUNT(*) FROM episodes WHERE series_url = ?', (series_url,)).fetchone()[0]
+
 def get_cached_episodes(series_url: str) -> List[Dict]:
     """Get all cached episodes for a series"""
-    conn = get_db_connection()
-    rows = conn.execute(
-        'SELECT * FROM episodes WHERE series_url = ? ORDER BY episode_number ASC',
-        (series_url,)
-    ).fetchall()
-    conn.close()
-    
-    episodes = []
-    for row in rows:
-        ep = dict(row)
-        # Parse video_info JSON back to dict
-        if ep.get('video_info'):
-            try:
-                ep['video_info'] = json.loads(ep['video_info'])
-            except:
-                ep['video_info'] = {}
-        episodes.append(ep)
-    return episodes
+    return list(iter_cached_episodes(series_url))
+
+def prune_episodes(series_url: str, total_episodes: int) -> int:
+    """Drop cached episodes numbered past the end of a freshly scraped listing"""
+    try:
+        conn = get_db_connection()
+        cursor = conn.execute(
+            'DELETE FROM episodes WHERE series_url = ? AND episode_number > ?',
+            (series_url, total_episodes)
+        )
+        conn.commit()
+        deleted = cursor.rowcount
+        if deleted:
+            series_cache.invalidate(series_url)
+        return deleted
+    except Exception as e:
+        print(f"Error pruning episodes: {e}")
+        return 0
 
 def clear_series_cache(series_url: str) -> bool:
     """Delete all cached data for a series"""
@@ -218,7 +856,8 @@ def clear_series_cache(series_url: str) -> bool:
         conn.execute('DELETE FROM episodes WHERE series_url = ?', (series_url,))
         conn.execute('DELETE FROM series WHERE url = ?', (series_url,))
         conn.commit()
-        conn.close()
+        series_cache.invalidate(series_url)
+        favorites_index.set(series_url, False)
         return True
     except Exception as e:
         print(f"Error clearing series cache: {e}")
@@ -239,6 +878,8 @@ def toggle_favorite(url: str, title: str = None, thumbnail: str = None) -> Dict:
             new_status = not existing['is_favorite']
             conn.execute('UPDATE series SET is_favorite = ? WHERE url = ?', (new_status, url))
             conn.commit()
+            series_cache.invalidate(url)
+            favorites_index.set(url, new_status)
             result = dict(existing)
             result['is_favorite'] = new_status
         else:
@@ -248,6 +889,7 @@ def toggle_favorite(url: str, title: str = None, thumbnail: str = None) -> Dict:
                 VALUES (?, ?, ?, 0, 1, CURRENT_TIMESTAMP)
             ''', (url, title or 'Unknown Series', thumbnail))
             conn.commit()
+            favorites_index.set(url, True)
             result = {
                 'url': url,
                 'title': title or 'Unknown Series',
@@ -256,7 +898,6 @@ def toggle_favorite(url: str, title: str = None, thumbnail: str = None) -> Dict:
                 'is_favorite': True
             }
         
-        conn.close()
         return result
     except Exception as e:
         print(f"Error toggling favorite: {e}")
@@ -264,10 +905,32 @@ def toggle_favorite(url: str, title: str = None, thumbnail: str = None) -> Dict:
 
 def is_favorite(url: str) -> bool:
     """Check if a series is marked as favorite"""
+    return check_favorites([url])[url]
+
+FAVORITES_CHECK_CHUNK = 500  # Stay below SQLite's bound-parameter limit
+
+def check_favorites(urls: List[str]) -> Dict[str, bool]:
+    """
+    Favorite status for many URLs at once.
+    Answered from the in-memory favorites set; while it is cold, one
+    IN (...) query per FAVORITES_CHECK_CHUNK URLs answers and the set is loaded for next time.
+    """
+    known = favorites_index.snapshot()
+    if known is not None:
+        return {url: url in known for url in urls}
+    
+    unique = list(dict.fromkeys(urls))
+    favorites = set()
     conn = get_db_connection()
-    row = conn.execute('SELECT is_favorite FROM series WHERE url = ?', (url,)).fetchone()
-    conn.close()
-    return bool(row and row['is_favorite'])
+    for start in range(0, len(unique), FAVORITES_CHECK_CHUNK):
+        chunk = unique[start:start + FAVORITES_CHECK_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        rows = conn.execute(
+            f'SELECT url FROM series WHERE is_favorite = 1 AND url IN ({placeholders})', chunk
+        ).fetchall()
+        favorites.update(row['url'] for row in rows)
+    favorites_index.load()
+    return {url: url in favorites for url in urls}
 
 def get_favorite_series() -> List[Dict]:
     """Get all series marked as favorites"""
@@ -278,5 +941,45 @@ def get_favorite_series() -> List[Dict]:
         WHERE is_favorite = 1 
         ORDER BY last_fetched_at DESC
     ''').fetchall()
-    conn.close()
     return [dict(row) for row in rows]
+
+LIBRARY_PAGE_MAX = 200
+
+def get_favorite_series_page(after: Optional[tuple] = None, limit: int = 50) -> tuple:
+    """
+    One page of favorites, newest first, using keyset pagination on
+    (last_fetched_at, url) so every page costs the same however deep it is
+
+    Args:
+        after: (last_fetched_at, url) of the last row of the previous page, or None for the first page
+        limit: Page size (capped at LIBRARY_PAGE_MAX)
+
+    Returns:
+        (rows, next key or None when this is the last page)
+    """
+    limit = max(1, min(limit, LIBRARY_PAGE_MAX))
+    conn = get_db_connection()
+    if after:
+        rows = conn.execute('''
+            SELECT url, title, thumbnail, total_episodes, is_favorite, last_fetched_at
+            FROM series
+            WHERE is_favorite = 1 AND (last_fetched_at, url) < (?, ?)
+            ORDER BY last_fetched_at DESC, url DESC
+            LIMIT ?
+        ''', (after[0], after[1], limit + 1)).fetchall()
+    else:
+        rows = conn.execute('''
+            SELECT url, title, thumbnail, total_episodes, is_favorite, last_fetched_at
+            FROM series
+            WHERE is_favorite = 1
+            ORDER BY last_fetched_at DESC, url DESC
+            LIMIT ?
+        ''', (limit + 1,)).fetchall()
+    
+    page = [dict(row) for row in rows[:limit]]
+    next_key = (page[-1]['last_fetched_at'], page[-1]['url']) if len(rows) > limit else None
+    return page, next_key
+
+def count_favorite_series() -> int:
+    conn = get_db_connection()
+    return conn.execute('SELECT COUNT(*) FROM series WHERE is_favorite = 1').fetchone()[0]
@@ -0,0 +1,116 @@
+"""
+Async Base Extractor Class
+asyncio-native counterpart of BaseExtractor built on playwright.async_api
+"""
+
+import re
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, List, Union, TYPE_CHECKING
+from playwright.async_api import Page
+
+from .base import (ExtractionResult, VIDEO_SOURCE_JS, AD_IFRAME_MARKERS, M3U8_URL_PATTERN,
+                   OVERLAY_SELECTORS, REMOVE_OVERLAYS_JS)
+from .common.ad_blocker import setup_ad_blocking_async
+from ..core.readiness import async_wait_until_ready, WaitReport
+
+if TYPE_CHECKING:
+    from ..core.async_browser import AsyncBrowserManager
+
+logger = logging.getLogger(__name__)
+
+class AsyncBaseExtractor(ABC):
+    """
+    Abstract base class for async server extractors
+    
+    Pages come from an AsyncBrowserManager pool, which also closes popups.
+    """
+    
+    def __init__(self, browser_manager: "AsyncBrowserManager"):
+        """
+        Initialize extractor with an async browser manager
+        
+        Args:
+            browser_manager: AsyncBrowserManager whose page pool supplies pages
+        """
+        self.browser_manager = browser_manager
+        self.wait_reports: List[WaitReport] = []
+    
+    @abstractmethod
+    async def extract(self, url: str, page: Optional[Page] = None) -> Union[ExtractionResult, List[ExtractionResult], None]:
+        """
+        Extract direct video link(s) from server URL
+        
+        Args:
+            url: Server URL to extract from
+            page: Optional existing Playwright Page to use
+            
+        Returns:
+            Single ExtractionResult, List of ExtractionResult, or None
+        """
+        pass
+    
+    async def new_page(self) -> Page:
+        return await self.browser_manager.checkout()
+    
+    async def release_page(self, page: Page):
+        await self.browser_manager.checkin(page)
+    
+    async def setup_page(self, page: Page):
+        """
+        Configure page with ad blocking
+        
+        Args:
+            page: Playwright Page object to configure
+        """
+        try:
+            await setup_ad_blocking_async(page)
+        except Exception as e:
+            logger.warning(f"Failed to setup page (may be closed): {e}")
+    
+    async def wait_until_ready(self, page: Page, timeout_ms: int, **conditions) -> WaitReport:
+        """Wait for page readiness (see core.readiness) and keep the report"""
+        report = await async_wait_until_ready(page, timeout_ms, **conditions)
+        self.wait_reports.append(report)
+        return report
+    
+    def wait_timings(self) -> List[Dict[str, Any]]:
+        """Reports for every readiness wait this extractor performed"""
+        return [report.to_dict() for report in self.wait_reports]
+    
+    async def extract_video_url(self, page: Page) -> Optional[str]:
+        """
+        Common video extraction logic (same order as BaseExtractor.extract_video_url)
+        
+        Args:
+            page: Playwright Page object
+            
+        Returns:
+            Video URL string or None if not found
+        """
+        video_url = await page.evaluate(VIDEO_SOURCE_JS)
+        if video_url:
+            return video_url
+        
+        iframe = page.locator('iframe').first
+        if await iframe.count() > 0:
+            src = await iframe.get_attribute("src")
+            if src and not any(ad in src.lower() for ad in AD_IFRAME_MARKERS):
+                return src
+        
+        try:
+            content = await page.content()
+            m3u8_matches = re.findall(M3U8_URL_PATTERN, content)
+            if m3u8_matches:
+                return m3u8_matches[0]
+        except Exception as e:
+            logger.warning(f"Error checking for m3u8: {e}")
+        
+        return None
+    
+    async def remove_overlays(self, page: Page, overlay_selectors: Optional[List[str]] = None):
+        """Remove overlay divs that block clicks (see BaseExtractor.remove_overlays)"""
+        try:
+            await page.evaluate(REMOVE_OVERLAYS_JS, overlay_selectors or OVERLAY_SELECTORS)
+        except Exception as e:
+            logger.warning(f"Error removing overlays: {e}")
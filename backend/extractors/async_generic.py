@@ -0,0 +1,68 @@
+"""
+Async Generic Extractor
+Fallback extractor for unknown server URLs on the asyncio path
+"""
+
+import logging
+from typing import Dict, Any
+
+from .async_base import AsyncBaseExtractor
+
+logger = logging.getLogger(__name__)
+
+class AsyncGenericExtractor(AsyncBaseExtractor):
+    """
+    Generic extractor for unknown servers (async)
+    
+    Same patterns and result shape as GenericExtractor
+    """
+    
+    async def extract(self, url: str, page=None) -> Dict[str, Any]:
+        """
+        Extract video URL using generic patterns
+        
+        Args:
+            url: Server URL
+            
+        Returns:
+            Dict with video_url, quality, server, and metadata
+        """
+        page = await self.new_page()
+        
+        try:
+            logger.info(f"Extracting from unknown server (async): {url}")
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            await self.setup_page(page)
+            
+            await self.wait_until_ready(page, 2000, video=True, media=True,
+                                        selector="source[src*='.mp4'], a[href*='.mp4'], iframe",
+                                        label="generic video")
+            
+            video_url = await self.extract_video_url(page)
+            
+            if not video_url:
+                logger.warning(f"Could not extract video URL from {url}")
+                return {
+                    "video_url": None,
+                    "quality": "Unknown",
+                    "server": "Generic",
+                    "metadata": {"waits": self.wait_timings()}
+                }
+            
+            return {
+                "video_url": video_url,
+                "quality": "Auto",
+                "server": "Generic",
+                "metadata": {"waits": self.wait_timings()}
+            }
+            
+        except Exception as e:
+            logger.error(f"Error extracting from {url}: {e}")
+            return {
+                "video_url": None,
+                "quality": "Unknown",
+                "server": "Generic",
+                "metadata": {"error": str(e)}
+            }
+        finally:
+            await self.release_page(page)
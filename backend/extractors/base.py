@@ -6,15 +6,64 @@ Abstract base class providing common functionality for all server extractors
 import re
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, TYPE_CHECKING
 from playwright.sync_api import BrowserContext, Page
 from dataclasses import dataclass, asdict
 
 from .common.ad_blocker import setup_ad_blocking
 from .common.popup_handler import setup_popup_handler
+from ..core.readiness import wait_until_ready, WaitReport
+
+if TYPE_CHECKING:
+    from ..core.browser import BrowserManager
 
 logger = logging.getLogger(__name__)
 
+# Shared with AsyncBaseExtractor
+VIDEO_SOURCE_JS = """
+    () => {
+        const video = document.querySelector('video');
+        if (video) {
+            if (video.src) return video.src;
+            if (video.currentSrc) return video.currentSrc;
+            const source = video.querySelector('source');
+            if (source) return source.src;
+        }
+        
+        const source = document.querySelector('source[src*=".mp4"]');
+        if (source) return source.src;
+        
+        const link = document.querySelector('a[href*=".mp4"]');
+        if (link && link.href.endsWith('.mp4')) return link.href;
+        
+        return null;
+    }
+"""
+
+AD_IFRAME_MARKERS = ["google", "facebook", "doubleclick"]
+
+# Fixed/absolute elements matching these are removed so they can't swallow clicks
+OVERLAY_SELECTORS = [
+    '[class*="overlay"]',
+    '[id*="overlay"]',
+    '[class*="popup"]',
+    '[id*="popup"]',
+]
+
+REMOVE_OVERLAYS_JS = """
+    (selectors) => {
+        selectors.forEach(selector => {
+            const elements = document.querySelectorAll(selector);
+            elements.forEach(el => {
+                if (el.style.position === 'fixed' || el.style.position === 'absolute') {
+                    el.remove();
+                }
+            });
+        });
+    }
+"""
+M3U8_URL_PATTERN = r'https?://[^\s"\'<>]+\.m3u8[^\s"\'<>]*'
+
 @dataclass
 class ExtractionResult:
     """
@@ -42,16 +91,24 @@ class BaseExtractor(ABC):
     - Timer waiting
     """
     
-    def __init__(self, browser_context: BrowserContext):
+    def __init__(self, browser_context: Optional[BrowserContext] = None,
+                 browser_manager: Optional["BrowserManager"] = None):
         """
-        Initialize extractor with browser context
+        Initialize extractor with browser context or a pooled browser manager
         
         Args:
             browser_context: Playwright BrowserContext for creating pages
+            browser_manager: BrowserManager whose page pool supplies pages (preferred)
         """
+        if browser_context is None and browser_manager is None:
+            raise ValueError("Either browser_context or browser_manager is required")
         self.context = browser_context
+        self.browser_manager = browser_manager
+        self.wait_reports: List[WaitReport] = []
         # Setup popup handler at context level (once per context)
-        setup_popup_handler(browser_context)
+        # Pooled pages close their own popups
+        if browser_context is not None:
+            setup_popup_handler(browser_context)
     
     @abstractmethod
     def extract(self, url: str, page: Optional[Page] = None) -> Union[ExtractionResult, List[ExtractionResult], None]:
@@ -67,6 +124,49 @@ class BaseExtractor(ABC):
         """
         pass
     
+    def new_page(self) -> Page:
+        """
+        Get a page to work with, from the pool when one is available
+        
+        Returns:
+            Playwright Page object (release with release_page)
+        """
+        if self.browser_manager is not None:
+            return self.browser_manager.checkout()
+        return self.context.new_page()
+    
+    def release_page(self, page: Page):
+        """
+        Return a page obtained from new_page
+        
+        Args:
+            page: Playwright Page object
+        """
+        if self.browser_manager is not None:
+            self.browser_manager.checkin(page)
+        else:
+            page.close()
+    
+    def wait_until_ready(self, page: Page, timeout_ms: int, **conditions) -> WaitReport:
+        """
+        Wait for page readiness (see core.readiness) and keep the report
+        
+        Args:
+            page: Playwright Page object
+            timeout_ms: Maximum time to wait
+            **conditions: video / selector / predicate / media / label
+            
+        Returns:
+            WaitReport for this wait
+        """
+        report = wait_until_ready(page, timeout_ms, **conditions)
+        self.wait_reports.append(report)
+        return report
+    
+    def wait_timings(self) -> List[Dict[str, Any]]:
+        """Reports for every readiness wait this extractor performed"""
+        return [report.to_dict() for report in self.wait_reports]
+    
     def setup_page(self, page: Page):
         """
         Configure page with ad blocking and popup handling
@@ -91,25 +191,7 @@ class BaseExtractor(ABC):
             Video URL string or None if not found
         """
         # 1. Check for video tag
-        video_url = page.evaluate("""
-            () => {
-                const video = document.querySelector('video');
-                if (video) {
-                    if (video.src) return video.src;
-                    if (video.currentSrc) return video.currentSrc;
-                    const source = video.querySelector('source');
-                    if (source) return source.src;
-                }
-                
-                const source = document.querySelector('source[src*=".mp4"]');
-                if (source) return source.src;
-                
-                const link = document.querySelector('a[href*=".mp4"]');
-                if (link && link.href.endsWith('.mp4')) return link.href;
-                
-                return null;
-            }
-        """)
+        video_url = page.evaluate(VIDEO_SOURCE_JS)
         
         if video_url:
             return video_url
@@ -118,13 +200,13 @@ class BaseExtractor(ABC):
         iframe = page.locator('iframe').first
         if iframe.count() > 0:
             src = iframe.get_attribute("src")
-            if src and not any(ad in src.lower() for ad in ["google", "facebook", "doubleclick"]):
+            if src and not any(ad in src.lower() for ad in AD_IFRAME_MARKERS):
                 return src
         
         # 3. Check for m3u8 in page content
         try:
             content = page.content()
-            m3u8_matches = re.findall(r'https?://[^\s"\'<>]+\.m3u8[^\s"\'<>]*', content)
+            m3u8_matches = re.findall(M3U8_URL_PATTERN, content)
             if m3u8_matches:
                 return m3u8_matches[0]
         except Exception as e:
@@ -164,28 +246,7 @@ class BaseExtractor(ABC):
             page: Playwright Page object
             overlay_selectors: List of CSS selectors for overlays to remove
         """
-        if overlay_selectors is None:
-            overlay_selectors = [
-                '[class*="overlay"]',
-                '[id*="overlay"]',
-                '[class*="popup"]',
-                '[id*="popup"]',
-            ]
-        
         try:
-            page.evaluate(f"""
-                () => {{
-                    const selectors = {overlay_selectors};
-                    selectors.forEach(selector => {{
-                        const elements = document.querySelectorAll(selector);
-                        elements.forEach(el => {{
-                            if (el.style.position === 'fixed' || el.style.position === 'absolute') {{
-                                el.remove();
-                            }}
-                        }});
-                    }});
-                }}
-            """)
+            page.evaluate(REMOVE_OVERLAYS_JS, overlay_selectors or OVERLAY_SELECTORS)
         except Exception as e:
             logger.warning(f"Error removing overlays: {e}")
-
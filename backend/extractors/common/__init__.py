@@ -2,8 +2,8 @@
 Common utilities for extractors
 """
 
-from .ad_blocker import setup_ad_blocking
+from .ad_blocker import setup_ad_blocking, setup_ad_blocking_async
 from .popup_handler import setup_popup_handler
 
-__all__ = ["setup_ad_blocking", "setup_popup_handler"]
+__all__ = ["setup_ad_blocking", "setup_ad_blocking_async", "setup_popup_handler"]
 
@@ -42,3 +42,18 @@ def setup_ad_blocking(page: Page):
     
     page.route("**/*", handle_route)
 
+async def setup_ad_blocking_async(page):
+    """
+    Async Playwright version of setup_ad_blocking
+    
+    Args:
+        page: playwright.async_api Page object
+    """
+    async def handle_route(route):
+        if should_block_request(route.request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    await page.route("**/*", handle_route)
+
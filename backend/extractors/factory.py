@@ -4,15 +4,24 @@ Routes URLs to appropriate extractor instances
 """
 
 import logging
-from typing import Dict, Type
+from typing import Dict, Type, Optional, TYPE_CHECKING
 from urllib.parse import urlparse
 from playwright.sync_api import BrowserContext
 
 from .base import BaseExtractor
 from .generic import GenericExtractor
+from .async_base import AsyncBaseExtractor
+from .async_generic import AsyncGenericExtractor
 from .servers.forafile import ForafileExtractor
 from .servers.uqload import UqloadExtractor
 from .servers.multi_server import MultiServerExtractor
+from .servers.async_forafile import AsyncForafileExtractor
+from .servers.async_uqload import AsyncUqloadExtractor
+from .servers.async_multi_server import AsyncMultiServerExtractor
+
+if TYPE_CHECKING:
+    from ..core.browser import BrowserManager
+    from ..core.async_browser import AsyncBrowserManager
 
 logger = logging.getLogger(__name__)
 
@@ -43,14 +52,24 @@ class ExtractorFactory:
         # "vidbom": VidBomExtractor,
     }
     
+    # Async counterparts (playwright.async_api) of the registered extractors, matched with the
+    # same patterns; an extractor without one falls back to AsyncGenericExtractor
+    _async_extractors: Dict[Type[BaseExtractor], Type[AsyncBaseExtractor]] = {
+        ForafileExtractor: AsyncForafileExtractor,
+        UqloadExtractor: AsyncUqloadExtractor,
+        MultiServerExtractor: AsyncMultiServerExtractor,
+    }
+    
     @classmethod
-    def get_extractor(cls, url: str, browser_context: BrowserContext) -> BaseExtractor:
+    def get_extractor(cls, url: str, browser_context: Optional[BrowserContext] = None,
+                      browser_manager: Optional["BrowserManager"] = None) -> BaseExtractor:
         """
         Get appropriate extractor for the given URL
         
         Args:
             url: Server URL to extract from
             browser_context: Playwright BrowserContext for extractor
+            browser_manager: BrowserManager whose page pool the extractor should share
             
         Returns:
             BaseExtractor instance (specific extractor or GenericExtractor)
@@ -65,15 +84,45 @@ class ExtractorFactory:
             for pattern, extractor_class in cls._registry.items():
                 if pattern in domain or pattern in path:
                     logger.info(f"Matched {pattern} extractor for URL: {url}")
-                    return extractor_class(browser_context)
+                    return extractor_class(browser_context, browser_manager=browser_manager)
             
             # No match found, use generic extractor
             logger.info(f"No specific extractor found for {url}, using GenericExtractor")
-            return GenericExtractor(browser_context)
+            return GenericExtractor(browser_context, browser_manager=browser_manager)
             
         except Exception as e:
             logger.warning(f"Error parsing URL {url}: {e}, using GenericExtractor")
-            return GenericExtractor(browser_context)
+            return GenericExtractor(browser_context, browser_manager=browser_manager)
+    
+    @classmethod
+    def get_async_extractor(cls, url: str, browser_manager: "AsyncBrowserManager") -> AsyncBaseExtractor:
+        """
+        Get appropriate async extractor for the given URL
+        
+        Args:
+            url: Server URL to extract from
+            browser_manager: AsyncBrowserManager whose page pool the extractor uses
+            
+        Returns:
+            AsyncBaseExtractor instance (specific extractor or AsyncGenericExtractor)
+        """
+        try:
+            parsed = urlparse(url)
+            domain = parsed.netloc.lower()
+            path = parsed.path.lower()
+            
+            for pattern, extractor_class in cls._registry.items():
+                if pattern in domain or pattern in path:
+                    async_class = cls._async_extractors.get(extractor_class)
+                    if async_class is not None:
+                        logger.info(f"Matched {pattern} async extractor for URL: {url}")
+                        return async_class(browser_manager)
+                    break
+        except Exception as e:
+            logger.warning(f"Error parsing URL {url}: {e}, using AsyncGenericExtractor")
+        
+        logger.info(f"No specific async extractor for {url}, using AsyncGenericExtractor")
+        return AsyncGenericExtractor(browser_manager)
     
     @classmethod
     def needs_extraction(cls, url: str) -> bool:
@@ -101,14 +150,18 @@ class ExtractorFactory:
             return False
     
     @classmethod
-    def register_extractor(cls, pattern: str, extractor_class: Type[BaseExtractor]):
+    def register_extractor(cls, pattern: str, extractor_class: Type[BaseExtractor],
+                           async_extractor_class: Optional[Type[AsyncBaseExtractor]] = None):
         """
         Register a new extractor pattern (for future use)
         
         Args:
             pattern: Domain or URL pattern to match
             extractor_class: Extractor class to use
+            async_extractor_class: Its playwright.async_api counterpart, if any
         """
         cls._registry[pattern] = extractor_class
+        if async_extractor_class is not None:
+            cls._async_extractors[extractor_class] = async_extractor_class
         logger.info(f"Registered extractor {extractor_class.__name__} for pattern: {pattern}")
 
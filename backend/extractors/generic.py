@@ -33,15 +33,17 @@ class GenericExtractor(BaseExtractor):
         Returns:
             Dict with video_url, quality, server, and metadata
         """
-        page = self.context.new_page()
+        page = self.new_page()
         
         try:
             logger.info(f"Extracting from unknown server: {url}")
             page.goto(url, wait_until="domcontentloaded", timeout=30000)
             self.setup_page(page)
             
-            # Wait a bit for dynamic content
-            page.wait_for_timeout(2000)
+            # Wait for dynamic content (returns early once a source shows up)
+            self.wait_until_ready(page, 2000, video=True, media=True,
+                                  selector="source[src*='.mp4'], a[href*='.mp4'], iframe",
+                                  label="generic video")
             
             # Try to extract video URL using common patterns
             video_url = self.extract_video_url(page)
@@ -52,7 +54,7 @@ class GenericExtractor(BaseExtractor):
                     "video_url": None,
                     "quality": "Unknown",
                     "server": "Generic",
-                    "metadata": {}
+                    "metadata": {"waits": self.wait_timings()}
                 }
             
             logger.info(f"Successfully extracted video URL using generic patterns")
@@ -60,7 +62,7 @@ class GenericExtractor(BaseExtractor):
                 "video_url": video_url,
                 "quality": "Auto",
                 "server": "Generic",
-                "metadata": {}
+                "metadata": {"waits": self.wait_timings()}
             }
             
         except Exception as e:
@@ -72,5 +74,5 @@ class GenericExtractor(BaseExtractor):
                 "metadata": {"error": str(e)}
             }
         finally:
-            page.close()
+            self.release_page(page)
 
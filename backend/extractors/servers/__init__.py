@@ -5,6 +5,10 @@ Server-specific extractors
 from .forafile import ForafileExtractor
 from .uqload import UqloadExtractor
 from .multi_server import MultiServerExtractor
+from .async_forafile import AsyncForafileExtractor
+from .async_uqload import AsyncUqloadExtractor
+from .async_multi_server import AsyncMultiServerExtractor
 
-__all__ = ["ForafileExtractor", "UqloadExtractor", "MultiServerExtractor"]
+__all__ = ["ForafileExtractor", "UqloadExtractor", "MultiServerExtractor",
+           "AsyncForafileExtractor", "AsyncUqloadExtractor", "AsyncMultiServerExtractor"]
 
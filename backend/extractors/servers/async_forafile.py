@@ -0,0 +1,117 @@
+"""
+Async Forafile Extractor
+asyncio-native counterpart of ForafileExtractor (same flow and result shape)
+"""
+
+import logging
+from typing import Optional
+from playwright.async_api import Page
+
+from ..async_base import AsyncBaseExtractor
+from ..base import ExtractionResult
+
+logger = logging.getLogger(__name__)
+
+class AsyncForafileExtractor(AsyncBaseExtractor):
+    """
+    Extractor for Forafile server (async)
+
+    Flow: overlay click (popup closed) -> #downloadbtn -> video player -> video URL
+    """
+
+    async def extract(self, url: str, page: Optional[Page] = None) -> ExtractionResult:
+        """
+        Extract direct video link from Forafile URL
+
+        Args:
+            url: Forafile server URL
+            page: Optional existing page
+
+        Returns:
+            ExtractionResult with video_url, quality, server, and metadata
+        """
+        should_close_page = False
+        if not page:
+            try:
+                page = await self.new_page()
+                should_close_page = True
+                logger.info(f"Extracting from Forafile (async, New Page): {url}")
+                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            except Exception as e:
+                logger.error(f"Failed to create/navigate page: {e}")
+                if should_close_page:
+                    await self.release_page(page)
+                return None
+        else:
+            logger.info(f"Extracting from Forafile (async, Existing Page): {url}")
+            if page.url != url:
+                try:
+                    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+                except Exception:
+                    pass  # Maybe already there or redirect happened
+
+        try:
+            await self.setup_page(page)
+
+            # Forafile often has an overlay that triggers a popup on first click
+            overlay = page.locator("#download")
+            if await overlay.is_visible():
+                logger.info("Handling Forafile overlay...")
+                try:
+                    async with page.context.expect_page(timeout=5000) as popup_info:
+                        await overlay.click()
+                    popup = await popup_info.value
+                    await popup.close()
+                    logger.debug("Closed Forafile popup")
+                except Exception as e:
+                    logger.debug(f"No popup opened or popup handling failed: {e}")
+
+                await self.wait_until_ready(page, 1000, selector="#downloadbtn", label="forafile download button")
+
+            download_btn = page.locator("#downloadbtn")
+            if await download_btn.is_visible():
+                logger.info("Clicking Forafile download button...")
+                try:
+                    async with page.expect_navigation(timeout=60000, wait_until="domcontentloaded"):
+                        await download_btn.click()
+
+                    await page.wait_for_load_state("domcontentloaded")
+                    await self.wait_until_ready(page, 1000, video=True, media=True,
+                                                selector="source[src*='.mp4'], a[href*='.mp4']",
+                                                label="forafile player")
+                except Exception as e:
+                    logger.warning(f"Navigation after download button click failed: {e}")
+
+            video_url = await self.extract_video_url(page)
+
+            if not video_url:
+                logger.warning("Could not extract video URL from Forafile")
+                return ExtractionResult(
+                    video_url=None,
+                    quality="Unknown",
+                    server="Forafile",
+                    metadata={"waits": self.wait_timings()}
+                )
+
+            logger.info("Successfully extracted Forafile video URL")
+            return ExtractionResult(
+                video_url=video_url,
+                quality="Auto",
+                server="Forafile",
+                metadata={"waits": self.wait_timings()}
+            )
+
+        except Exception as e:
+            logger.error(f"Error extracting from Forafile: {e}")
+            return ExtractionResult(
+                video_url=None,
+                quality="Unknown",
+                server="Forafile",
+                metadata={"error": str(e)}
+            )
+        finally:
+            if should_close_page and page:
+                try:
+                    await self.release_page(page)
+                except Exception:
+                    pass
@@ -0,0 +1,256 @@
+"""
+Async Multi Download Server Extractor
+asyncio-native counterpart of MultiServerExtractor (same flow, selectors and results)
+"""
+
+import logging
+from typing import Dict, List, Optional
+from playwright.async_api import Page
+
+from ..async_base import AsyncBaseExtractor
+from ..base import ExtractionResult
+from .multi_server import (QUALITY_LINKS_SELECTOR, COUNTDOWN_DONE_JS, DOWNLOAD_BUTTON_SELECTORS, QUALITY_PATTERNS,
+                           FINAL_LINK_SELECTORS, PAGE_LINKS_JS, link_size, absolute_url, match_quality_links,
+                           match_quality_text)
+
+logger = logging.getLogger(__name__)
+
+class AsyncMultiServerExtractor(AsyncBaseExtractor):
+    """
+    Extractor for Multi Download server (async)
+
+    Returns a list of ExtractionResult objects, one for each available quality
+    """
+
+    async def extract(self, url: str, page: Optional[Page] = None) -> List[ExtractionResult]:
+        should_close_page = False
+        if not page:
+            try:
+                page = await self.new_page()
+                should_close_page = True
+            except Exception as e:
+                logger.error(f"Failed to create page: {e}")
+                return []
+
+        try:
+            logger.info(f"AsyncMultiServerExtractor processing: {url}")
+            await self.setup_page(page)
+
+            if page.url != url:
+                try:
+                    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                except Exception:
+                    pass  # Already there or redirect
+
+            try:
+                await page.wait_for_load_state('networkidle', timeout=5000)
+            except Exception:
+                pass
+
+            # Flow: hglink.to -> click Download -> cavanhabg.com/f/... (with quality options)
+            await self._open_quality_page(page)
+
+            results = []
+            for quality_info in await self._find_qualities(page):
+                try:
+                    results.append(await self._resolve_quality(quality_info))
+                except Exception as e:
+                    logger.warning(f"Error resolving {quality_info['quality']} quality: {e}")
+
+            if not results:
+                logger.info("No quality options found, trying generic extraction...")
+                fallback_url = await self.extract_video_url(page)
+                if fallback_url:
+                    results.append(ExtractionResult(
+                        video_url=fallback_url,
+                        quality="Auto",
+                        server="Multi (Fallback)"
+                    ))
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error extracting from Multi Download server: {e}")
+            return []
+        finally:
+            if should_close_page and page:
+                try:
+                    await self.release_page(page)
+                except Exception:
+                    pass
+
+    async def _open_quality_page(self, page: Page) -> bool:
+        """Get from the landing page to the quality selection page; True once there"""
+        if "cavanhabg.com/f/" in page.url or "haxloppd.com/f/" in page.url:
+            logger.info("Already on quality selection page")
+            return True
+
+        if "cavanhabg.com" in page.url and "/f/" not in page.url:
+            file_id = page.url.split('/')[-1]
+            if file_id and file_id not in ['', 'f']:
+                try:
+                    f_url = f"https://cavanhabg.com/f/{file_id}"
+                    logger.info(f"Navigating to quality page: {f_url}")
+                    await page.goto(f_url, wait_until="domcontentloaded", timeout=20000)
+                    await self.wait_until_ready(page, 2000, selector=QUALITY_LINKS_SELECTOR, label="quality links")
+                    logger.info(f"Navigated to: {page.url}")
+                    return True
+                except Exception as nav_e:
+                    logger.debug(f"Failed to navigate to /f/ page: {nav_e}")
+            return False
+
+        await self.remove_overlays(page)
+        for btn_selector in DOWNLOAD_BUTTON_SELECTORS:
+            btn = page.locator(btn_selector).first
+            if await btn.count() == 0:
+                continue
+            try:
+                if await page.locator("#countdown").count() > 0:
+                    logger.info("Waiting for countdown...")
+                    await self.wait_until_ready(page, 5000, predicate=COUNTDOWN_DONE_JS, label="countdown")
+
+                logger.info(f"Found download button ({btn_selector}), clicking...")
+                try:
+                    async with page.expect_navigation(timeout=20000, wait_until="domcontentloaded"):
+                        await btn.click()
+                    await self.wait_until_ready(page, 2000, selector=QUALITY_LINKS_SELECTOR, label="quality links")
+                    logger.info(f"Navigated to: {page.url}")
+                    return True
+                except Exception as click_e:
+                    # Fall back to following the link's href
+                    logger.debug(f"Normal click failed, trying href navigation: {click_e}")
+                    href = await btn.get_attribute("href")
+                    if href:
+                        if '/f/' not in href and 'cavanhabg.com' in page.url:
+                            file_id = page.url.split('/')[-1]
+                            if file_id:
+                                href = f"https://cavanhabg.com/f/{file_id}"
+                        await page.goto(href, wait_until="domcontentloaded", timeout=20000)
+                        await self.wait_until_ready(page, 2000, selector=QUALITY_LINKS_SELECTOR, label="quality links")
+                        logger.info(f"Navigated via href to: {page.url}")
+                        return True
+            except Exception as e:
+                logger.debug(f"Error with {btn_selector}: {e}")
+        return False
+
+    async def _find_qualities(self, page: Page) -> List[Dict]:
+        """Quality options ({quality, url, size, name}) on the quality selection page"""
+        all_page_links = await page.evaluate(PAGE_LINKS_JS)
+        logger.info(f"Found {len(all_page_links)} total links on {page.url}")
+        found_qualities = match_quality_links(all_page_links, page.url)
+        if found_qualities:
+            return found_qualities
+
+        logger.info("Trying text pattern matching...")
+        for pattern in QUALITY_PATTERNS:
+            quality_elem = page.locator(pattern["selector"]).first
+            if await quality_elem.count() == 0:
+                continue
+            try:
+                parent = quality_elem.locator("..")
+                if await parent.count() == 0:
+                    parent = quality_elem.locator("../..")
+
+                link = parent.locator("a").first
+                if await link.count() == 0:
+                    link = page.locator(f"a:has-text('Click to download'):near(text={pattern['text']})").first
+
+                if await link.count() > 0:
+                    href = await link.get_attribute("href")
+                    if href:
+                        parent_text = await parent.inner_text() if await parent.count() > 0 else ""
+                        size = link_size(parent_text)
+                        href = absolute_url(href, page.url)
+                        found_qualities.append({
+                            "quality": pattern["quality"],
+                            "url": href,
+                            "size": size,
+                            "name": pattern["text"]
+                        })
+                        logger.info(f"Found quality: {pattern['quality']} ({size}) - {href[:60]}...")
+            except Exception as e:
+                logger.debug(f"Error extracting {pattern['text']}: {e}")
+        if found_qualities:
+            return found_qualities
+
+        logger.info("Trying alternative method: parsing page content...")
+        page_content = await page.evaluate("() => document.body.innerText")
+        found_qualities = match_quality_text(all_page_links, page_content)
+        logger.info(f"Found {len(found_qualities)} quality options via content parsing")
+        return found_qualities
+
+    async def _resolve_quality(self, quality_info: Dict) -> ExtractionResult:
+        """Follow one quality link to its final video URL (the quality URL itself if that fails)"""
+        q_url, q_quality, q_size = quality_info['url'], quality_info['quality'], quality_info['size']
+        logger.info(f"Resolving {q_quality} quality link: {q_url[:60]}...")
+
+        final_video_url = None
+        quality_page = None
+        try:
+            quality_page = await self.new_page()
+            await self.setup_page(quality_page)
+            await quality_page.goto(q_url, wait_until="domcontentloaded", timeout=20000)
+            await self.wait_until_ready(quality_page, 2000, video=True,
+                                        selector="a[href*='.mp4'], a.btn-primary, button.btn-primary",
+                                        label="quality download link")
+
+            for selector in FINAL_LINK_SELECTORS:
+                try:
+                    final_video_url = await self._final_link(quality_page, selector)
+                except Exception as selector_e:
+                    logger.debug(f"Error with selector {selector}: {selector_e}")
+                if final_video_url:
+                    break
+
+            if not final_video_url:
+                final_video_url = await self.extract_video_url(quality_page)
+            if not final_video_url and (".mp4" in quality_page.url or ".m3u8" in quality_page.url):
+                final_video_url = quality_page.url
+        except Exception as page_e:
+            logger.warning(f"Error processing quality page: {page_e}")
+        finally:
+            if quality_page:
+                try:
+                    await self.release_page(quality_page)
+                except Exception:
+                    pass
+
+        if final_video_url:
+            logger.info(f"✓ Extracted {q_quality} quality: {final_video_url[:60]}...")
+            return ExtractionResult(
+                video_url=final_video_url,
+                quality=q_quality,
+                server=f"Multi ({q_size})",
+                metadata={"size": q_size, "waits": self.wait_timings()}
+            )
+        logger.warning(f"Could not extract final URL for {q_quality}, using quality URL")
+        return ExtractionResult(
+            video_url=q_url,
+            quality=q_quality,
+            server=f"Multi ({q_size})",
+            metadata={"size": q_size, "needs_resolution": True}
+        )
+
+    async def _final_link(self, quality_page: Page, selector: str) -> Optional[str]:
+        """Video URL behind one download link/button of a quality page"""
+        dl_elem = quality_page.locator(selector).first
+        if await dl_elem.count() == 0:
+            return None
+        if selector.endswith("a[href*='.mp4']"):
+            return await dl_elem.get_attribute("href")
+
+        if await dl_elem.evaluate("el => el.tagName") == "A":
+            href = await dl_elem.get_attribute("href")
+            return href if href and (".mp4" in href or href.startswith("http")) else None
+
+        # A button: click it and see where it leads
+        try:
+            async with quality_page.expect_navigation(timeout=10000, wait_until="domcontentloaded"):
+                await dl_elem.click()
+            await self.wait_until_ready(quality_page, 2000, video=True, media=True, label="final video")
+            if ".mp4" in quality_page.url or ".m3u8" in quality_page.url:
+                return quality_page.url
+            return await self.extract_video_url(quality_page)
+        except Exception as click_e:
+            logger.debug(f"Click failed: {click_e}")
+            return None
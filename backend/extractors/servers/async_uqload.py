@@ -0,0 +1,58 @@
+"""
+Async Uqload Extractor
+asyncio-native counterpart of UqloadExtractor
+"""
+
+import re
+import logging
+from typing import Optional
+from playwright.async_api import Page
+
+from ..async_base import AsyncBaseExtractor
+from ..base import ExtractionResult, VIDEO_SOURCE_JS
+from .uqload import SOURCES_PATTERN
+
+logger = logging.getLogger(__name__)
+
+class AsyncUqloadExtractor(AsyncBaseExtractor):
+    """Extractor for Uqload server (async); Uqload is usually 720p"""
+
+    async def extract(self, url: str, page: Optional[Page] = None) -> Optional[ExtractionResult]:
+        logger.info(f"AsyncUqloadExtractor processing: {url}")
+        should_close_page = page is None
+        if should_close_page:
+            page = await self.new_page()
+
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            await self.setup_page(page)
+
+            # Uqload usually needs a click on the poster / play button to load the source
+            try:
+                play_mask = page.locator("div.vjs-poster, div.vjs-big-play-button")
+                if await play_mask.count() > 0 and await play_mask.first.is_visible():
+                    logger.info("Clicking play mask/button to trigger video...")
+                    await play_mask.first.click(timeout=5000)
+                    await self.wait_until_ready(page, 1000, video=True, media=True, label="uqload video")
+            except Exception as e:
+                logger.debug(f"Handling play button failed (might not exist): {e}")
+
+            # Method A: Direct Video Source in DOM
+            video_url = await page.evaluate(VIDEO_SOURCE_JS)
+            if video_url:
+                return ExtractionResult(video_url=video_url, quality="720p", server="Uqload",
+                                        metadata={"waits": self.wait_timings()})
+
+            # Method B: Regex in Script tags (Packer or simple var)
+            sources = re.findall(SOURCES_PATTERN, await page.content())
+            if sources and sources[0].endswith(".mp4"):
+                return ExtractionResult(video_url=sources[0], quality="720p", server="Uqload",
+                                        metadata={"waits": self.wait_timings()})
+
+            return None
+        except Exception as e:
+            logger.error(f"Error extracting from Uqload: {e}")
+            return None
+        finally:
+            if should_close_page:
+                await self.release_page(page)
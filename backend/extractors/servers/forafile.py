@@ -37,7 +37,7 @@ class ForafileExtractor(BaseExtractor):
         should_close_page = False
         if not page:
             try:
-                page = self.context.new_page()
+                page = self.new_page()
                 should_close_page = True
                 logger.info(f"Extracting from Forafile (New Page): {url}")
                 page.goto(url, wait_until="domcontentloaded", timeout=30000)
@@ -62,7 +62,7 @@ class ForafileExtractor(BaseExtractor):
             if overlay.is_visible():
                 logger.info("Handling Forafile overlay...")
                 try:
-                    with self.context.expect_page(timeout=5000) as popup_info:
+                    with page.context.expect_page(timeout=5000) as popup_info:
                         overlay.click()
                     
                     # Close the popup that opens
@@ -72,8 +72,8 @@ class ForafileExtractor(BaseExtractor):
                 except Exception as e:
                     logger.debug(f"No popup opened or popup handling failed: {e}")
                 
-                # Small wait for UI update
-                page.wait_for_timeout(1000)
+                # Wait for UI update
+                self.wait_until_ready(page, 1000, selector="#downloadbtn", label="forafile download button")
             
             # Click download button
             download_btn = page.locator("#downloadbtn")
@@ -85,7 +85,9 @@ class ForafileExtractor(BaseExtractor):
                     
                     # Wait for page to stabilize
                     page.wait_for_load_state("domcontentloaded")
-                    page.wait_for_timeout(1000)
+                    self.wait_until_ready(page, 1000, video=True, media=True,
+                                          selector="source[src*='.mp4'], a[href*='.mp4']",
+                                          label="forafile player")
                 except Exception as e:
                     logger.warning(f"Navigation after download button click failed: {e}")
             
@@ -98,7 +100,7 @@ class ForafileExtractor(BaseExtractor):
                     video_url=None,
                     quality="Unknown",
                     server="Forafile",
-                    metadata={}
+                    metadata={"waits": self.wait_timings()}
                 )
             
             logger.info(f"Successfully extracted Forafile video URL")
@@ -106,7 +108,7 @@ class ForafileExtractor(BaseExtractor):
                 video_url=video_url,
                 quality="Auto",
                 server="Forafile",
-                metadata={}
+                metadata={"waits": self.wait_timings()}
             )
             
         except Exception as e:
@@ -120,7 +122,7 @@ class ForafileExtractor(BaseExtractor):
         finally:
             if should_close_page and page:
                 try:
-                    page.close()
+                    self.release_page(page)
                 except:
                     pass
 
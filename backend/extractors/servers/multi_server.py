@@ -11,6 +11,131 @@ from ..base import BaseExtractor, ExtractionResult
 
 logger = logging.getLogger(__name__)
 
+# Quality links end with _h / _n / _l (Full HD / HD / Normal)
+QUALITY_LINKS_SELECTOR = "a[href$='_h'], a[href$='_n'], a[href$='_l']"
+
+# Countdown is done once the element is gone, hidden or shows no remaining seconds
+COUNTDOWN_DONE_JS = """
+    () => {
+        const el = document.querySelector('#countdown');
+        return !el || el.offsetParent === null || !/[1-9]/.test(el.innerText);
+    }
+"""
+
+# Buttons leading from the landing page (hglink.to) to the quality page (cavanhabg.com/f/...)
+DOWNLOAD_BUTTON_SELECTORS = [
+    "a[href*='/f/']",  # Try this first - it's the most reliable
+    "a:has-text('Download')",
+    "button:has-text('Download')",
+    "a:has-text('Create Download Link')",
+    "button:has-text('Create Download Link')"
+]
+
+QUALITY_PATTERNS = [
+    {"text": "Full HD quality", "quality": "1080p", "selector": "text=Full HD quality"},
+    {"text": "HD quality", "quality": "720p", "selector": "text=HD quality"},
+    {"text": "Normal quality", "quality": "480p", "selector": "text=Normal quality"},
+    {"text": "SD quality", "quality": "480p", "selector": "text=SD quality"},
+    {"text": "Low quality", "quality": "360p", "selector": "text=Low quality"},
+]
+
+# Download button/link on a quality page
+FINAL_LINK_SELECTORS = [
+    "a:has-text('Download')",
+    "button:has-text('Download')",
+    "a:has-text('Download File')",
+    "a[href*='.mp4']",
+    "a.btn-primary",
+    "button.btn-primary"
+]
+
+# Every link with the text around it (the quality and size are in the parent's text)
+PAGE_LINKS_JS = """
+    () => {
+        return Array.from(document.querySelectorAll('a')).map(a => ({
+            href: a.href,
+            text: a.innerText.trim(),
+            parentText: a.parentElement ? a.parentElement.innerText.trim() : '',
+            fullText: a.parentElement ? a.parentElement.innerText.trim() : a.innerText.trim()
+        }));
+    }
+"""
+
+SIZE_PATTERN = re.compile(r'(\d+(?:\.\d+)?\s*(?:GB|MB|KB))', re.IGNORECASE)
+
+def link_quality(href: str, full_text: str) -> Optional[str]:
+    """Quality of a link from its URL suffix, else from the text around it"""
+    # First check URL pattern (most reliable: setft11iyw7b_h, setft11iyw7b_n, setft11iyw7b_l)
+    if href.endswith('_h') or ('/f/' in href and '_h' in href and not href.endswith('_n') and not href.endswith('_l')):
+        return "1080p"
+    elif href.endswith('_n') or ('/f/' in href and '_n' in href and not href.endswith('_l')):
+        return "720p"
+    elif href.endswith('_l') or ('/f/' in href and '_l' in href):
+        return "480p"
+    # Then check for quality in full text (parent text contains quality info)
+    elif "full hd quality" in full_text or ("full hd" in full_text and "1920" in full_text):
+        return "1080p"
+    elif "hd quality" in full_text and "full" not in full_text or ("hd" in full_text and "1440" in full_text) or ("hd" in full_text and "720" in full_text):
+        return "720p"
+    elif "normal quality" in full_text or ("normal" in full_text and "960" in full_text) or ("normal" in full_text and "480" in full_text):
+        return "480p"
+    elif "360" in full_text:
+        return "360p"
+    return None
+
+def link_size(text: str) -> str:
+    size_match = SIZE_PATTERN.search(text)
+    return size_match.group(1) if size_match else "Unknown"
+
+def absolute_url(href: str, page_url: str) -> str:
+    """Construct absolute URL if relative"""
+    if href.startswith("http"):
+        return href
+    base_url = "/".join(page_url.split("/")[:3])
+    return base_url + href if href.startswith("/") else base_url + "/" + href
+
+def match_quality_links(links: List[dict], page_url: str) -> List[dict]:
+    """Quality options ({quality, url, size, name}) among PAGE_LINKS_JS results"""
+    found_qualities = []
+    for link in links:
+        href = link['href']
+        if not href or "javascript" in href or href == "#":
+            continue
+        
+        quality = link_quality(href, link['fullText'].lower())
+        if quality:
+            size = link_size(link['fullText'])
+            href = absolute_url(href, page_url)
+            if not any(q['url'] == href for q in found_qualities):
+                found_qualities.append({
+                    "quality": quality,
+                    "url": href,
+                    "size": size,
+                    "name": f"{quality} quality"
+                })
+                logger.info(f"Found quality: {quality} ({size}) - {href[:60]}...")
+    return found_qualities
+
+def match_quality_text(links: List[dict], page_text: str) -> List[dict]:
+    """Fallback: first link per quality label found in the page text"""
+    found_qualities = []
+    for pattern in QUALITY_PATTERNS:
+        if pattern["text"].lower() not in page_text.lower():
+            continue
+        for link in links:
+            if pattern["text"].lower() in link["parentText"].lower() or pattern["text"].lower() in link["text"].lower():
+                href = link["href"]
+                if href and "javascript" not in href and href != "#":
+                    if not any(q['url'] == href for q in found_qualities):
+                        found_qualities.append({
+                            "quality": pattern["quality"],
+                            "url": href,
+                            "size": link_size(link["parentText"]),
+                            "name": pattern["text"]
+                        })
+                        break
+    return found_qualities
+
 class MultiServerExtractor(BaseExtractor):
     """
     Extractor for Multi Download server that supports multiple quality options
@@ -26,7 +151,7 @@ class MultiServerExtractor(BaseExtractor):
         should_close_page = False
         if not page:
             try:
-                page = self.context.new_page()
+                page = self.new_page()
                 should_close_page = True
             except Exception as e:
                 logger.error(f"Failed to create page: {e}")
@@ -60,14 +185,6 @@ class MultiServerExtractor(BaseExtractor):
             
             # Check if we need to click a download button first
             # Try multiple button selectors
-            download_buttons = [
-                "a[href*='/f/']",  # Try this first - it's the most reliable
-                "a:has-text('Download')",
-                "button:has-text('Download')",
-                "a:has-text('Create Download Link')",
-                "button:has-text('Create Download Link')"
-            ]
-            
             clicked_download = False
             
             # Check if we're already on the quality page (cavanhabg.com/f/...)
@@ -82,7 +199,7 @@ class MultiServerExtractor(BaseExtractor):
                         f_url = f"https://cavanhabg.com/f/{file_id}"
                         logger.info(f"Navigating to quality page: {f_url}")
                         page.goto(f_url, wait_until="domcontentloaded", timeout=20000)
-                        page.wait_for_timeout(2000)
+                        self.wait_until_ready(page, 2000, selector=QUALITY_LINKS_SELECTOR, label="quality links")
                         clicked_download = True
                         logger.info(f"Navigated to: {page.url}")
                     except Exception as nav_e:
@@ -94,14 +211,14 @@ class MultiServerExtractor(BaseExtractor):
                 except Exception as overlay_e:
                     logger.debug(f"Error removing overlays: {overlay_e}")
                 
-                for btn_selector in download_buttons:
+                for btn_selector in DOWNLOAD_BUTTON_SELECTORS:
                     btn = page.locator(btn_selector).first
                     if btn.count() > 0:
                         try:
                             # Wait for countdown if exists
                             if page.locator("#countdown").count() > 0:
                                 logger.info("Waiting for countdown...")
-                                page.wait_for_timeout(5000)
+                                self.wait_until_ready(page, 5000, predicate=COUNTDOWN_DONE_JS, label="countdown")
                             
                             # Try JavaScript click if normal click fails
                             logger.info(f"Found download button ({btn_selector}), clicking...")
@@ -109,7 +226,7 @@ class MultiServerExtractor(BaseExtractor):
                                 with page.expect_navigation(timeout=20000, wait_until="domcontentloaded"):
                                     btn.click()
                                 clicked_download = True
-                                page.wait_for_timeout(2000)
+                                self.wait_until_ready(page, 2000, selector=QUALITY_LINKS_SELECTOR, label="quality links")
                                 logger.info(f"Navigated to: {page.url}")
                                 break
                             except Exception as click_e:
@@ -127,7 +244,7 @@ class MultiServerExtractor(BaseExtractor):
                                         
                                         page.goto(href, wait_until="domcontentloaded", timeout=20000)
                                         clicked_download = True
-                                        page.wait_for_timeout(2000)
+                                        self.wait_until_ready(page, 2000, selector=QUALITY_LINKS_SELECTOR, label="quality links")
                                         logger.info(f"Navigated via href to: {page.url}")
                                         break
                                 except Exception as js_e:
@@ -142,91 +259,24 @@ class MultiServerExtractor(BaseExtractor):
             
             # Method 1: Look for quality text patterns (Full HD quality, HD quality, Normal quality)
             # Also check for "Click to download" links near quality text
-            quality_patterns = [
-                {"text": "Full HD quality", "quality": "1080p", "selector": "text=Full HD quality"},
-                {"text": "HD quality", "quality": "720p", "selector": "text=HD quality"},
-                {"text": "Normal quality", "quality": "480p", "selector": "text=Normal quality"},
-                {"text": "SD quality", "quality": "480p", "selector": "text=SD quality"},
-                {"text": "Low quality", "quality": "360p", "selector": "text=Low quality"},
-            ]
-            
             # Also try finding by "Click to download" text which appears near quality options
             click_to_download_links = page.locator("a:has-text('Click to download')")
             if click_to_download_links.count() > 0:
                 logger.info(f"Found {click_to_download_links.count()} 'Click to download' links")
             
-            found_qualities = []
-            
             # First, try to find all links and match them with quality text
-            # Get all links with their parent text to find quality options
-            all_page_links = page.evaluate("""
-                () => {
-                    return Array.from(document.querySelectorAll('a')).map(a => ({
-                        href: a.href,
-                        text: a.innerText.trim(),
-                        parentText: a.parentElement ? a.parentElement.innerText.trim() : '',
-                        fullText: a.parentElement ? a.parentElement.innerText.trim() : a.innerText.trim()
-                    }));
-                }
-            """)
+            # The quality info is in the link text or parent text
+            all_page_links = page.evaluate(PAGE_LINKS_JS)
             
             logger.info(f"Found {len(all_page_links)} total links on page")
             logger.info(f"Current page URL: {page.url}")
             
-            # Match all links with quality patterns
-            # The quality info is in the link text or parent text
-            for link in all_page_links:
-                full_text = link['fullText'].lower()
-                href = link['href']
-                
-                if not href or "javascript" in href or href == "#":
-                    continue
-                
-                # Match quality - check for quality indicators in full text
-                quality = None
-                size = "Unknown"
-                
-                # First check URL pattern (most reliable: setft11iyw7b_h, setft11iyw7b_n, setft11iyw7b_l)
-                if href.endswith('_h') or ('/f/' in href and '_h' in href and not href.endswith('_n') and not href.endswith('_l')):
-                    quality = "1080p"
-                elif href.endswith('_n') or ('/f/' in href and '_n' in href and not href.endswith('_l')):
-                    quality = "720p"
-                elif href.endswith('_l') or ('/f/' in href and '_l' in href):
-                    quality = "480p"
-                # Then check for quality in full text (parent text contains quality info)
-                elif "full hd quality" in full_text or ("full hd" in full_text and "1920" in full_text):
-                    quality = "1080p"
-                elif "hd quality" in full_text and "full" not in full_text or ("hd" in full_text and "1440" in full_text) or ("hd" in full_text and "720" in full_text):
-                    quality = "720p"
-                elif "normal quality" in full_text or ("normal" in full_text and "960" in full_text) or ("normal" in full_text and "480" in full_text):
-                    quality = "480p"
-                elif "360" in full_text:
-                    quality = "360p"
-                
-                if quality:
-                    # Extract size from full text
-                    size_match = re.search(r'(\d+(?:\.\d+)?\s*(?:GB|MB|KB))', link['fullText'], re.IGNORECASE)
-                    size = size_match.group(1) if size_match else "Unknown"
-                    
-                    # Construct absolute URL if relative
-                    if not href.startswith("http"):
-                        base_parts = page.url.split("/")[:3]
-                        base_url = "/".join(base_parts)
-                        href = base_url + href if href.startswith("/") else base_url + "/" + href
-                    
-                    if not any(q['url'] == href for q in found_qualities):
-                        found_qualities.append({
-                            "quality": quality,
-                            "url": href,
-                            "size": size,
-                            "name": f"{quality} quality"
-                        })
-                        logger.info(f"Found quality: {quality} ({size}) - {href[:60]}...")
+            found_qualities = match_quality_links(all_page_links, page.url)
             
             # Fallback: Try to find quality options by text patterns
             if not found_qualities:
                 logger.info("Trying text pattern matching...")
-                for pattern in quality_patterns:
+                for pattern in QUALITY_PATTERNS:
                     quality_elem = page.locator(pattern["selector"]).first
                     if quality_elem.count() > 0:
                         try:
@@ -246,14 +296,8 @@ class MultiServerExtractor(BaseExtractor):
                                 if href:
                                     # Get size from parent text
                                     parent_text = parent.inner_text() if parent.count() > 0 else ""
-                                    size_match = re.search(r'(\d+(?:\.\d+)?\s*(?:GB|MB|KB))', parent_text, re.IGNORECASE)
-                                    size = size_match.group(1) if size_match else "Unknown"
-                                    
-                                    # Construct absolute URL if relative
-                                    if not href.startswith("http"):
-                                        base_parts = page.url.split("/")[:3]
-                                        base_url = "/".join(base_parts)
-                                        href = base_url + href if href.startswith("/") else base_url + "/" + href
+                                    size = link_size(parent_text)
+                                    href = absolute_url(href, page.url)
                                     
                                     found_qualities.append({
                                         "quality": pattern["quality"],
@@ -269,37 +313,7 @@ class MultiServerExtractor(BaseExtractor):
             if not found_qualities:
                 logger.info("Trying alternative method: parsing page content...")
                 page_content = page.evaluate("() => document.body.innerText")
-                
-                # Look for quality patterns in text
-                for pattern in quality_patterns:
-                    if pattern["text"].lower() in page_content.lower():
-                        # Find all links and check which one is near this quality text
-                        all_links = page.evaluate("""
-                            () => {
-                                return Array.from(document.querySelectorAll('a')).map(a => ({
-                                    href: a.href,
-                                    text: a.innerText.trim(),
-                                    parentText: a.parentElement ? a.parentElement.innerText.trim() : ''
-                                }));
-                            }
-                        """)
-                        
-                        for link in all_links:
-                            if pattern["text"].lower() in link["parentText"].lower() or pattern["text"].lower() in link["text"].lower():
-                                href = link["href"]
-                                if href and "javascript" not in href and href != "#":
-                                    # Extract size from parent text
-                                    size_match = re.search(r'(\d+(?:\.\d+)?\s*(?:GB|MB|KB))', link["parentText"], re.IGNORECASE)
-                                    size = size_match.group(1) if size_match else "Unknown"
-                                    
-                                    if not any(q['url'] == href for q in found_qualities):
-                                        found_qualities.append({
-                                            "quality": pattern["quality"],
-                                            "url": href,
-                                            "size": size,
-                                            "name": pattern["text"]
-                                        })
-                                        break
+                found_qualities = match_quality_text(page.evaluate(PAGE_LINKS_JS), page_content)
                 
                 logger.info(f"Found {len(found_qualities)} quality options via content parsing")
                 
@@ -320,7 +334,7 @@ class MultiServerExtractor(BaseExtractor):
                     try:
                         # Check if context is still valid
                         try:
-                            quality_page = self.context.new_page()
+                            quality_page = self.new_page()
                         except Exception as context_e:
                             logger.warning(f"Context error when creating page: {context_e}")
                             # Fallback: use quality URL directly
@@ -339,19 +353,12 @@ class MultiServerExtractor(BaseExtractor):
                             # Continue anyway
                         
                         quality_page.goto(q_url, wait_until="domcontentloaded", timeout=20000)
-                        quality_page.wait_for_timeout(2000)
+                        self.wait_until_ready(quality_page, 2000, video=True,
+                                              selector="a[href*='.mp4'], a.btn-primary, button.btn-primary",
+                                              label="quality download link")
                     
                         # Look for download button/link
-                        download_selectors = [
-                            "a:has-text('Download')",
-                            "button:has-text('Download')",
-                            "a:has-text('Download File')",
-                            "a[href*='.mp4']",
-                            "a.btn-primary",
-                            "button.btn-primary"
-                        ]
-                        
-                        for selector in download_selectors:
+                        for selector in FINAL_LINK_SELECTORS:
                             try:
                                 dl_elem = quality_page.locator(selector).first
                                 if dl_elem.count() > 0:
@@ -370,7 +377,8 @@ class MultiServerExtractor(BaseExtractor):
                                             try:
                                                 with quality_page.expect_navigation(timeout=10000, wait_until="domcontentloaded"):
                                                     dl_elem.click()
-                                                quality_page.wait_for_timeout(2000)
+                                                self.wait_until_ready(quality_page, 2000, video=True, media=True,
+                                                                      label="final video")
                                                 # Check if we got redirected to video
                                                 current_url = quality_page.url
                                                 if ".mp4" in current_url or ".m3u8" in current_url:
@@ -401,7 +409,7 @@ class MultiServerExtractor(BaseExtractor):
                     finally:
                         if quality_page:
                             try:
-                                quality_page.close()
+                                self.release_page(quality_page)
                             except:
                                 pass
                     
@@ -410,7 +418,7 @@ class MultiServerExtractor(BaseExtractor):
                             video_url=final_video_url,
                             quality=q_quality,
                             server=f"Multi ({q_size})",
-                            metadata={"size": q_size}
+                            metadata={"size": q_size, "waits": self.wait_timings()}
                         ))
                         logger.info(f"✓ Extracted {q_quality} quality: {final_video_url[:60]}...")
                     else:
@@ -444,6 +452,6 @@ class MultiServerExtractor(BaseExtractor):
         finally:
             if should_close_page and page:
                 try:
-                    page.close()
+                    self.release_page(page)
                 except:
                     pass
@@ -1,48 +1,61 @@
-from ..base import BaseExtractor, ExtractionResult
+"""
+Uqload Extractor
+Handles extraction of direct video links from Uqload server
+"""
+
 import re
+import logging
+from typing import Optional
+from playwright.sync_api import Page
+
+from ..base import BaseExtractor, ExtractionResult, VIDEO_SOURCE_JS
+
+logger = logging.getLogger(__name__)
+
+# Player config in a script tag: sources: ["https://.../v.mp4"]
+SOURCES_PATTERN = r'sources:\s*\["([^"]+)"\]'
 
 class UqloadExtractor(BaseExtractor):
-    def extract(self, url: str) -> ExtractionResult:
-        self.logger.info(f"UqloadExtractor processing: {url}")
-        
-        # 1. Navigate to page
-        self.page.goto(url, wait_until="domcontentloaded")
-        
-        # 2. Check for Overlay/Click to play
-        # Uqload usually needs a click to start logic or remove overlay
+    """Extractor for Uqload server; Uqload is usually 720p"""
+
+    def extract(self, url: str, page: Optional[Page] = None) -> Optional[ExtractionResult]:
+        logger.info(f"UqloadExtractor processing: {url}")
+        should_close_page = page is None
+        if should_close_page:
+            page = self.new_page()
+
         try:
-            # Try specific play button mask often used by Uqload
-            play_mask = self.page.locator("div.vjs-poster, div.vjs-big-play-button")
-            if play_mask.count() > 0 and play_mask.first.is_visible():
-                self.logger.info("Clicking play mask/button to trigger video...")
-                # Handling generic popup if it occurs on click
-                with self.handle_popups():
+            # 1. Navigate to page
+            page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            self.setup_page(page)
+
+            # 2. Uqload usually needs a click on the poster / play button to load the source
+            try:
+                play_mask = page.locator("div.vjs-poster, div.vjs-big-play-button")
+                if play_mask.count() > 0 and play_mask.first.is_visible():
+                    logger.info("Clicking play mask/button to trigger video...")
                     play_mask.first.click(timeout=5000)
-                self.page.wait_for_timeout(1000)
+                    self.wait_until_ready(page, 1000, video=True, media=True, label="uqload video")
+            except Exception as e:
+                logger.debug(f"Handling play button failed (might not exist): {e}")
+
+            # 3. Extract Video URL
+            # Method A: Direct Video Source in DOM
+            video_url = page.evaluate(VIDEO_SOURCE_JS)
+            if video_url:
+                return ExtractionResult(video_url=video_url, quality="720p", server="Uqload",
+                                        metadata={"waits": self.wait_timings()})
+
+            # Method B: Regex in Script tags (Packer or simple var)
+            sources = re.findall(SOURCES_PATTERN, page.content())
+            if sources and sources[0].endswith(".mp4"):
+                return ExtractionResult(video_url=sources[0], quality="720p", server="Uqload",
+                                        metadata={"waits": self.wait_timings()})
+
+            return None
         except Exception as e:
-            self.logger.debug(f"Handling play button failed (might not exist): {e}")
-
-        # 3. Extract Video URL
-        # Method A: Direct Video Source in DOM
-        video_url = self.find_video_tag_source()
-        if video_url:
-            return ExtractionResult(
-                video_url=video_url,
-                quality="720p", # Uqload is usually 720p
-                server="Uqload"
-            )
-
-        # Method B: Regex in Script tags (Packer or simple var)
-        content = self.page.content()
-        sources = re.findall(r'sources:\s*\["([^"]+)"\]', content)
-        if sources and sources[0].endswith(".mp4"):
-             return ExtractionResult(
-                video_url=sources[0],
-                quality="720p",
-                server="Uqload"
-            )
-
-        # Method C: Generic Fallback logic from Base
-        # Usually base extractors are good at finding hidden sources
-        
-        return None
+            logger.error(f"Error extracting from Uqload: {e}")
+            return None
+        finally:
+            if should_close_page:
+                self.release_page(page)
@@ -23,18 +23,28 @@ from datetime import datetime
 import backend.database as db
 db.init_db()
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from backend.api import main_router
 from backend.api.main_router import router as api_router
 from backend.api.library_router import router as library_router
 import uvicorn
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Router on_event handlers are ignored once a lifespan is set, so startup/shutdown live here
+    await main_router.startup()
+    yield
+    await main_router.shutdown()
+
 app = FastAPI(
     title="Arabic Toons Downloader API",
     description="High-performance backend API for downloading and managing Arabic cartoons. Features intelligent caching, library management, and real-time streaming.",
     version="4.2.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 import logging
 import sys
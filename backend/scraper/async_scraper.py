@@ -0,0 +1,218 @@
+import time
+import asyncio
+import logging
+import traceback
+from typing import List, Dict, AsyncGenerator, Tuple, Optional
+from ..core.async_browser import AsyncBrowserManager
+from ..core.readiness import async_wait_until_ready
+from ..core.http import create_async_client, AsyncMetadataProber
+from ..extractors import ExtractorFactory
+from .parser import PAGE_METADATA_JS, VIDEO_SRC_JS, EPISODE_LINKS_JS, EPISODE_LINKS_ARGS, EMPTY_METADATA
+from .scraper import ScraperBase, SeasonProgress, EPISODE_LINKS_READY_JS, log
+from .config import BASE_URL, MAX_CONCURRENT_PAGES_ASYNC, MAX_LISTING_PAGES, FAST_PATH_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+class AsyncArabicToonsScraper(ScraperBase):
+    """
+    asyncio-native scraper for Arabic Toons (playwright.async_api + httpx).
+    Same events as ArabicToonsScraper, but one event loop drives all page navigations.
+    """
+
+    def __init__(self, browser_manager: AsyncBrowserManager = None, max_workers: int = MAX_CONCURRENT_PAGES_ASYNC):
+        super().__init__(max_workers=max_workers)
+        self.browser_manager = browser_manager or AsyncBrowserManager(max_pool_size=self.max_workers)
+        self.http = create_async_client(headers={"Referer": BASE_URL}, timeout=FAST_PATH_TIMEOUT)
+        self.prober = AsyncMetadataProber(self.http)
+
+    async def get_page_metadata(self, page) -> Dict:
+        try:
+            return await page.evaluate(PAGE_METADATA_JS)
+        except Exception:
+            return dict(EMPTY_METADATA)
+
+    async def get_episode_video_url_fast(self, episode_url: str, include_metadata: bool = False):
+        """Browserless fast path (see ArabicToonsScraper.get_episode_video_url_fast)"""
+        started = time.monotonic()
+        video_url = None
+        try:
+            resp = await self.http.get(episode_url)
+            if resp.is_success:
+                video_url = self.parser.find_video_url(resp.text)
+        except Exception as e:
+            logger.debug(f"Fast path failed for {episode_url}: {e}")
+
+        self.fast_path_stats.record(episode_url, hit=bool(video_url), elapsed_ms=(time.monotonic() - started) * 1000)
+        if not video_url:
+            return None
+
+        if include_metadata:
+            return {"video_url": video_url, "metadata": self.parser.parse_html_metadata(resp.text), "waits": []}
+        return video_url
+
+    async def get_episode_video_url(self, episode_url: str, include_metadata: bool = False):
+        if self.fast_path_enabled:
+            fast = await self.get_episode_video_url_fast(episode_url, include_metadata=include_metadata)
+            if fast:
+                return fast
+
+        page = await self.browser_manager.checkout()
+        try:
+            await page.goto(episode_url, wait_until="domcontentloaded", timeout=30000)
+            wait = await async_wait_until_ready(page, 3000, video=True, media=True, label="episode video")
+
+            video_url = await page.evaluate(VIDEO_SRC_JS)
+
+            if not video_url and wait.media_url and ".mp4" in wait.media_url:
+                video_url = wait.media_url
+
+            if not video_url:
+                video_url = self.parser.find_video_url(await page.content())
+
+            if include_metadata and video_url:
+                metadata = await self.get_page_metadata(page)
+                return {"video_url": video_url, "metadata": metadata, "waits": [wait.to_dict()]}
+
+            return video_url
+        except Exception as e:
+            logger.error(f"Error extracting video URL: {e}")
+            return None
+        finally:
+            await self.browser_manager.checkin(page)
+
+    async def get_series_episodes(self, series_url: str) -> Dict:
+        log(f"🔍 get_series_episodes (async) called with URL: {series_url}")
+        page = await self.browser_manager.checkout()
+        episodes = []
+        try:
+            await page.goto(series_url, wait_until="domcontentloaded", timeout=30000)
+            await async_wait_until_ready(page, 2000, predicate=EPISODE_LINKS_READY_JS, label="series episode links")
+
+            series_title = self.series_title_from_metadata(await self.get_page_metadata(page))
+            log(f"🏷️ Detected Series Title: {series_title}")
+
+            seen = {series_url.split('#')[0]}
+            visited = set(seen)
+            for page_number in range(1, MAX_LISTING_PAGES + 1):
+                listing = await page.evaluate(EPISODE_LINKS_JS, EPISODE_LINKS_ARGS)
+                found = self.parser.build_episode_list(listing["links"], seen)
+                log(f"📊 Listing page {page_number}: {len(listing['links'])} links, {len(found)} new episodes")
+                episodes.extend(found)
+
+                next_url = listing.get("next")
+                if not next_url or next_url in visited:
+                    break
+                visited.add(next_url)
+                await page.goto(next_url, wait_until="domcontentloaded", timeout=30000)
+                await async_wait_until_ready(page, 2000, predicate=EPISODE_LINKS_READY_JS, label="series episode links")
+
+            log(f"📋 Total episodes found: {len(episodes)}")
+            return {"episodes": episodes, "series_title": series_title}
+        except Exception as e:
+            log(f"❌ Error getting episodes: {e}")
+            log(traceback.format_exc())
+            return {"episodes": [], "series_title": "Error Loading"}
+        finally:
+            await self.browser_manager.checkin(page)
+
+    def get_extractor(self, url: str):
+        """Get an async server extractor that draws its pages from the scraper's page pool"""
+        return ExtractorFactory.get_async_extractor(url, browser_manager=self.browser_manager)
+
+    async def get_video_metadata(self, video_url: str) -> Dict:
+        return await self.prober.probe(video_url) or {"size_bytes": 0, "size_formatted": "Unknown"}
+
+    async def probe_video_urls(self, video_urls: List[str]) -> Dict[str, Optional[Dict]]:
+        return await self.prober.probe_many(video_urls)
+
+    async def resolve_episode(self, ep: Dict, index: int) -> Dict:
+        """Resolve a single episode into a `result` or `error` event tagged with its stable index"""
+        title = ep.get('title', 'Unknown')
+        try:
+            data = await self.get_episode_video_url(ep["episode_url"], include_metadata=True)
+            if not data:
+                return {"type": "error", "index": index, "episode": title, "message": "No video URL"}
+
+            video_url = data["video_url"] if isinstance(data, dict) else data
+            return self.build_result(ep, index, data, await self.get_video_metadata(video_url))
+        except Exception as e:
+            log(f"❌ Error processing episode {title}: {e}")
+            return {"type": "error", "index": index, "episode": title, "message": str(e)}
+
+    async def _resolve_concurrently(self, items: List[Tuple[int, Dict]]) -> AsyncGenerator:
+        """Resolve (index, episode) pairs with at most `max_workers` in flight, in completion order"""
+        if not items:
+            return
+
+        limit = asyncio.Semaphore(self.max_workers)
+
+        async def bounded(index, ep):
+            async with limit:
+                return await self.resolve_episode(ep, index)
+
+        log(f"🧵 Resolving {len(items)} episodes with up to {self.max_workers} concurrent pages")
+        tasks = [asyncio.ensure_future(bounded(index, ep)) for index, ep in items]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer stopped early (client disconnected): don't keep navigating
+            for task in tasks:
+                task.cancel()
+
+    async def download_season_generator(self, series_url: str, season_number: int = None,
+                                        known: Dict[str, Dict] = None) -> AsyncGenerator:
+        """Async version of ArabicToonsScraper.download_season_generator (same events and `known` reuse)"""
+        log(f"🎬 download_season_generator (async) called with URL: {series_url}")
+        try:
+            result = await self.get_series_episodes(series_url)
+            episodes = self.filter_season(result["episodes"], season_number)
+            series_title = result["series_title"]
+
+            total = len(episodes)
+            log(f"📋 Total episodes to process: {total}")
+            yield {"type": "start", "total": total, "series_title": series_title}
+            if not total:
+                return
+
+            progress = SeasonProgress(episodes)
+            pending = list(enumerate(episodes, 1))
+            if known and self.incremental_refresh:
+                candidates, pending = self.split_known(pending, known)
+                probes = await self.probe_video_urls([cached["video_url"] for _, _, cached in candidates])
+                invalid, reused = self.apply_known(candidates, probes)
+                for event in reused:
+                    for out in progress.emit(event):
+                        yield out
+                pending = sorted(pending + invalid, key=lambda item: item[0])
+
+            samples, pending = self.split_template_samples(pending)
+            if samples:
+                # Fully resolve a couple of episodes, then predict the rest from their URL pattern
+                sample_results = []
+                async for event in self._resolve_concurrently(samples):
+                    if event["type"] == "result":
+                        sample_results.append(event["data"])
+                    for out in progress.emit(event):
+                        yield out
+
+                predicted = self.predict_from_samples(sample_results, pending)
+                if predicted:
+                    probes = await self.probe_video_urls([url for url in predicted.values() if url])
+                    pending, inferred = self.apply_predictions(sample_results, pending, predicted, probes)
+                    for event in inferred:
+                        for out in progress.emit(event):
+                            yield out
+
+            async for event in self._resolve_concurrently(pending):
+                for out in progress.emit(event):
+                    yield out
+
+        except Exception as e:
+            log(f"❌ FATAL ERROR in download_season_generator: {e}")
+            log(traceback.format_exc())
+            yield {"type": "error", "episode": "Series", "message": str(e)}
+
+    async def close(self):
+        await self.browser_manager.close()
+        await self.prober.close()
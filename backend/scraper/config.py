@@ -10,3 +10,24 @@ SELECTORS = {
     "search_link": 'link[name="مسلسلات"]',
     "grid_items": ['.anime-card', '.movie_poster', '.video-card', '.col-md-2', '.item', '.movie-item']
 }
+
+# Concurrency
+MAX_CONCURRENT_EPISODES = 4  # Worker browsers resolving episodes in parallel
+
+# Browserless fast path
+FAST_PATH_ENABLED = True     # Try plain HTTP + regex before launching Chromium
+FAST_PATH_TIMEOUT = 10       # Seconds
+
+# URL template inference
+TEMPLATE_INFERENCE_ENABLED = True
+TEMPLATE_MIN_EPISODES = 4    # Only worth it for longer series
+TEMPLATE_SAMPLE_SIZE = 2     # Episodes fully resolved to learn the template (>= 2: first and last included)
+
+# Incremental refresh
+INCREMENTAL_REFRESH_ENABLED = True  # Reuse cached episodes whose video URL still answers a HEAD request
+
+# Episode listing
+MAX_LISTING_PAGES = 20       # Follow at most this many "next page" links per series
+# Links inside these containers are site navigation, not episodes
+NAVIGATION_CONTAINERS = "nav, header, footer, aside, .navbar, .menu, .sidebar, .breadcrumb, .pagination, [role='navigation']"
+MAX_CONCURRENT_PAGES_ASYNC = 12  # Concurrent page navigations on the asyncio path
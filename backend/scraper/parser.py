@@ -1,28 +1,125 @@
 import re
+import html as html_lib
 from typing import Dict, Optional, List
 from urllib.parse import urlparse, parse_qs
-from .config import BASE_URL
+from .config import BASE_URL, SELECTORS, NAVIGATION_CONTAINERS
+
+# In-page scripts, shared by the sync and async scrapers
+PAGE_METADATA_JS = """
+    () => {
+        const h1 = document.querySelector('h1')?.innerText || '';
+        const breadcrumbs = Array.from(document.querySelectorAll('.breadcrumb li, .breadcrumb a')).map(el => el.innerText);
+        const title = document.title;
+        let thumbnail = document.querySelector('meta[property="og:image"]')?.content || '';
+        if (!thumbnail) thumbnail = document.querySelector('.poster img, .anime-poster img, img[class*="poster"]')?.src || '';
+        if (!thumbnail) thumbnail = document.querySelector('img')?.src || '';
+        return { h1, breadcrumbs, title, thumbnail };
+    }
+"""
+
+VIDEO_SRC_JS = """
+    () => {
+        const video = document.querySelector('video');
+        return video ? (video.currentSrc || video.src) : null;
+    }
+"""
+
+EPISODE_LINKS_JS = """
+    ({ selector, navigation }) => {
+        const links = Array.from(document.querySelectorAll(selector)).map((a, position) => ({
+            href: a.getAttribute('href') || '',
+            text: a.innerText || '',
+            position,
+            nav: !!a.closest(navigation)
+        }));
+        const next = document.querySelector(
+            'a[rel="next"], .pagination a.next, .pagination li.next a, .pagination a[aria-label*="Next"]'
+        );
+        return { links, next: next ? next.href : null };
+    }
+"""
+
+EMPTY_METADATA = {"h1": "", "breadcrumbs": [], "title": "", "thumbnail": ""}
+
+VIDEO_URL_PATTERN = re.compile(r'https://stream\.foupix\.com/[^\s"\'<>]+\.mp4[^\s"\'<>]*')
+
+EPISODE_LINKS_ARGS = {"selector": SELECTORS["series_link"], "navigation": NAVIGATION_CONTAINERS}
 
 class ArabicToonsParser:
     """Parses HTML/Data for Arabic Toons"""
 
+    @staticmethod
+    def find_video_url(content: str) -> Optional[str]:
+        """Find the first CDN mp4 URL in raw page HTML"""
+        match = VIDEO_URL_PATTERN.search(content or "")
+        return html_lib.unescape(match.group(0)) if match else None
+
+    @staticmethod
+    def parse_html_metadata(content: str) -> Dict:
+        """Same fields as get_page_metadata, read from raw HTML (no browser)"""
+        def first(pattern):
+            match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
+            if not match:
+                return ''
+            text = re.sub(r'<[^>]+>', ' ', match.group(1))
+            return html_lib.unescape(' '.join(text.split()))
+
+        thumbnail = (first(r'<meta[^>]+property=["\']og:image["\'][^>]+content=["\']([^"\']+)')
+                     or first(r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+property=["\']og:image'))
+        return {
+            "h1": first(r'<h1[^>]*>(.*?)</h1>'),
+            "breadcrumbs": [],
+            "title": first(r'<title[^>]*>(.*?)</title>'),
+            "thumbnail": thumbnail
+        }
+
     @staticmethod
     def get_page_metadata(page) -> Dict:
         """Extract metadata from page using JS evaluation"""
         try:
-            return page.evaluate("""
-                () => {
-                    const h1 = document.querySelector('h1')?.innerText || '';
-                    const breadcrumbs = Array.from(document.querySelectorAll('.breadcrumb li, .breadcrumb a')).map(el => el.innerText);
-                    const title = document.title;
-                    let thumbnail = document.querySelector('meta[property="og:image"]')?.content || '';
-                    if (!thumbnail) thumbnail = document.querySelector('.poster img, .anime-poster img, img[class*="poster"]')?.src || '';
-                    if (!thumbnail) thumbnail = document.querySelector('img')?.src || '';
-                    return { h1, breadcrumbs, title, thumbnail };
-                }
-            """)
+            return page.evaluate(PAGE_METADATA_JS)
         except:
-            return {"h1": "", "breadcrumbs": [], "title": "", "thumbnail": ""}
+            return dict(EMPTY_METADATA)
+
+    @staticmethod
+    def get_episode_links(page) -> Dict:
+        """
+        Collect every candidate episode link on the page in a single roundtrip.
+        Returns {"links": [{href, text, position, nav}], "next": next page URL or None}
+        """
+        return page.evaluate(EPISODE_LINKS_JS, EPISODE_LINKS_ARGS)
+
+    @staticmethod
+    def clean_link_title(text: str) -> str:
+        """Join multi-line link text, dropping a trailing episode counter line"""
+        lines = [line.strip() for line in (text or '').strip().split('\n') if line.strip()]
+        if len(lines) > 1 and lines[-1].isdigit():
+            return ' '.join(lines[:-1])
+        return ' '.join(lines)
+
+    @classmethod
+    def build_episode_list(cls, links: List[Dict], seen: Optional[set] = None) -> List[Dict]:
+        """
+        Turn raw links into episode infos: drop navigation/sidebar links, non-episode
+        pages and duplicates (`seen` carries URLs across paginated pages)
+        """
+        seen = set() if seen is None else seen
+        episodes = []
+        for link in sorted(links, key=lambda l: l.get("position", 0)):
+            href = link.get("href")
+            if not href or link.get("nav") or "anime-streaming" in href or ".html" not in href:
+                continue
+
+            clean_href = href.split('#')[0]
+            full_url = clean_href if clean_href.startswith('http') else f"{BASE_URL}/{clean_href.lstrip('/')}"
+            if full_url in seen:
+                continue
+            seen.add(full_url)
+
+            info = cls.get_episode_info(full_url)
+            info["title"] = cls.clean_link_title(link.get("text"))
+            episodes.append(info)
+        return episodes
 
     @staticmethod
     def parse_video_url(video_url: str) -> Dict:
@@ -1,110 +1,388 @@
-import re
+import time
+import queue
 import logging
-import requests
+import threading
 import traceback
-from typing import List, Dict, Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Generator, Tuple, Optional
 from ..core.browser import BrowserManager
-from .parser import ArabicToonsParser
-from .config import BASE_URL, SELECTORS
+from ..core.readiness import wait_until_ready
+from ..core import cache_ttl
+from ..core.http import create_session, HostStats, MetadataProber
+from ..extractors import ExtractorFactory
+from .parser import ArabicToonsParser, VIDEO_SRC_JS
+from .template import VideoUrlTemplate
+from .config import (BASE_URL, MAX_CONCURRENT_EPISODES, MAX_LISTING_PAGES,
+                     FAST_PATH_ENABLED, FAST_PATH_TIMEOUT,
+                     TEMPLATE_INFERENCE_ENABLED, TEMPLATE_MIN_EPISODES, TEMPLATE_SAMPLE_SIZE,
+                     INCREMENTAL_REFRESH_ENABLED)
 
 # Force logging to show
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# Series page is ready once a link the episode listing would accept is present
+EPISODE_LINKS_READY_JS = """
+    () => Array.from(document.querySelectorAll("a[href*='.html']"))
+        .some(a => !a.getAttribute('href').includes('anime-streaming'))
+"""
+
 def log(msg):
     """Print and log for guaranteed visibility"""
     print(msg, flush=True)
     logger.info(msg)
 
-class ArabicToonsScraper:
+class SeasonProgress:
+    """Numbers `progress` events as episode events complete, in any order"""
+
+    def __init__(self, episodes: List[Dict]):
+        self.episodes = episodes
+        self.total = len(episodes)
+        self.completed = 0
+
+    def emit(self, event: Dict) -> List[Dict]:
+        self.completed += 1
+        index = event["index"] if event["type"] == "error" else event["data"]["index"]
+        title = self.episodes[index - 1].get('title', 'Unknown')
+        log(f"🎞️ Resolved episode {index} ({self.completed}/{self.total}): {title}")
+        progress = {"type": "progress", "current": self.completed, "total": self.total, "title": title, "index": index}
+        return [progress, event]
+
+
+class EpisodeWorkerPool:
+    """
+    Worker threads resolving the episodes of one season.
+    Sync Playwright is bound to the thread that started it, so every worker owns its
+    own browser. Workers are started on demand (at most `max_workers`) and kept,
+    browser included, for every resolve() batch until close(). A worker whose
+    browser fails to start exits; if none are left, queued episodes fail.
+    """
+
+    POLL_INTERVAL = 1.0  # Seconds between worker liveness checks while waiting for results
+
+    def __init__(self, resolve_episode: Callable[[Dict, int, BrowserManager], Dict], max_workers: int,
+                 headless: bool = True):
+        self.resolve_episode = resolve_episode
+        self.max_workers = max_workers
+        self.headless = headless
+        self._jobs = queue.Queue()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._workers = 0  # Started and not exited
+        self._start_error: Optional[str] = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="episode-worker")
+
+    @staticmethod
+    def _error(index: int, ep: Dict, message: str) -> Dict:
+        return {"type": "error", "index": index, "episode": ep.get('title', 'Unknown'), "message": message}
+
+    def _worker(self):
+        try:
+            browser_manager = BrowserManager(headless=self.headless)
+        except Exception as e:
+            logger.error(f"Worker browser failed to start: {e}")
+            with self._lock:
+                self._workers -= 1
+                self._start_error = f"Browser failed to start: {e}"
+            return
+
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None or self._stop.is_set():
+                    break
+                index, ep, results = job
+                try:
+                    results.put(self.resolve_episode(ep, index, browser_manager))
+                except Exception as e:
+                    logger.error(f"Worker failed on episode {index}: {e}")
+                    results.put(self._error(index, ep, str(e)))
+        finally:
+            with self._lock:
+                self._workers -= 1
+            try:
+                browser_manager.close()
+            except Exception as e:
+                logger.warning(f"Error closing worker browser: {e}")
+
+    def _fail_queued(self):
+        """Turn every queued job into an error result (no worker is left to take them)"""
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None:
+                index, ep, results = job
+                results.put(self._error(index, ep, self._start_error or "No episode worker available"))
+
+    def resolve(self, items: List[Tuple[int, Dict]]) -> Generator:
+        """Resolve (index, episode) pairs, yielding events in completion order"""
+        if not items:
+            return
+        with self._lock:
+            while self._workers < min(self.max_workers, len(items)):
+                self._executor.submit(self._worker)
+                self._workers += 1
+        log(f"🧵 Resolving {len(items)} episodes with {self._workers} workers")
+
+        results = queue.Queue()
+        for index, ep in items:
+            self._jobs.put((index, ep, results))
+        # Events are streamed in completion order; `index` keeps them ordered downstream
+        remaining = len(items)
+        while remaining:
+            try:
+                event = results.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                if self._workers == 0:
+                    self._fail_queued()
+                continue
+            remaining -= 1
+            yield event
+
+    def close(self):
+        """Stop the workers once their current episode is done; each closes its browser"""
+        self._stop.set()
+        for _ in range(self._workers):
+            self._jobs.put(None)
+        self._executor.shutdown(wait=False)
+
+
+class ScraperBase:
+    """Logic shared by the sync and async scrapers (no browser or network I/O)"""
+
+    def __init__(self, max_workers: int = MAX_CONCURRENT_EPISODES):
+        self.parser = ArabicToonsParser()
+        self.max_workers = max(1, max_workers)
+        self.fast_path_enabled = FAST_PATH_ENABLED
+        self.fast_path_stats = HostStats()
+        self.template_inference = TEMPLATE_INFERENCE_ENABLED
+        self.incremental_refresh = INCREMENTAL_REFRESH_ENABLED
+
+    @staticmethod
+    def series_title_from_metadata(meta: Dict) -> str:
+        if meta.get("h1"):
+            return meta["h1"].strip()
+        if meta.get("title"):
+            # Clean up title: "Highlander Episode 2 - Arabic Toons" -> "Highlander"
+            return meta["title"].split(' - ')[0].split(' الحلقة ')[0].strip()
+        return "Unknown Series"
+
+    @staticmethod
+    def filter_season(episodes: List[Dict], season_number: int = None) -> List[Dict]:
+        if season_number:
+            return [ep for ep in episodes if f"s{season_number}" in ep.get("episode_url", "")]
+        return episodes
+
+    def build_result(self, ep: Dict, index: int, data, video_meta: Dict) -> Dict:
+        """Turn get_episode_video_url output into a `result` event"""
+        video_url = data["video_url"] if isinstance(data, dict) else data
+        meta = data.get("metadata", {}) if isinstance(data, dict) else {}
+        result = {
+            **ep,
+            "index": index,
+            "video_url": video_url,
+            "video_info": self.parser.parse_video_url(video_url),
+            "metadata": video_meta,
+            "thumbnail": meta.get("thumbnail", "")
+        }
+        return {"type": "result", "data": result, "waits": data.get("waits", []) if isinstance(data, dict) else []}
+
+    def split_template_samples(self, pending: List[Tuple[int, Dict]]) -> Tuple[List[Tuple[int, Dict]], List[Tuple[int, Dict]]]:
+        """
+        (episodes to resolve first, the rest); no samples when template inference does not apply.
+        Samples are spread from the first to the last episode, so the learned step
+        holds across the whole listing (a gap or reordering in between breaks it)
+        """
+        if not self.template_inference or len(pending) < TEMPLATE_MIN_EPISODES:
+            return [], pending
+        last = len(pending) - 1
+        positions = {round(i * last / (TEMPLATE_SAMPLE_SIZE - 1)) for i in range(TEMPLATE_SAMPLE_SIZE)}
+        samples = [item for position, item in enumerate(pending) if position in positions]
+        rest = [item for position, item in enumerate(pending) if position not in positions]
+        return samples, rest
+
+    @staticmethod
+    def split_known(pending: List[Tuple[int, Dict]],
+                    known: Dict[str, Dict]) -> Tuple[List[Tuple[int, Dict, Dict]], List[Tuple[int, Dict]]]:
+        """
+        Split listed episodes by whether the cache already has them (keyed by episode_url)
+
+        Cached video URLs whose CDN token is within TOKEN_EXPIRY_MARGIN of expiring
+        are not reused: a HEAD probe would still pass, but the link is about to die.
+
+        Returns:
+            ([(index, episode, cached row)], [(index, episode)] that are new or expiring)
+        """
+        candidates, new = [], []
+        expiring = 0
+        for index, ep in pending:
+            cached = known.get(ep.get("episode_url"))
+            if cached and cached.get("video_url"):
+                parameters = ArabicToonsParser.parse_video_url(cached["video_url"])["parameters"]
+                if not cache_ttl.links_expired(cache_ttl.token_expiry(parameters)):
+                    candidates.append((index, ep, cached))
+                    continue
+                expiring += 1
+            new.append((index, ep))
+        log(f"♻️ Incremental refresh: {len(candidates)} cached, {len(new)} new episodes ({expiring} expiring links)")
+        return candidates, new
+
+    def apply_known(self, candidates: List[Tuple[int, Dict, Dict]],
+                    probes: Dict[str, Optional[Dict]]) -> Tuple[List[Tuple[int, Dict]], List[Dict]]:
+        """Returns (cached episodes whose video URL failed validation, result events for the valid ones)"""
+        invalid, events = [], []
+        for index, ep, cached in candidates:
+            video_url = cached["video_url"]
+            video_meta = probes.get(video_url)
+            if not video_meta:
+                invalid.append((index, ep))
+                continue
+            events.append({"type": "result", "data": {
+                **ep,
+                "index": index,
+                "video_url": video_url,
+                "video_info": self.parser.parse_video_url(video_url),
+                "metadata": video_meta,
+                "thumbnail": cached.get("thumbnail") or "",
+                "reused": True
+            }})
+
+        log(f"♻️ Reused {len(events)}/{len(candidates)} cached episodes")
+        return invalid, events
+
+    def predict_from_samples(self, sample_results: List[Dict],
+                             pending: List[Tuple[int, Dict]]) -> Optional[Dict[int, Optional[str]]]:
+        """Learn a URL template from resolved samples and predict URLs for `pending` (None if no template)"""
+        template = VideoUrlTemplate.learn([(r["index"], r["video_url"]) for r in sample_results])
+        if not template or not pending:
+            log("🧩 No URL template learned, resolving every episode")
+            return None
+        log(f"🧩 Learned URL template {template.to_dict()}")
+        return {index: template.predict(index) for index, _ in pending}
+
+    def apply_predictions(self, sample_results: List[Dict], pending: List[Tuple[int, Dict]],
+                          predicted: Dict[int, Optional[str]],
+                          probes: Dict[str, Optional[Dict]]) -> Tuple[List[Tuple[int, Dict]], List[Dict]]:
+        """Returns (episodes that still need full resolution, result events for verified predictions)"""
+        thumbnail = next((r.get("thumbnail") for r in sample_results if r.get("thumbnail")), "")
+
+        unresolved, events = [], []
+        for index, ep in pending:
+            video_url = predicted.get(index)
+            video_meta = probes.get(video_url) if video_url else None
+            if not video_meta:
+                unresolved.append((index, ep))
+                continue
+            events.append({"type": "result", "data": {
+                **ep,
+                "index": index,
+                "video_url": video_url,
+                "video_info": self.parser.parse_video_url(video_url),
+                "metadata": video_meta,
+                "thumbnail": thumbnail,
+                "inferred": True
+            }})
+
+        log(f"🧩 URL template verified {len(events)}/{len(pending)} episodes")
+        return unresolved, events
+
+
+class ArabicToonsScraper(ScraperBase):
     """Scraper implementation for Arabic Toons"""
     
-    def __init__(self, browser_manager: BrowserManager = None):
+    def __init__(self, browser_manager: BrowserManager = None, max_workers: int = MAX_CONCURRENT_EPISODES):
+        super().__init__(max_workers=max_workers)
         self.browser_manager = browser_manager or BrowserManager()
-        self.parser = ArabicToonsParser()
+        self.http = create_session(headers={"Referer": BASE_URL})
+        self.prober = MetadataProber(self.http)
+
+    def get_episode_video_url_fast(self, episode_url: str, include_metadata: bool = False):
+        """
+        Browserless fast path: fetch the episode HTML and look for the CDN URL.
+        Returns the same shape as get_episode_video_url, or None if the page needs a browser.
+        """
+        started = time.monotonic()
+        video_url = None
+        try:
+            resp = self.http.get(episode_url, timeout=FAST_PATH_TIMEOUT)
+            if resp.ok:
+                video_url = self.parser.find_video_url(resp.text)
+        except Exception as e:
+            logger.debug(f"Fast path failed for {episode_url}: {e}")
 
-    def get_episode_video_url(self, episode_url: str, include_metadata: bool = False):
-        context = self.browser_manager.get_context()
-        page = context.new_page()
+        self.fast_path_stats.record(episode_url, hit=bool(video_url), elapsed_ms=(time.monotonic() - started) * 1000)
+        if not video_url:
+            return None
+
+        if include_metadata:
+            return {"video_url": video_url, "metadata": self.parser.parse_html_metadata(resp.text), "waits": []}
+        return video_url
+
+    def get_episode_video_url(self, episode_url: str, include_metadata: bool = False,
+                              browser_manager: BrowserManager = None):
+        if self.fast_path_enabled:
+            fast = self.get_episode_video_url_fast(episode_url, include_metadata=include_metadata)
+            if fast:
+                return fast
+
+        browser_manager = browser_manager or self.browser_manager
+        page = browser_manager.checkout()
         try:
             page.goto(episode_url, wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(3000)
+            wait = wait_until_ready(page, 3000, video=True, media=True, label="episode video")
+            
+            video_url = page.evaluate(VIDEO_SRC_JS)
             
-            video_url = page.evaluate("""
-                () => {
-                    const video = document.querySelector('video');
-                    return video ? (video.currentSrc || video.src) : null;
-                }
-            """)
+            if not video_url and wait.media_url and ".mp4" in wait.media_url:
+                video_url = wait.media_url
             
             if not video_url:
-                content = page.content()
-                matches = re.findall(r'https://stream\.foupix\.com/[^\s"\'<>]+\.mp4[^\s"\'<>]*', content)
-                if matches:
-                    video_url = matches[0]
+                video_url = self.parser.find_video_url(page.content())
             
             if include_metadata and video_url:
                 metadata = self.parser.get_page_metadata(page)
-                return {"video_url": video_url, "metadata": metadata}
+                return {"video_url": video_url, "metadata": metadata, "waits": [wait.to_dict()]}
             
             return video_url
         except Exception as e:
             logger.error(f"Error extracting video URL: {e}")
             return None
         finally:
-            page.close()
+            browser_manager.checkin(page)
 
     def get_series_episodes(self, series_url: str) -> Dict:
         log(f"🔍 get_series_episodes called with URL: {series_url}")
-        context = self.browser_manager.get_context()
-        page = context.new_page()
+        page = self.browser_manager.checkout()
         episodes = []
         series_title = "Unknown Series"
         try:
             log(f"📄 Navigating to: {series_url}")
             page.goto(series_url, wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(2000)
+            wait_until_ready(page, 2000, predicate=EPISODE_LINKS_READY_JS, label="series episode links")
             
             # Extract series title from page metadata
-            meta = self.parser.get_page_metadata(page)
-            if meta.get("h1"):
-                series_title = meta["h1"].strip()
-            elif meta.get("title"):
-                # Clean up title: "Highlander Episode 2 - Arabic Toons" -> "Highlander"
-                series_title = meta["title"].split(' - ')[0].split(' الحلقة ')[0].strip()
+            series_title = self.series_title_from_metadata(self.parser.get_page_metadata(page))
             
             log(f"🏷️ Detected Series Title: {series_title}")
 
-            log(f"🔎 Looking for links with selector: {SELECTORS['series_link']}")
-            links = page.locator(SELECTORS["series_link"])
-            count = links.count()
-            log(f"📊 Found {count} links on page")
-            
-            for i in range(min(count, 100)):
-                try:
-                    link = links.nth(i)
-                    href = link.get_attribute("href")
-                    text = link.inner_text()
-                    
-                    if href and "anime-streaming" not in href and ".html" in href:
-                        clean_href = href.split('#')[0]
-                        full_url = clean_href if clean_href.startswith('http') else f"{BASE_URL}/{clean_href.lstrip('/')}"
-                        
-                        clean_title = text.strip()
-                        lines = [line.strip() for line in clean_title.split('\n') if line.strip()]
-                        if len(lines) > 1 and lines[-1].isdigit():
-                            clean_title = ' '.join(lines[:-1])
-                        else:
-                            clean_title = ' '.join(lines)
-                        
-                        log(f"✅ Found episode: {clean_title[:40]} -> {full_url}")
-                        info = self.parser.get_episode_info(full_url)
-                        info["title"] = clean_title
-                        episodes.append(info)
-                except Exception as e:
-                    log(f"⚠️ Error processing link {i}: {e}")
-                    continue
+            seen = {series_url.split('#')[0]}
+            visited = set(seen)
+            for page_number in range(1, MAX_LISTING_PAGES + 1):
+                listing = self.parser.get_episode_links(page)
+                found = self.parser.build_episode_list(listing["links"], seen)
+                log(f"📊 Listing page {page_number}: {len(listing['links'])} links, {len(found)} new episodes")
+                episodes.extend(found)
+
+                next_url = listing.get("next")
+                if not next_url or next_url in visited:
+                    break
+                visited.add(next_url)
+                log(f"📄 Following pagination: {next_url}")
+                page.goto(next_url, wait_until="domcontentloaded", timeout=30000)
+                wait_until_ready(page, 2000, predicate=EPISODE_LINKS_READY_JS, label="series episode links")
             
             log(f"📋 Total episodes found: {len(episodes)}")
             return {"episodes": episodes, "series_title": series_title}
@@ -113,25 +391,44 @@ class ArabicToonsScraper:
             log(traceback.format_exc())
             return {"episodes": [], "series_title": "Error Loading"}
         finally:
-            page.close()
+            self.browser_manager.checkin(page)
+
+    def get_extractor(self, url: str, browser_manager: BrowserManager = None):
+        """Get a server extractor that draws its pages from the scraper's page pool"""
+        return ExtractorFactory.get_extractor(url, browser_manager=browser_manager or self.browser_manager)
 
     def get_video_metadata(self, video_url: str) -> Dict:
+        return self.prober.probe(video_url) or {"size_bytes": 0, "size_formatted": "Unknown"}
+
+    def probe_video_urls(self, video_urls: List[str]) -> Dict[str, Optional[Dict]]:
+        """HEAD a batch of video URLs concurrently; failed probes map to None"""
+        return self.prober.probe_many(video_urls)
+
+    def resolve_episode(self, ep: Dict, index: int, browser_manager: BrowserManager = None) -> Dict:
+        """Resolve a single episode into a `result` or `error` event tagged with its stable index"""
+        title = ep.get('title', 'Unknown')
         try:
-            headers = {"User-Agent": "Mozilla/5.0", "Referer": BASE_URL}
-            resp = requests.head(video_url, headers=headers, timeout=10)
-            size = int(resp.headers.get('Content-Length', 0))
-            
-            if size:
-                gb = size / (1024**3)
-                mb = size / (1024**2)
-                fmt = f"{gb:.2f} GB" if gb >= 1 else f"{mb:.2f} MB"
-                return {"size_bytes": size, "size_formatted": fmt}
-            return {"size_bytes": 0, "size_formatted": "Unknown"}
-        except:
-            return {"size_bytes": 0, "size_formatted": "Unknown"}
-
-    def download_season_generator(self, series_url: str, season_number: int = None) -> Generator:
+            data = self.get_episode_video_url(ep["episode_url"], include_metadata=True,
+                                              browser_manager=browser_manager)
+            if not data:
+                return {"type": "error", "index": index, "episode": title, "message": "No video URL"}
+
+            video_url = data["video_url"] if isinstance(data, dict) else data
+            return self.build_result(ep, index, data, self.get_video_metadata(video_url))
+        except Exception as e:
+            log(f"❌ Error processing episode {title}: {e}")
+            return {"type": "error", "index": index, "episode": title, "message": str(e)}
+
+    def download_season_generator(self, series_url: str, season_number: int = None,
+                                  known: Dict[str, Dict] = None) -> Generator:
+        """
+        Yield start/progress/result/error events for a series.
+        `known` maps episode_url -> cached episode row; those episodes are reused
+        as long as their video URL still validates, and only the rest are resolved.
+        """
         log(f"🎬 download_season_generator called with URL: {series_url}")
+        # One set of worker browsers for the whole season (template samples and the rest)
+        pool = EpisodeWorkerPool(self.resolve_episode, self.max_workers, headless=self.browser_manager.headless)
         try:
             log("📥 Calling get_series_episodes...")
             result = self.get_series_episodes(series_url)
@@ -139,44 +436,50 @@ class ArabicToonsScraper:
             series_title = result["series_title"]
             log(f"📊 Got {len(episodes)} episodes for series: {series_title}")
             
-            if season_number:
-                episodes = [ep for ep in episodes if f"s{season_number}" in ep.get("episode_url", "")]
+            episodes = self.filter_season(episodes, season_number)
             
             total = len(episodes)
             log(f"📋 Total episodes to process: {total}")
             yield {"type": "start", "total": total, "series_title": series_title}
-            
-            for i, ep in enumerate(episodes, 1):
-                title = ep.get('title', 'Unknown')
-                log(f"🎞️ Processing episode {i}/{total}: {title}")
-                yield {"type": "progress", "current": i, "total": total, "title": title}
-                
-                try:
-                    data = self.get_episode_video_url(ep["episode_url"], include_metadata=True)
-                    if data:
-                        video_url = data["video_url"] if isinstance(data, dict) else data
-                        meta = data.get("metadata", {}) if isinstance(data, dict) else {}
-                        
-                        video_meta = self.get_video_metadata(video_url)
-                        
-                        result = {
-                            **ep,
-                            "video_url": video_url,
-                            "video_info": self.parser.parse_video_url(video_url),
-                            "metadata": video_meta,
-                            "thumbnail": meta.get("thumbnail", "")
-                        }
-                        yield {"type": "result", "data": result}
-                    else:
-                        yield {"type": "error", "episode": title, "message": "No video URL"}
-                except Exception as e:
-                    log(f"❌ Error processing episode {title}: {e}")
-                    yield {"type": "error", "episode": title, "message": str(e)}
+            if not total:
+                return
+
+            progress = SeasonProgress(episodes)
+            pending = list(enumerate(episodes, 1))
+            if known and self.incremental_refresh:
+                candidates, pending = self.split_known(pending, known)
+                probes = self.probe_video_urls([cached["video_url"] for _, _, cached in candidates])
+                invalid, reused = self.apply_known(candidates, probes)
+                for event in reused:
+                    yield from progress.emit(event)
+                pending = sorted(pending + invalid, key=lambda item: item[0])
+
+            samples, pending = self.split_template_samples(pending)
+            if samples:
+                # Fully resolve a couple of episodes, then predict the rest from their URL pattern
+                sample_results = []
+                for event in pool.resolve(samples):
+                    if event["type"] == "result":
+                        sample_results.append(event["data"])
+                    yield from progress.emit(event)
+
+                predicted = self.predict_from_samples(sample_results, pending)
+                if predicted:
+                    probes = self.probe_video_urls([url for url in predicted.values() if url])
+                    pending, inferred = self.apply_predictions(sample_results, pending, predicted, probes)
+                    for event in inferred:
+                        yield from progress.emit(event)
+
+            for event in pool.resolve(pending):
+                yield from progress.emit(event)
                     
         except Exception as e:
             log(f"❌ FATAL ERROR in download_season_generator: {e}")
             log(traceback.format_exc())
             yield {"type": "error", "episode": "Series", "message": str(e)}
+        finally:
+            # Also runs when the consumer stops early (client disconnected)
+            pool.close()
 
     def search(self, query: str) -> List[Dict]:
         # (Search logic similar to original, simplified for brevity)
@@ -0,0 +1,81 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from .parser import ArabicToonsParser
+
+@dataclass
+class VideoUrlTemplate:
+    """
+    CDN URL pattern learned from resolved episodes, e.g.
+    https://stream.foupix.com/.../<series_id>/conan_s1_{EP:02}.mp4?<query>
+    """
+    prefix: str        # Everything up to the episode digits
+    suffix: str        # ".mp4" plus the query string
+    anchor_index: int  # Listing index of a known sample
+    anchor_episode: int
+    step: int          # +1 if the listing is ascending, -1 if descending
+    width: int         # Zero-padding of the episode number (0 = none)
+
+    def predict(self, index: int) -> Optional[str]:
+        """Synthesize the video URL for the episode at listing position `index`"""
+        episode = self.anchor_episode + self.step * (index - self.anchor_index)
+        if episode < 0:
+            return None
+        return f"{self.prefix}{str(episode).zfill(self.width)}{self.suffix}"
+
+    @staticmethod
+    def _split(video_url: str) -> Optional[Tuple[str, str, str]]:
+        """Split a CDN URL around the episode number: (prefix, digits, suffix)"""
+        info = ArabicToonsParser.parse_video_url(video_url)
+        episode, filename = info.get("episode"), info.get("filename")
+        if not episode or not filename:
+            return None
+
+        match = re.match(rf'^(.*?){re.escape(episode)}(\.mp4)$', filename)
+        if not match:
+            return None
+
+        parsed = urlparse(video_url)
+        directory = parsed.path[:len(parsed.path) - len(filename)]
+        query = f"?{parsed.query}" if parsed.query else ""
+        prefix = f"{parsed.scheme}://{parsed.netloc}{directory}{match.group(1)}"
+        return prefix, episode, match.group(2) + query
+
+    @classmethod
+    def learn(cls, samples: List[Tuple[int, str]]) -> Optional["VideoUrlTemplate"]:
+        """
+        Learn a template from (listing index, video URL) samples.
+        Returns None unless there are at least two samples and every one agrees
+        on one pattern and one step (a single sample can't tell the listing order).
+        """
+        parts = []
+        for index, video_url in samples:
+            split = cls._split(video_url)
+            if not split:
+                return None
+            parts.append((index, *split))
+
+        if len(parts) < 2:
+            return None
+
+        anchor_index, prefix, digits, suffix = parts[0]
+        anchor_episode = int(digits)
+        width = len(digits) if digits.startswith("0") else 0
+        step = None
+
+        for index, other_prefix, other_digits, other_suffix in parts[1:]:
+            if other_prefix != prefix or other_suffix != suffix or index == anchor_index:
+                return None
+            delta = (int(other_digits) - anchor_episode) / (index - anchor_index)
+            if delta not in (1, -1) or (step is not None and delta != step):
+                return None
+            step = int(delta)
+            if other_digits.startswith("0"):
+                width = max(width, len(other_digits))
+
+        return cls(prefix=prefix, suffix=suffix, anchor_index=anchor_index,
+                   anchor_episode=anchor_episode, step=step, width=width)
+
+    def to_dict(self) -> Dict:
+        return {"prefix": self.prefix, "suffix": self.suffix, "step": self.step, "width": self.width}
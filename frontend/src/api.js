@@ -90,3 +90,14 @@ export const searchCartoons = async (query) => {
         throw error;
     }
 };
+
+// Favorite status for many series in one request: { [url]: boolean }
+export const checkFavorites = async (urls) => {
+    try {
+        const response = await axios.post(`${API_URL}/library/check-batch`, { urls });
+        return response.data.favorites;
+    } catch (error) {
+        console.error("Error checking favorites:", error);
+        throw error;
+    }
+};
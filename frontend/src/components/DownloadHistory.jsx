@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { History, X, Trash2, Clock, HardDrive, Film } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { historyStorage } from '../utils/historyStorage';
+import { checkFavorites } from '../api';
 import AnimatedList from './AnimatedList';
 import HistoryItem from './HistoryItem';
 
@@ -9,6 +10,7 @@ const DownloadHistory = ({ onSelectHistory }) => {
     const [isOpen, setIsOpen] = useState(false);
     const [history, setHistory] = useState([]);
     const [stats, setStats] = useState({ count: 0, totalEpisodes: 0, totalSize: '0 B' });
+    const [favorites, setFavorites] = useState({});
 
     useEffect(() => {
         if (isOpen) {
@@ -20,6 +22,18 @@ const DownloadHistory = ({ onSelectHistory }) => {
         const data = historyStorage.getHistory();
         setHistory(data);
         setStats(historyStorage.getStats());
+        loadFavorites(data);
+    };
+
+    // One request for the favorite status of every listed series
+    const loadFavorites = async (items) => {
+        const urls = [...new Set(items.map((item) => item.url).filter(Boolean))];
+        if (urls.length === 0) return;
+        try {
+            setFavorites(await checkFavorites(urls));
+        } catch (error) {
+            setFavorites({});
+        }
     };
 
     const handleRemove = (id) => {
@@ -129,6 +143,7 @@ const DownloadHistory = ({ onSelectHistory }) => {
                                         renderItem={(item) => (
                                             <HistoryItem
                                                 item={item}
+                                                isFavorite={!!favorites[item.url]}
                                                 onSelect={handleSelect}
                                                 onRemove={handleRemove}
                                             />
@@ -1,9 +1,9 @@
 import React from 'react';
 import { motion } from 'framer-motion';
-import { Trash2, Clock, HardDrive, Film } from 'lucide-react';
+import { Trash2, Clock, HardDrive, Film, Heart } from 'lucide-react';
 import { historyStorage } from '../utils/historyStorage';
 
-const HistoryItem = ({ item, onSelect, onRemove }) => {
+const HistoryItem = ({ item, isFavorite, onSelect, onRemove }) => {
     return (
         <div
             className="group relative p-4 bg-white dark:bg-gray-800 border-b border-gray-100 dark:border-gray-700 hover:bg-gray-50 dark:hover:bg-gray-700/50 transition-colors cursor-pointer"
@@ -27,8 +27,9 @@ const HistoryItem = ({ item, onSelect, onRemove }) => {
 
                 {/* Info */}
                 <div className="flex-1 min-w-0 flex flex-col justify-center">
-                    <h4 className="font-bold text-gray-900 dark:text-white text-base truncate mb-1 group-hover:text-blue-600 dark:group-hover:text-blue-400 transition-colors">
-                        {item.seriesName}
+                    <h4 className="font-bold text-gray-900 dark:text-white text-base truncate mb-1 group-hover:text-blue-600 dark:group-hover:text-blue-400 transition-colors flex items-center gap-1.5">
+                        {isFavorite && <Heart size={14} className="shrink-0 text-pink-500 fill-pink-500" title="In Library" />}
+                        <span className="truncate">{item.seriesName}</span>
                     </h4>
 
                     <div className="flex items-center gap-3 text-xs text-gray-500 dark:text-gray-400 mb-2">
@@ -225,7 +225,20 @@ const SeasonDownloader = forwardRef((props, ref) => {
                     });
                 } else if (data.type === 'result') {
                     fetchedEpisodes.push(data.data);
-                    setEpisodes(prev => [...prev, data.data]);
+                    // Results stream in completion order; keep the list ordered by episode index
+                    setEpisodes(prev => [...prev, data.data].sort((a, b) => (a.index ?? 0) - (b.index ?? 0)));
+                } else if (data.type === 'revalidating') {
+                    // Stale cache fully shown; a background refresh may still push updates
+                    setLoading(false);
+                    setProgress(null);
+                } else if (data.type === 'update') {
+                    // New or changed episode from the background refresh: replace by episode URL
+                    setEpisodes(prev => [
+                        ...prev.filter(ep => ep.episode_url !== data.data.episode_url),
+                        data.data
+                    ].sort((a, b) => (a.index ?? 0) - (b.index ?? 0)));
+                } else if (data.type === 'revalidated') {
+                    console.log(`Cache refreshed: ${data.added} new, ${data.changed} changed episodes`);
                 } else if (data.type === 'error') {
                     console.error("Episode error:", data);
                 }
@@ -20,6 +20,7 @@ export const API_ENDPOINTS = {
   LIBRARY: `${API_BASE_URL}/api/library`,
   LIBRARY_TOGGLE: `${API_BASE_URL}/api/library/toggle`,
   LIBRARY_CHECK: `${API_BASE_URL}/api/library/check`,
+  LIBRARY_CHECK_BATCH: `${API_BASE_URL}/api/library/check-batch`,
   SEARCH: `${API_BASE_URL}/api/search`,
   OPEN_DOWNLOADS: `${API_BASE_URL}/api/open-downloads`,
   HEALTH: `${API_BASE_URL}/api/health`,
@@ -4,20 +4,32 @@ import { Heart, Play, Trash2, Film, Loader2 } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { API_BASE_URL } from '../config';
 
+const PAGE_SIZE = 48;
+
 const Library = () => {
     const [favorites, setFavorites] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [total, setTotal] = useState(0);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
         fetchFavorites();
     }, []);
 
+    const fetchPage = (cursor = null) =>
+        axios.get(`${API_BASE_URL}/api/library/page`, {
+            params: { limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) }
+        });
+
     const fetchFavorites = async () => {
         try {
             setLoading(true);
-            const response = await axios.get(`${API_BASE_URL}/api/library/`);
-            setFavorites(response.data);
+            const response = await fetchPage();
+            setFavorites(response.data.items);
+            setNextCursor(response.data.next_cursor);
+            setTotal(response.data.total ?? response.data.items.length);
             setError(null);
         } catch (err) {
             console.error('Error fetching library:', err);
@@ -27,6 +39,23 @@ const Library = () => {
         }
     };
 
+    const loadMore = async () => {
+        if (!nextCursor || loadingMore) return;
+        try {
+            setLoadingMore(true);
+            const response = await fetchPage(nextCursor);
+            setFavorites(prev => [
+                ...prev,
+                ...response.data.items.filter(item => !prev.some(existing => existing.url === item.url))
+            ]);
+            setNextCursor(response.data.next_cursor);
+        } catch (err) {
+            console.error('Error fetching library page:', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleRemove = async (url, e) => {
         e.stopPropagation();
         if (!window.confirm('Remove from library?')) return;
@@ -35,6 +64,7 @@ const Library = () => {
             // Use toggle endpoint to remove favorite
             await axios.post(`${API_BASE_URL}/api/library/toggle`, { url });
             setFavorites(prev => prev.filter(item => item.url !== url));
+            setTotal(prev => Math.max(0, prev - 1));
         } catch (err) {
             alert('Failed to remove favorite');
         }
@@ -93,7 +123,7 @@ const Library = () => {
                     <Heart className="text-pink-500 fill-pink-500" />
                     My Library
                     <span className="text-sm font-normal text-gray-500 dark:text-gray-400 bg-gray-100 dark:bg-gray-800 px-3 py-1 rounded-full ml-2">
-                        {favorites.length}
+                        {total}
                     </span>
                 </h2>
             </div>
@@ -152,6 +182,19 @@ const Library = () => {
                     ))}
                 </AnimatePresence>
             </div>
+
+            {nextCursor && (
+                <div className="flex justify-center">
+                    <button
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        className="px-6 py-3 bg-white dark:bg-gray-800 text-gray-700 dark:text-gray-200 rounded-xl border border-gray-200 dark:border-gray-700 hover:shadow-md transition-all text-sm font-bold flex items-center gap-2 disabled:opacity-60"
+                    >
+                        {loadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+                        Load more
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
@@ -0,0 +1,50 @@
+from backend.core.cache_ttl import (
+    CACHE_TTL_DEFAULT, CACHE_TTL_MAX, CACHE_TTL_MIN, TOKEN_EXPIRY_MARGIN,
+    links_expired, next_refresh_state, token_expiry,
+)
+
+NOW = 1_700_000_000.0
+
+
+def test_first_refresh_uses_default_ttl():
+    state = next_refresh_state(None, new_episodes=5, now=NOW)
+    assert state["ttl_seconds"] == CACHE_TTL_DEFAULT
+    assert state["last_changed_at"] == NOW
+
+
+def test_unchanged_refreshes_back_off_up_to_max():
+    series = {"last_changed_at": NOW - 3600, "change_interval": None, "unchanged_refreshes": 20}
+    state = next_refresh_state(series, new_episodes=0, now=NOW)
+    assert state["ttl_seconds"] == CACHE_TTL_MAX
+    assert state["unchanged_refreshes"] == 21
+
+
+def test_token_expiry_caps_ttl():
+    expires_at = NOW + 6 * 3600
+    state = next_refresh_state(None, new_episodes=1, expires_at=expires_at, now=NOW)
+    assert state["ttl_seconds"] == 6 * 3600 - TOKEN_EXPIRY_MARGIN
+    assert state["links_expire_at"] == expires_at
+
+
+def test_token_expiry_inside_margin_clamps_to_min_ttl():
+    state = next_refresh_state(None, new_episodes=1, expires_at=NOW + 60, now=NOW)
+    assert state["ttl_seconds"] == CACHE_TTL_MIN
+
+
+def test_already_expired_token_clamps_to_min_ttl():
+    state = next_refresh_state(None, new_episodes=1, expires_at=NOW - 3600, now=NOW)
+    assert state["ttl_seconds"] == CACHE_TTL_MIN
+
+
+def test_links_expired_inside_margin():
+    assert not links_expired(None, now=NOW)
+    assert not links_expired(NOW + TOKEN_EXPIRY_MARGIN + 1, now=NOW)
+    assert links_expired(NOW + TOKEN_EXPIRY_MARGIN - 1, now=NOW)
+    assert links_expired(NOW - 1, now=NOW)
+
+
+def test_token_expiry_parses_seconds_and_milliseconds():
+    assert token_expiry({"expires": str(int(NOW))}) == NOW
+    assert token_expiry({"Expires": str(int(NOW * 1000))}) == NOW
+    assert token_expiry({"e": "3600"}) is None
+    assert token_expiry({"id": "42"}) is None
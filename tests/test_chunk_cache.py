@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from backend.core.chunk_cache import ChunkCache, cache_key, parse_range
+
+
+def test_cache_key_ignores_token_parameters():
+    a = cache_key("https://stream.foupix.com/a/123/conan_s1_01.mp4?token=abc&expires=1700000000")
+    b = cache_key("https://stream.foupix.com/a/123/conan_s1_01.mp4?token=xyz&expires=1800000000")
+    assert a == b
+
+
+def test_cache_key_keeps_identifying_parameters():
+    a = cache_key("https://forafile.com/download.php?id=1&token=abc")
+    b = cache_key("https://forafile.com/download.php?id=2&token=abc")
+    assert a != b
+
+
+def test_cache_key_differs_per_file():
+    a = cache_key("https://stream.foupix.com/a/123/conan_s1_01.mp4")
+    b = cache_key("https://stream.foupix.com/a/123/conan_s1_02.mp4")
+    assert a != b
+
+
+def test_parse_range_forms():
+    assert parse_range("bytes=0-99", 1000) == (0, 99)
+    assert parse_range("bytes=500-", 1000) == (500, 999)
+    assert parse_range("bytes=-100", 1000) == (900, 999)
+    assert parse_range("bytes=900-5000", 1000) == (900, 999)
+
+
+def test_parse_range_ignores_unusable_headers():
+    for header in (None, "", "items=0-1", "bytes=0-1,5-6", "bytes=abc-", "bytes=-", "bytes=10-5"):
+        assert parse_range(header, 1000) is None
+
+
+def test_parse_range_rejects_unsatisfiable():
+    with pytest.raises(ValueError):
+        parse_range("bytes=1000-", 1000)
+    with pytest.raises(ValueError):
+        parse_range("bytes=-0", 1000)
+
+
+def test_eviction_drops_least_recently_used_chunks(tmp_path):
+    cache = ChunkCache(root=str(tmp_path), chunk_size=10, max_bytes=30)
+    for index in range(3):
+        cache.write("video", index, bytes(10))
+    cache.read("video", 0)  # Chunk 1 is now the oldest
+    cache.write("video", 3, bytes(10))
+
+    assert not cache.has("video", 1)
+    assert all(cache.has("video", index) for index in (0, 2, 3))
+    assert not (tmp_path / "video" / "1.chunk").exists()
+    assert cache.stats()["bytes"] == 30
+
+
+def test_stream_range_fills_gaps_from_upstream(tmp_path):
+    data = bytes(range(256)) * 4  # 1024 bytes
+    cache = ChunkCache(root=str(tmp_path), chunk_size=100)
+    cache.set_meta("video", len(data))
+    cache.write("video", 1, data[100:200])
+    fetched = []
+
+    async def fetch(url, start, end, etag):
+        fetched.append((start, end))
+        yield data[start:end + 1]
+
+    async def read(start, end):
+        return b"".join([piece async for piece in cache.stream_range(fetch, "url", "video", start, end)])
+
+    assert asyncio.run(read(50, 349)) == data[50:350]
+    assert fetched == [(0, 99), (200, 399)]
+    # Everything fetched was stored: the same range is now served from disk
+    assert asyncio.run(read(50, 349)) == data[50:350]
+    assert len(fetched) == 2
@@ -0,0 +1,83 @@
+from backend.core.hls import SegmentCache, parse_playlist, rewrite_playlist
+
+BASE = "https://cdn.example/video/master.m3u8"
+
+MASTER = """#EXTM3U
+#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aud",URI="audio/en.m3u8"
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360
+low/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=2400000,RESOLUTION=1280x720
+https://other.example/hd/index
+"""
+
+MEDIA = """#EXTM3U
+#EXT-X-TARGETDURATION:6
+#EXT-X-KEY:METHOD=AES-128,URI="key.bin"
+#EXT-X-MAP:URI="init.mp4"
+#EXTINF:6.0,
+seg0.m4s
+#EXTINF:6.0,
+/abs/seg1.m4s
+#EXT-X-ENDLIST
+"""
+
+
+def proxied_playlist(url):
+    return f"/hls?url={url}"
+
+
+def proxied_resource(url):
+    return f"/hls/segment?url={url}"
+
+
+def test_parse_master_playlist():
+    playlist = parse_playlist(MASTER, BASE)
+    assert playlist.is_master
+    assert playlist.variants == [
+        (800000, "https://cdn.example/video/low/index.m3u8"),
+        (2400000, "https://other.example/hd/index"),
+    ]
+    assert playlist.segments == []
+
+
+def test_parse_media_playlist():
+    playlist = parse_playlist(MEDIA, BASE)
+    assert not playlist.is_master
+    assert playlist.segments == ["https://cdn.example/video/seg0.m4s", "https://cdn.example/abs/seg1.m4s"]
+    assert playlist.init_segment == "https://cdn.example/video/init.mp4"
+    assert playlist.fragmented_mp4
+    assert playlist.encrypted
+    assert playlist.ended
+
+
+def test_rewrite_master_playlist_routes_variants_and_renditions_to_playlists():
+    lines = rewrite_playlist(MASTER, BASE, proxied_playlist, proxied_resource).splitlines()
+    assert lines[1] == '#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aud",URI="/hls?url=https://cdn.example/video/audio/en.m3u8"'
+    assert lines[3] == "/hls?url=https://cdn.example/video/low/index.m3u8"
+    # No .m3u8 suffix, but it follows EXT-X-STREAM-INF so it is still a playlist
+    assert lines[5] == "/hls?url=https://other.example/hd/index"
+
+
+def test_rewrite_media_playlist_routes_keys_maps_and_segments_to_resources():
+    rewritten = rewrite_playlist(MEDIA, BASE, proxied_playlist, proxied_resource)
+    lines = rewritten.splitlines()
+    assert lines[2] == '#EXT-X-KEY:METHOD=AES-128,URI="/hls/segment?url=https://cdn.example/video/key.bin"'
+    assert lines[3] == '#EXT-X-MAP:URI="/hls/segment?url=https://cdn.example/video/init.mp4"'
+    assert lines[5] == "/hls/segment?url=https://cdn.example/video/seg0.m4s"
+    assert lines[7] == "/hls/segment?url=https://cdn.example/abs/seg1.m4s"
+    assert lines[8] == "#EXT-X-ENDLIST"
+    assert rewritten.endswith("\n")
+
+
+def test_segment_cache_evicts_least_recently_used():
+    cache = SegmentCache(max_bytes=20)
+    cache.put("a", bytes(10), "video/mp2t")
+    cache.put("b", bytes(10), "video/mp2t")
+    assert cache.get("a") is not None  # "b" is now the oldest
+    cache.put("c", bytes(10), "video/mp2t")
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+
+    cache.put("huge", bytes(21), "video/mp2t")
+    assert "huge" not in cache
+    assert cache.stats()["bytes"] == 20
@@ -0,0 +1,30 @@
+import time
+
+from backend.core.cache_ttl import TOKEN_EXPIRY_MARGIN
+from backend.scraper.scraper import ScraperBase
+
+EPISODE = "https://www.arabic-toons.com/show-1-2.html"
+
+
+def video_url(expires):
+    return f"https://cdn.example/123/show_s1_2.mp4?token=abc&expires={int(expires)}"
+
+
+def test_known_episode_with_fresh_token_is_reused():
+    known = {EPISODE: {"video_url": video_url(time.time() + 2 * TOKEN_EXPIRY_MARGIN)}}
+    candidates, new = ScraperBase.split_known([(2, {"episode_url": EPISODE})], known)
+    assert [index for index, _, _ in candidates] == [2]
+    assert new == []
+
+
+def test_known_episode_with_expiring_token_is_resolved_again():
+    known = {EPISODE: {"video_url": video_url(time.time() + TOKEN_EXPIRY_MARGIN / 2)}}
+    candidates, new = ScraperBase.split_known([(2, {"episode_url": EPISODE})], known)
+    assert candidates == []
+    assert new == [(2, {"episode_url": EPISODE})]
+
+
+def test_known_episode_without_token_is_reused():
+    known = {EPISODE: {"video_url": "https://cdn.example/123/show_s1_2.mp4"}}
+    candidates, new = ScraperBase.split_known([(2, {"episode_url": EPISODE})], known)
+    assert len(candidates) == 1 and new == []
@@ -0,0 +1,64 @@
+import asyncio
+
+from backend.core.segmented import SegmentedFetcher
+
+DATA = bytes(range(256)) * 40
+
+
+class FakeProxy:
+    """Per-host slot accounting of ProxyClient, serving DATA"""
+
+    def __init__(self, free_slots):
+        self.free = free_slots
+        self.active = 0
+        self.peak = 0
+
+    async def reserve(self, url, count, wait=True):
+        taken = min(count, self.free)
+        if wait and not taken:
+            raise AssertionError("test never waits for a slot")
+        self.free -= taken
+        return taken
+
+    def release(self, url, count=1):
+        self.free += count
+
+    async def iter_range(self, url, start, end, etag=None, reserved=False):
+        assert reserved
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            for offset in range(start, end + 1, 100):
+                await asyncio.sleep(0)
+                yield DATA[offset:min(offset + 100, end + 1)]
+        finally:
+            self.active -= 1
+
+
+def fetch_all(proxy, connections):
+    fetcher = SegmentedFetcher(proxy, segment_size=1000, min_size=2000)
+    fetcher._host("http://cdn/a.mp4")["connections"] = connections
+
+    async def run():
+        return b"".join([data async for data in fetcher.fetch("http://cdn/a.mp4", 0, len(DATA) - 1)])
+
+    return asyncio.run(run())
+
+
+def test_split_covers_range_inclusively():
+    fetcher = SegmentedFetcher(None, segment_size=1000)
+    assert fetcher.split(500, 2600) == [(500, 1499), (1500, 2499), (2500, 2600)]
+
+
+def test_connections_stay_within_reserved_slots():
+    proxy = FakeProxy(free_slots=3)
+    assert fetch_all(proxy, connections=6) == DATA
+    assert proxy.peak <= 3
+    assert proxy.free == 3
+
+
+def test_busy_host_falls_back_to_one_connection():
+    proxy = FakeProxy(free_slots=1)
+    assert fetch_all(proxy, connections=6) == DATA
+    assert proxy.peak == 1
+    assert proxy.free == 1
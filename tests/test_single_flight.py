@@ -0,0 +1,72 @@
+import asyncio
+
+from backend.core.single_flight import SingleFlight
+
+
+async def collect(flight):
+    return [event async for event in flight.subscribe()]
+
+
+def test_concurrent_joins_share_one_producer():
+    calls = []
+
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def producer():
+            calls.append(1)
+            yield {"type": "progress", "n": 1}
+            await release.wait()
+            yield {"type": "done"}
+
+        first, first_leader = flights.join("series", producer)
+        await asyncio.sleep(0)  # Let the producer emit its first event
+        second, second_leader = flights.join("series", producer)
+        assert flights.in_flight("series")
+        readers = asyncio.gather(collect(first), collect(second))
+        await asyncio.sleep(0)
+        release.set()
+        results = await readers
+        return first is second, first_leader, second_leader, results, flights
+
+    same, first_leader, second_leader, results, flights = asyncio.run(run())
+    assert same and first_leader and not second_leader
+    assert calls == [1]
+    # The late subscriber gets the buffered event replayed, then the live one
+    assert results[0] == results[1] == [{"type": "progress", "n": 1}, {"type": "done"}]
+    assert not flights.in_flight("series")
+    assert flights.stats()["started"] == 1 and flights.stats()["joined"] == 1
+
+
+def test_finished_flight_is_not_reused():
+    async def run():
+        flights = SingleFlight()
+
+        async def producer():
+            yield "event"
+
+        first, _ = flights.join("series", producer)
+        await collect(first)
+        second, leader = flights.join("series", producer)
+        await collect(second)
+        return first is second, leader
+
+    same, leader = asyncio.run(run())
+    assert not same and leader
+
+
+def test_producer_error_is_published():
+    async def run():
+        flights = SingleFlight()
+
+        async def producer():
+            yield "partial"
+            raise RuntimeError("boom")
+
+        flight, _ = flights.join("series", producer)
+        return await collect(flight)
+
+    events = asyncio.run(run())
+    assert events[0] == "partial"
+    assert events[1] == {"type": "error", "message": "RuntimeError('boom')"}
@@ -0,0 +1,34 @@
+from backend.scraper.template import VideoUrlTemplate
+
+BASE = "https://stream.foupix.com/anime/123/conan_s1_"
+QUERY = ".mp4?tok=abc"
+
+
+def url(episode: int) -> str:
+    return f"{BASE}{episode:02d}{QUERY}"
+
+
+def test_single_sample_learns_nothing():
+    assert VideoUrlTemplate.learn([(1, url(1))]) is None
+
+
+def test_ascending_samples_predict_between():
+    template = VideoUrlTemplate.learn([(1, url(1)), (10, url(10))])
+    assert template.step == 1
+    assert template.predict(5) == url(5)
+
+
+def test_descending_listing_learns_negative_step():
+    template = VideoUrlTemplate.learn([(1, url(10)), (10, url(1))])
+    assert template.step == -1
+    assert template.predict(4) == url(7)
+
+
+def test_gap_between_samples_learns_nothing():
+    # Ten listing positions but eleven episodes apart: the listing skips one somewhere
+    assert VideoUrlTemplate.learn([(1, url(1)), (10, url(11))]) is None
+
+
+def test_different_patterns_learn_nothing():
+    other = "https://stream.foupix.com/anime/456/conan_s2_10.mp4?tok=abc"
+    assert VideoUrlTemplate.learn([(1, url(1)), (10, other)]) is None